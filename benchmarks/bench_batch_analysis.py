@@ -0,0 +1,99 @@
+"""Benchmark da análise em lote (ticket_batch) contra analyze_ticket ticket a ticket.
+
+Gera tickets sintéticos, calcula os tempos com cliente/suporte/bug/ignorado
+das duas formas e confere que os resultados são idênticos. Uma parte das
+respostas é reclassificada como bug (B) ou ignorada (I) para exercitar todas
+as colunas; nesse caso a referência é o mesmo laço do recálculo do diálogo.
+
+Uso:
+    python benchmarks/bench_batch_analysis.py [--tickets 10000 100000]
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_tickets import BUSINESS_HOURS, HOLIDAYS, make_tickets
+from ticket_batch import METRICS_BY_CODE, analyze_batch
+from ticket_core import BusinessHoursCalculator, TicketAnalyzer
+
+NOW = datetime.datetime(2025, 1, 1, 12, 0, 0)
+
+
+def reference_times(analyzer, ticket, overrides):
+    """Tempos por classificação ticket a ticket (analyze_ticket + reclassificação)"""
+    analysis = analyzer.analyze_ticket(ticket, now=NOW)
+    if not overrides:
+        return {
+            'time_with_support': analysis['time_with_support'],
+            'time_with_client': analysis['time_with_client'],
+            'time_in_bug': 0, 'time_ignored': 0,
+            'business_time_with_support': analysis['business_time_with_support'],
+            'business_time_with_client': analysis['business_time_with_client'],
+            'business_time_in_bug': 0, 'business_time_ignored': 0,
+        }
+
+    totals = {metric: 0 for code in METRICS_BY_CODE for metric in (code, f'business_{code}')}
+    metric_by_class = dict(zip('CABI', METRICS_BY_CODE))
+    creation_dt = analyzer.parse_datetime(ticket['creation_date'])
+    events = [(creation_dt, 'C')]
+    for interaction in analysis['interactions']:
+        if interaction.get('is_virtual') or not interaction['date'] or not interaction['sender_type']:
+            continue
+        events.append((interaction['date'], overrides.get(interaction['id'], interaction['classification'])))
+    final_date = analyzer.parse_datetime(ticket['end_date']) if ticket.get('end_date') else NOW
+    if events[-1][0] < final_date:
+        events.append((final_date, None))
+    for (start, classification), (end, _) in zip(events, events[1:]):
+        metric = metric_by_class.get(classification)
+        if metric:
+            totals[metric] += (end - start).total_seconds()
+            totals[f'business_{metric}'] += analyzer.calculator.calculate_business_time(start, end)
+    return totals
+
+
+def run(count):
+    tickets = make_tickets(count)
+    rng = random.Random(7)
+    classifications = {}
+    for ticket in tickets[::3]:
+        classifications[ticket['id']] = {
+            reply['id']: rng.choice('BI') for reply in ticket['replies'] if rng.random() < 0.3
+        }
+
+    analyzer = TicketAnalyzer(BusinessHoursCalculator(BUSINESS_HOURS, HOLIDAYS))
+
+    started = time.perf_counter()
+    expected = [reference_times(analyzer, ticket, classifications.get(ticket['id'])) for ticket in tickets]
+    per_ticket_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    frame = analyze_batch(analyzer, tickets, classifications, now=NOW)
+    batch_time = time.perf_counter() - started
+
+    rows = frame.to_dict('records')
+    mismatches = sum(1 for got, want in zip(rows, expected) if any(got[key] != want[key] for key in want))
+    return per_ticket_time, batch_time, mismatches
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--tickets', type=int, nargs='+', default=[10000, 100000],
+                            help="Quantidades de tickets a testar")
+    args = arg_parser.parse_args()
+
+    print(f"{'Tickets':>8} {'Ticket a ticket (s)':>20} {'Lote (s)':>9} {'Ganho':>7} {'Diferenças':>11}")
+    for count in args.tickets:
+        per_ticket_time, batch_time, mismatches = run(count)
+        print(f"{count:>8} {per_ticket_time:>20.2f} {batch_time:>9.2f} "
+              f"{per_ticket_time / batch_time:>6.1f}x {mismatches:>11}")
+        assert mismatches == 0, f"{mismatches} tickets com resultados diferentes"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Benchmark do cálculo de tempo comercial (BusinessHoursCalculator).
+
+Compara o cálculo original dia a dia com a tabela cumulativa para intervalos
+de 1 dia, 1 mês e 1 ano, conferindo que os dois métodos dão o mesmo resultado,
+e mede as consultas repetidas, atendidas pelo cache LRU do calculador.
+
+Uso:
+    python benchmarks/bench_business_time.py [--repeat N]
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ticket_core import BusinessHoursCalculator
+
+
+BUSINESS_HOURS = {
+    'monday': '08:00-12:00,14:00-18:00',
+    'tuesday': '08:00-12:00,14:00-18:00',
+    'wednesday': '08:00-12:00,14:00-18:00',
+    'thursday': '08:00-12:00,14:00-18:00',
+    'friday': '08:00-12:00,14:00-18:00',
+    'saturday': '',
+    'sunday': ''
+}
+
+HOLIDAYS = [
+    (datetime.date(year, month, day), description)
+    for year in range(2022, 2027)
+    for month, day, description in [
+        (1, 1, "Confraternização Universal"),
+        (4, 21, "Tiradentes"),
+        (5, 1, "Dia do Trabalho"),
+        (9, 7, "Independência do Brasil"),
+        (10, 12, "Nossa Senhora Aparecida"),
+        (11, 2, "Finados"),
+        (11, 15, "Proclamação da República"),
+        (12, 25, "Natal"),
+    ]
+]
+
+SCENARIOS = [
+    ("1 dia", datetime.timedelta(days=1)),
+    ("1 mês", datetime.timedelta(days=30)),
+    ("1 ano", datetime.timedelta(days=365)),
+]
+
+
+def build_intervals(span, count=200, seed=42):
+    """Gera intervalos aleatórios (com segundos quebrados) de duração aproximada `span`"""
+    rng = random.Random(seed)
+    base = datetime.datetime(2024, 1, 1)
+    intervals = []
+    for _ in range(count):
+        start = base + datetime.timedelta(seconds=rng.randint(0, 365 * 86400))
+        end = start + span + datetime.timedelta(seconds=rng.randint(-3600, 3600))
+        intervals.append((start, end))
+    return intervals
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Repetições por cenário")
+    args = arg_parser.parse_args()
+
+    calculator = BusinessHoursCalculator(BUSINESS_HOURS, HOLIDAYS)
+
+    print(f"{'Intervalo':<10} {'Dia a dia (us)':>16} {'Cumulativo (us)':>16} {'Ganho':>8} {'Em cache (us)':>14}")
+    for label, span in SCENARIOS:
+        intervals = build_intervals(span)
+
+        for start, end in intervals:
+            expected = calculator._calculate_business_time_by_day(start, end)
+            actual = calculator.calculate_business_time(start, end)
+            if expected != actual:
+                raise SystemExit(f"Divergência em {start} -> {end}: {expected} != {actual}")
+
+        by_day = min(timeit.repeat(
+            lambda: [calculator._calculate_business_time_by_day(s, e) for s, e in intervals],
+            number=1, repeat=args.repeat))
+        cumulative = min(timeit.repeat(
+            lambda: [calculator._calculate_business_time(s, e) for s, e in intervals],
+            number=1, repeat=args.repeat))
+        # Os intervalos já foram calculados na conferência acima: todas as consultas acertam o cache
+        cached = min(timeit.repeat(
+            lambda: [calculator.calculate_business_time(s, e) for s, e in intervals],
+            number=1, repeat=args.repeat))
+
+        per_call_by_day = by_day / len(intervals) * 1e6
+        per_call_cumulative = cumulative / len(intervals) * 1e6
+        per_call_cached = cached / len(intervals) * 1e6
+        print(f"{label:<10} {per_call_by_day:>16.2f} {per_call_cumulative:>16.2f} "
+              f"{per_call_by_day / per_call_cumulative:>7.1f}x {per_call_cached:>14.2f}")
+
+    info = calculator.cache_info()
+    print(f"cache: {info['hits']} acertos, {info['misses']} falhas, {info['size']} intervalos")
+
+
+if __name__ == '__main__':
+    main()
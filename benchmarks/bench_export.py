@@ -0,0 +1,87 @@
+"""Benchmark da exportação para CSV: DataFrame do pandas contra gravação linha a linha.
+
+Analisa alguns tickets sintéticos e os replica até o volume pedido (com
+protocolos distintos), depois mede o tempo de cada forma de exportar e, em uma
+segunda execução, o pico de memória alocada (tracemalloc) além das próprias
+análises. Os dois arquivos são comparados ao final.
+
+Uso:
+    python benchmarks/bench_export.py [--tickets 100000]
+"""
+import argparse
+import datetime
+import filecmp
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_tickets import BUSINESS_HOURS, HOLIDAYS, make_tickets
+from ticket_core import BusinessHoursCalculator, TicketAnalyzer, build_export_row, collect_status_types
+from ticket_export import write_export_csv
+
+NOW = datetime.datetime(2025, 1, 1, 12, 0, 0)
+
+
+def make_results(count, distinct=500):
+    """`count` análises, replicando `distinct` análises reais"""
+    analyzer = TicketAnalyzer(BusinessHoursCalculator(BUSINESS_HOURS, HOLIDAYS))
+    base = [analyzer.analyze_ticket(ticket, now=NOW) for ticket in make_tickets(distinct)]
+    return [dict(base[i % distinct], protocol=i) for i in range(count)]
+
+
+def pandas_export(filename, results, status_types):
+    """Exportação anterior de ResultsTab.export_results"""
+    import pandas as pd
+    data = [build_export_row(analysis, status_types) for analysis in results]
+    pd.DataFrame(data).to_csv(filename, index=False, encoding='utf-8-sig', lineterminator='\r\n')
+
+
+def measure(func, *args):
+    """(segundos, pico de memória em MB) de uma chamada.
+
+    O tempo vem de uma execução sem tracemalloc, que deixa as alocações bem mais lentas.
+    """
+    started = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--tickets', type=int, default=100000, help="Quantidade de análises exportadas")
+    args = arg_parser.parse_args()
+
+    results = make_results(args.tickets)
+    status_types = collect_status_types(results)
+
+    # Carrega o pandas fora da medição
+    import pandas  # noqa: F401
+
+    with tempfile.TemporaryDirectory() as directory:
+        pandas_file = os.path.join(directory, 'pandas.csv')
+        stream_file = os.path.join(directory, 'stream.csv')
+
+        pandas_time, pandas_peak = measure(pandas_export, pandas_file, results, status_types)
+        stream_time, stream_peak = measure(write_export_csv, stream_file, results, status_types)
+        identical = filecmp.cmp(pandas_file, stream_file, shallow=False)
+
+    print(f"{args.tickets} análises, {len(status_types)} status")
+    print(f"pandas (DataFrame):  {pandas_time:6.2f} s  pico {pandas_peak:8.1f} MB")
+    print(f"linha a linha (csv): {stream_time:6.2f} s  pico {stream_peak:8.1f} MB")
+    print(f"arquivos idênticos: {'sim' if identical else 'NÃO'}")
+    return 0 if identical else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Benchmark da sessão HTTP com pool de conexões do ApiClient.
+
+Sobe um servidor HTTP local que imita /ticket/detail e atrasa cada conexão
+nova em `--handshake-ms` (simulando o custo de TCP+TLS até api.tomticket.com).
+Compara uma chamada `requests.get` avulsa por ticket, como era feito antes,
+com o ApiClient reaproveitando conexões da sessão.
+
+Uso:
+    python benchmarks/bench_http_session.py [--requests N] [--handshake-ms MS]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ticket_core import ApiClient
+
+
+class DetailHandler(BaseHTTPRequestHandler):
+    """Responde qualquer GET com um detalhe de ticket mínimo, mantendo a conexão aberta"""
+
+    protocol_version = "HTTP/1.1"
+    # Envia cabeçalho e corpo no mesmo segmento (evita o atraso de ACK do Nagle)
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def do_GET(self):
+        body = json.dumps({
+            'error': False,
+            'data': {'id': '1', 'protocol': 1, 'replies': [], 'status': []}
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HandshakeDelayServer(ThreadingHTTPServer):
+    """Servidor que cobra um atraso fixo a cada conexão aceita"""
+
+    daemon_threads = True
+    handshake_delay = 0.0
+    connections = 0
+
+    def process_request(self, request, client_address):
+        type(self).connections += 1
+        time.sleep(self.handshake_delay)
+        super().process_request(request, client_address)
+
+
+def run_plain(url, count):
+    """Uma conexão nova por requisição (comportamento anterior)"""
+    for ticket_id in range(count):
+        requests.get(url, params={'ticket_id': ticket_id})
+
+
+def run_session(client, count):
+    """Requisições pela sessão do ApiClient"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        for ticket_id in range(count):
+            client.get_ticket_details(ticket_id)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--requests', type=int, default=100, help="Requisições por cenário")
+    arg_parser.add_argument('--handshake-ms', type=float, default=30.0,
+                            help="Atraso simulado por conexão nova (ms)")
+    args = arg_parser.parse_args()
+
+    HandshakeDelayServer.handshake_delay = args.handshake_ms / 1000
+    server = HandshakeDelayServer(('127.0.0.1', 0), DetailHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v2.0"
+
+    try:
+        HandshakeDelayServer.connections = 0
+        started = time.perf_counter()
+        run_plain(f"{base_url}/ticket/detail", args.requests)
+        plain_time = time.perf_counter() - started
+        plain_connections = HandshakeDelayServer.connections
+
+        client = ApiClient('benchmark', base_url=base_url)
+        HandshakeDelayServer.connections = 0
+        started = time.perf_counter()
+        run_session(client, args.requests)
+        session_time = time.perf_counter() - started
+        session_connections = HandshakeDelayServer.connections
+        stats = client.get_latency_stats()['ticket/detail']
+        client.close()
+    finally:
+        server.shutdown()
+
+    print(f"{'Modo':<22} {'Conexões':>9} {'Total (s)':>10} {'Por req. (ms)':>14}")
+    print(f"{'requests.get avulso':<22} {plain_connections:>9} {plain_time:>10.3f} "
+          f"{plain_time / args.requests * 1000:>14.2f}")
+    print(f"{'ApiClient (sessão)':<22} {session_connections:>9} {session_time:>10.3f} "
+          f"{session_time / args.requests * 1000:>14.2f}")
+    print(f"Latência registrada pelo ApiClient: média {stats['avg'] * 1000:.2f} ms, "
+          f"máxima {stats['max'] * 1000:.2f} ms em {stats['count']} chamadas")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark da memória das interações mantidas pelo classificador.
+
+Analisa tickets sintéticos (com mensagens HTML do tamanho pedido, lidos de
+JSON como as respostas da API) e mede, com tracemalloc, a memória que as
+análises mantêm em três formas: um dict por interação com a mensagem (forma
+anterior), registros Interaction com a mensagem em memória e registros
+Interaction com a mensagem lida do cache de detalhes sob demanda. Confere
+também que as mensagens carregadas sob demanda são as da resposta original.
+
+Uso:
+    python benchmarks/bench_interactions.py [--tickets 500] [--replies 20] [--message-size 2000]
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_tickets import BUSINESS_HOURS, HOLIDAYS, make_tickets
+from ticket_cache import TicketDetailCache
+from ticket_core import BusinessHoursCalculator, TicketAnalyzer
+from ticket_interactions import MessageSource
+
+NOW = datetime.datetime(2025, 1, 1, 12, 0, 0)
+
+
+def analyze_all(analyzer, payloads, as_dicts=False):
+    """Análises dos tickets, convertendo as interações em dicts (forma anterior) se pedido"""
+    results = []
+    for raw in payloads:
+        analysis = analyzer.analyze_ticket(json.loads(raw)['data'], now=NOW)
+        if as_dicts:
+            analysis['interactions'] = [interaction.to_dict() for interaction in analysis['interactions']]
+        results.append(analysis)
+    return results
+
+
+def retained_mb(func, *args):
+    """(resultado, memória em MB mantida pelo resultado) de uma chamada"""
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current / (1024 * 1024)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--tickets', type=int, default=500, help="Tickets analisados")
+    arg_parser.add_argument('--replies', type=int, default=20, help="Respostas por ticket")
+    arg_parser.add_argument('--message-size', type=int, default=2000, help="Caracteres de cada mensagem")
+    args = arg_parser.parse_args()
+
+    tickets = make_tickets(args.tickets, replies=args.replies, message_size=args.message_size)
+    payloads = [json.dumps({'error': False, 'data': ticket}, ensure_ascii=False) for ticket in tickets]
+    calculator = BusinessHoursCalculator(BUSINESS_HOURS, HOLIDAYS)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TicketDetailCache(directory, max_bytes=1024 ** 3)
+        for ticket, raw in zip(tickets, payloads):
+            cache.put(ticket['id'], json.loads(raw))
+
+        eager = TicketAnalyzer(calculator)
+        lazy = TicketAnalyzer(calculator, message_source=MessageSource(cache))
+
+        _, dict_mb = retained_mb(analyze_all, eager, payloads, True)
+        _, slots_mb = retained_mb(analyze_all, eager, payloads)
+        results, lazy_mb = retained_mb(analyze_all, lazy, payloads)
+
+        # Abrir um ticket no classificador: lê as mensagens dele do cache
+        started = time.perf_counter()
+        for analysis, ticket in zip(results, tickets):
+            messages = {reply['id']: reply['message'] for reply in ticket['replies']}
+            for interaction in analysis['interactions']:
+                if not interaction.get('is_virtual') and interaction['message'] != messages[interaction['id']]:
+                    raise SystemExit(f"Mensagem divergente no ticket {ticket['id']}, resposta {interaction['id']}")
+        load_ms = (time.perf_counter() - started) * 1000 / len(results)
+
+    interactions = args.tickets * (args.replies + 1)
+    print(f"{args.tickets} tickets, {interactions} interações, mensagens de {args.message_size} caracteres")
+    print(f"dict com mensagem (anterior):    {dict_mb:8.1f} MB")
+    print(f"Interaction com mensagem:        {slots_mb:8.1f} MB")
+    print(f"Interaction, mensagem sob demanda: {lazy_mb:6.1f} MB  ({dict_mb / lazy_mb:.1f}x menos)")
+    print(f"leitura das mensagens de um ticket: {load_ms:.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Benchmark da conversão de datas da API (ticket_dates.parse_api_datetime).
+
+Compara o `dateutil.parser.parse` usado antes com o conversor de formato fixo,
+sem memorização (todas as datas distintas) e com a memorização ativa (datas
+repetidas, como acontece entre status, respostas e análises). Os tempos são
+extrapolados para um milhão de conversões.
+
+Uso:
+    python benchmarks/bench_parse_datetime.py [--count N] [--unique N]
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+
+from dateutil import parser
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ticket_dates
+from ticket_dates import parse_api_datetime
+
+
+def make_values(count, unique):
+    """`count` datas no formato da API, com `unique` valores distintos"""
+    base = datetime.datetime(2024, 1, 1, 8, 0, 0)
+    distinct = []
+    for i in range(unique):
+        dt = base + datetime.timedelta(seconds=i * 137)
+        suffix = "-03:00" if i % 2 else "-0300"
+        distinct.append(dt.strftime("%Y-%m-%d %H:%M:%S") + suffix)
+    return [distinct[i % unique] for i in range(count)], distinct
+
+
+def dateutil_parse(value):
+    """Conversão anterior de TicketAnalyzer.parse_datetime"""
+    return parser.parse(value).replace(tzinfo=None, microsecond=0)
+
+
+def per_million(func, values):
+    started = time.perf_counter()
+    for value in values:
+        func(value)
+    return (time.perf_counter() - started) / len(values) * 1000000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--count', type=int, default=200000, help="Conversões por cenário")
+    arg_parser.add_argument('--unique', type=int, default=20000, help="Datas distintas no cenário com repetição")
+    args = arg_parser.parse_args()
+
+    repeated, distinct = make_values(args.count, args.unique)
+    all_distinct, _ = make_values(args.count, args.count)
+
+    for value in distinct[:1000]:
+        assert parse_api_datetime(value) == dateutil_parse(value), value
+
+    # O dateutil é lento demais para o volume inteiro; uma amostra basta para a extrapolação
+    sample = all_distinct[:min(len(all_distinct), 20000)]
+    dateutil_time = per_million(dateutil_parse, sample)
+
+    def fixed_without_memo(value):
+        ticket_dates.clear_memo()
+        return parse_api_datetime(value)
+
+    fixed_time = per_million(fixed_without_memo, all_distinct)
+
+    ticket_dates.clear_memo()
+    memo_time = per_million(parse_api_datetime, repeated)
+
+    print(f"{'Conversor':<36} {'s / milhão':>11} {'Ganho':>8}")
+    print(f"{'dateutil.parser.parse':<36} {dateutil_time:>11.2f} {1:>7.1f}x")
+    print(f"{'formato fixo (sem memória)':<36} {fixed_time:>11.2f} {dateutil_time / fixed_time:>7.1f}x")
+    print(f"{f'formato fixo ({args.unique} distintas)':<36} {memo_time:>11.2f} {dateutil_time / memo_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
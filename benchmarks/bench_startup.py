@@ -0,0 +1,80 @@
+"""Tempo de inicialização (importação) da interface e do núcleo.
+
+Mede, em processos novos, o tempo de `import` de cada módulo de entrada
+com `python -X importtime` e verifica as dependências carregadas:
+o núcleo (ticket_core, ticket_analyzer_cli) não pode importar PyQt5 nem
+pandas, e a interface não deve carregar pandas nem enhanced_classifier
+antes de uma exportação ou classificação. Termina com código 1 se alguma
+dessas regras for violada, para ser usado como verificação de regressão.
+
+Uso:
+    python benchmarks/bench_startup.py [--runs N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# módulo de entrada -> pacotes que não podem ser carregados na importação
+TARGETS = {
+    'ticket_core': ('PyQt5', 'pandas'),
+    'ticket_analyzer_cli': ('PyQt5', 'pandas'),
+    'ticket_analyzer': ('pandas', 'enhanced_classifier'),
+}
+
+CHECK_CODE = (
+    "import sys, {module}; "
+    "print(','.join(sorted({{name.split('.')[0] for name in sys.modules}})))"
+)
+
+
+def import_time(module):
+    """Tempo cumulativo (s) de importação do módulo, segundo -X importtime"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, env=dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    # Linhas no formato: "import time: self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000000
+    raise RuntimeError(f"{module} não encontrado na saída de -X importtime")
+
+
+def loaded_packages(module):
+    """Pacotes de primeiro nível presentes em sys.modules após importar o módulo"""
+    result = subprocess.run(
+        [sys.executable, '-c', CHECK_CODE.format(module=module)],
+        cwd=ROOT, capture_output=True, text=True, env=dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return set(result.stdout.strip().split(','))
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--runs', type=int, default=5, help="Processos por módulo (usa o menor tempo)")
+    args = arg_parser.parse_args()
+
+    violations = []
+    print(f"{'Módulo':<22} {'Importação (ms)':>16}  Proibidos carregados")
+    for module, forbidden in TARGETS.items():
+        best = min(import_time(module) for _ in range(args.runs))
+        found = sorted(set(forbidden) & loaded_packages(module))
+        print(f"{module:<22} {best * 1000:>16.1f}  {', '.join(found) or '-'}")
+        violations.extend(f"{module} importa {package}" for package in found)
+
+    if violations:
+        print("\nFALHA: " + "; ".join(violations))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
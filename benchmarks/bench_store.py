@@ -0,0 +1,72 @@
+"""Benchmark do banco local (TicketStore): gravação, agregações e recarga.
+
+Analisa alguns tickets sintéticos e os replica até o volume pedido (com IDs,
+clientes e meses distintos), grava tudo em um banco temporário e mede as
+agregações por cliente/mês e por status, além da recarga de um mês de análises.
+
+Uso:
+    python benchmarks/bench_store.py [--tickets 50000]
+"""
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_tickets import BUSINESS_HOURS, HOLIDAYS, make_tickets
+from ticket_core import BusinessHoursCalculator, TicketAnalyzer
+from ticket_store import TicketStore
+
+NOW = datetime.datetime(2025, 1, 1, 12, 0, 0)
+
+
+def make_results(count, distinct=500):
+    """`count` análises, replicando `distinct` análises reais em 12 meses e 200 clientes"""
+    analyzer = TicketAnalyzer(BusinessHoursCalculator(BUSINESS_HOURS, HOLIDAYS))
+    base = [analyzer.analyze_ticket(ticket, now=NOW) for ticket in make_tickets(distinct)]
+    results = []
+    for i in range(count):
+        analysis = base[i % distinct]
+        creation_date = f"2024-{i % 12 + 1:02d}{analysis['creation_date'][7:]}"
+        results.append(dict(analysis, id=i, protocol=100000 + i, customer_name=f"Cliente {i % 200}",
+                            creation_date=creation_date))
+    return results
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return (time.perf_counter() - started) * 1000, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--tickets', type=int, default=50000, help="Quantidade de análises gravadas")
+    args = arg_parser.parse_args()
+
+    results = make_results(args.tickets)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = TicketStore(os.path.join(directory, 'store.db'))
+        save_ms, _ = timed(store.save_analyses, results)
+        customer_ms, rows = timed(store.customer_month_totals)
+        period_ms, _ = timed(store.customer_month_totals, '2024-03-01', '2024-03-31')
+        status_ms, _ = timed(store.status_totals)
+        load_ms, month = timed(store.load_analyses, date_from='2024-03-01', date_to='2024-03-31')
+        store.close()
+
+    print(f"{args.tickets} análises")
+    print(f"gravação:                  {save_ms:9.1f} ms")
+    print(f"cliente x mês (tudo):      {customer_ms:9.1f} ms  ({len(rows)} linhas)")
+    print(f"cliente x mês (um mês):    {period_ms:9.1f} ms")
+    print(f"tempo por status:          {status_ms:9.1f} ms")
+    print(f"recarga de um mês:         {load_ms:9.1f} ms  ({len(month)} análises)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""Suíte de benchmarks do núcleo de análise, com comparação contra uma linha de base.
+
+Roda sem rede, sobre respostas sintéticas de /ticket/detail (synthetic_tickets),
+em cenários com quantidades diferentes de respostas, status e tempo em aberto.
+Para cada cenário mede, por chamada:
+
+- parse_datetime: conversão das datas das respostas e dos status (sem memorização)
+- get_status_at_time: status ativo no momento de cada resposta
+- calculate_business_time: intervalos entre respostas (sem o cache LRU)
+- analyze_ticket: análise completa de cada ticket
+- export_row: montagem das linhas da exportação (build_export_row)
+
+Cada medida repete a operação até somar ao menos MIN_SECONDS (como o
+timeit.autorange), com o coletor de lixo desligado, e vale a menor entre
+`--repeat` medidas. O resultado é gravado em JSON; com uma linha de base
+(gravada antes com --save-baseline), as operações mais lentas que ela além de
+`--threshold` são listadas e o código de saída é 1, para uso em integração
+contínua. Os tempos dependem da máquina: grave a linha de base no mesmo
+ambiente em que a suíte será comparada e ajuste a tolerância ao ruído dele.
+
+Por isso a linha de base não fica no repositório (está no .gitignore). Sem
+ela, a suíte só grava os resultados e sai com 0; com --require-baseline, a
+ausência da linha de base, ou uma linha de base sem nenhuma operação em
+comum com a execução (ex.: cenário personalizado, operação renomeada), é um
+erro (código 2), para que a integração contínua não passe sem comparar
+nada. As operações medidas que faltam na linha de base são sempre listadas.
+Na integração contínua:
+
+1. restaure benchmarks/baseline.json do cache/artefato do job no branch
+   principal, gravado no mesmo tipo de máquina;
+2. rode `python benchmarks/bench_suite.py --require-baseline`;
+3. no branch principal, depois de aprovado, rode com --save-baseline e
+   publique benchmarks/baseline.json como o novo cache/artefato.
+
+Uso:
+    python benchmarks/bench_suite.py [--repeat 5] [--threshold 0.25]
+    python benchmarks/bench_suite.py --require-baseline
+    python benchmarks/bench_suite.py --save-baseline
+    python benchmarks/bench_suite.py --tickets 50 --replies 300 --statuses 20 --open-days 180
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import ticket_dates
+from synthetic_tickets import BUSINESS_HOURS, HOLIDAYS, START, make_tickets
+from ticket_core import BusinessHoursCalculator, TicketAnalyzer, build_export_row, collect_status_types
+
+# "Agora" da análise dos tickets sem open_days (todos criados antes)
+NOW = datetime.datetime(2025, 1, 1, 12, 0, 0)
+
+# Duração mínima de cada medida, para que operações rápidas não fiquem sujeitas a ruído
+MIN_SECONDS = 0.1
+
+DEFAULT_RESULTS = os.path.join(BENCHMARKS_DIR, 'results.json')
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+
+# Cenários padrão: nome -> parâmetros dos tickets sintéticos
+SCENARIOS = {
+    'padrao': {'tickets': 500, 'replies': 10, 'statuses': 5, 'open_days': None},
+    'conversas_longas': {'tickets': 20, 'replies': 500, 'statuses': 20, 'open_days': None},
+    'aberto_1_ano': {'tickets': 200, 'replies': 30, 'statuses': 10, 'open_days': 365},
+}
+
+
+def timed(func, setup, number):
+    """Segundos de `number` execuções de `func` (sem contar `setup`, chamado antes de cada uma)"""
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        total = 0
+        for _ in range(number):
+            if setup:
+                setup()
+            started = time.perf_counter()
+            func()
+            total += time.perf_counter() - started
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return total
+
+
+def best_of(repeat, func, setup=None):
+    """Menor tempo (segundos) de uma execução de `func`, entre `repeat` medidas"""
+    # Calibração (também aquece caches): execuções por medida até somar MIN_SECONDS
+    number = 1
+    elapsed = timed(func, setup, number)
+    while elapsed < MIN_SECONDS:
+        number *= 2
+        elapsed = timed(func, setup, number)
+
+    best = elapsed / number
+    for _ in range(repeat):
+        best = min(best, timed(func, setup, number) / number)
+    return best
+
+
+def run_scenario(config, repeat):
+    """Tempo por chamada (microssegundos) de cada operação em um cenário"""
+    tickets = make_tickets(config['tickets'], replies=config['replies'], statuses=config['statuses'],
+                           open_days=config['open_days'])
+    now = START if config['open_days'] else NOW
+
+    # Sem o cache de tempo comercial: as repetições mediriam só acertos do cache
+    calculator = BusinessHoursCalculator(BUSINESS_HOURS, HOLIDAYS, cache_size=0)
+    analyzer = TicketAnalyzer(calculator)
+
+    dates = []
+    for ticket in tickets:
+        dates.append(ticket['creation_date'])
+        dates.extend(reply['date'] for reply in ticket['replies'])
+        for status in ticket['status']:
+            dates.append(status['start']['operator']['date'])
+            if 'end' in status:
+                dates.append(status['end']['operator']['date'])
+
+    status_queries = [
+        (ticket['status'], [analyzer.parse_datetime(reply['date']) for reply in ticket['replies']])
+        for ticket in tickets
+    ]
+
+    intervals = []
+    for ticket in tickets:
+        moments = [analyzer.parse_datetime(ticket['creation_date'])]
+        moments.extend(analyzer.parse_datetime(reply['date']) for reply in ticket['replies'])
+        moments.append(now)
+        intervals.extend(zip(moments, moments[1:]))
+
+    results = [analyzer.analyze_ticket(ticket, now=now) for ticket in tickets]
+    status_types = collect_status_types(results)
+
+    def parse_all():
+        for value in dates:
+            analyzer.parse_datetime(value)
+
+    def status_all():
+        for statuses, moments in status_queries:
+            for moment in moments:
+                analyzer.get_status_at_time(statuses, moment)
+
+    def business_all():
+        for start, end in intervals:
+            calculator.calculate_business_time(start, end)
+
+    def analyze_all():
+        for ticket in tickets:
+            analyzer.analyze_ticket(ticket, now=now)
+
+    def export_all():
+        for analysis in results:
+            build_export_row(analysis, status_types)
+
+    operations = [
+        ('parse_datetime', parse_all, len(dates), ticket_dates.clear_memo),
+        ('get_status_at_time', status_all, sum(len(moments) for _, moments in status_queries), None),
+        ('calculate_business_time', business_all, len(intervals), None),
+        ('analyze_ticket', analyze_all, len(tickets), ticket_dates.clear_memo),
+        ('export_row', export_all, len(results), None),
+    ]
+    return {
+        name: {'calls': calls, 'per_call_us': best_of(repeat, func, setup) / calls * 1e6}
+        for name, func, calls, setup in operations
+    }
+
+
+def compare(results, baseline, threshold):
+    """Linhas (cenário, operação, base, atual, variação, regrediu) das operações presentes nos dois"""
+    rows = []
+    for scenario, data in results['scenarios'].items():
+        base_operations = baseline.get('scenarios', {}).get(scenario, {}).get('operations', {})
+        for operation, measure in data['operations'].items():
+            base = base_operations.get(operation)
+            if not base:
+                continue
+            change = measure['per_call_us'] / base['per_call_us'] - 1
+            rows.append((scenario, operation, base['per_call_us'], measure['per_call_us'], change, change > threshold))
+    return rows
+
+
+def missing_from_baseline(results, baseline):
+    """Pares (cenário, operação) medidos nesta execução que a linha de base não tem"""
+    missing = []
+    for scenario, data in results['scenarios'].items():
+        base_operations = baseline.get('scenarios', {}).get(scenario, {}).get('operations', {})
+        missing.extend((scenario, operation) for operation in data['operations'] if not base_operations.get(operation))
+    return missing
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Execuções por operação (vale a mais rápida)")
+    arg_parser.add_argument('--threshold', type=float, default=0.25,
+                            help="Piora máxima tolerada em relação à linha de base (0.25 = 25%%)")
+    arg_parser.add_argument('--output', default=DEFAULT_RESULTS, help="Arquivo JSON com os resultados")
+    arg_parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Arquivo JSON da linha de base")
+    arg_parser.add_argument('--save-baseline', action='store_true', help="Grava os resultados como linha de base")
+    arg_parser.add_argument('--require-baseline', action='store_true',
+                            help="Falha (código 2) se não houver linha de base para comparar")
+    custom = arg_parser.add_argument_group("cenário personalizado (substitui os cenários padrão)")
+    custom.add_argument('--tickets', type=int, help="Quantidade de tickets")
+    custom.add_argument('--replies', type=int, default=10, help="Respostas por ticket")
+    custom.add_argument('--statuses', type=int, default=5, help="Mudanças de status por ticket")
+    custom.add_argument('--open-days', type=int, help="Tickets em aberto há esta quantidade de dias")
+    args = arg_parser.parse_args()
+
+    # Verificado antes das medidas, para não gastar o tempo da suíte à toa
+    if args.require_baseline and not args.save_baseline and not os.path.exists(args.baseline):
+        print(f"Sem linha de base em {args.baseline}: restaure-a (ex.: do cache da integração contínua) "
+              f"ou grave uma com --save-baseline")
+        return 2
+
+    scenarios = SCENARIOS
+    if args.tickets:
+        scenarios = {'personalizado': {'tickets': args.tickets, 'replies': args.replies,
+                                       'statuses': args.statuses, 'open_days': args.open_days}}
+
+    results = {
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'scenarios': {},
+    }
+    print(f"{'Cenário':<18} {'Operação':<24} {'Chamadas':>9} {'us/chamada':>11}")
+    for name, config in scenarios.items():
+        operations = run_scenario(config, args.repeat)
+        results['scenarios'][name] = {'config': config, 'operations': operations}
+        for operation, measure in operations.items():
+            print(f"{name:<18} {operation:<24} {measure['calls']:>9} {measure['per_call_us']:>11.2f}")
+
+    output = args.baseline if args.save_baseline else args.output
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em {output}")
+    if args.save_baseline:
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Sem linha de base em {args.baseline} (grave uma com --save-baseline)")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    rows = compare(results, baseline, args.threshold)
+    print(f"\nComparação com {args.baseline} (tolerância de {args.threshold:.0%}):")
+    for scenario, operation, base, current, change, regressed in rows:
+        flag = "  REGRESSÃO" if regressed else ""
+        print(f"{scenario:<18} {operation:<24} {base:>9.2f} -> {current:>9.2f} us ({change:+.0%}){flag}")
+
+    missing = missing_from_baseline(results, baseline)
+    if missing:
+        print(f"\nSem medida na linha de base ({len(missing)}), não comparadas:")
+        for scenario, operation in missing:
+            print(f"{scenario:<18} {operation:<24}")
+    if not rows and args.require_baseline:
+        print("\nNenhuma operação em comum com a linha de base: grave uma nova com --save-baseline "
+              "para estes cenários")
+        return 2
+
+    regressions = [row for row in rows if row[5]]
+    if regressions:
+        print(f"\n{len(regressions)} operação(ões) acima da tolerância.")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
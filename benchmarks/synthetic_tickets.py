@@ -0,0 +1,114 @@
+"""Gerador de respostas sintéticas de /ticket/detail para os benchmarks.
+
+Os tickets imitam o formato da API do TomTicket (datas com fuso -03:00,
+respostas alternando cliente/atendente e uma sequência de status), com
+sementes fixas para que os resultados sejam reproduzíveis.
+"""
+import datetime
+import random
+
+STATUS_NAMES = ["Em andamento", "Aguardando cliente", "Pausado", "Em análise", "Aguardando terceiros"]
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S-03:00"
+
+# Início padrão das datas sintéticas (e "agora" dos tickets gerados com open_days)
+START = datetime.datetime(2024, 1, 1, 8, 0, 0)
+
+
+# Parágrafo usado para levar as mensagens ao tamanho pedido (HTML como o da API)
+MESSAGE_FILLER = "<p>Segue em anexo o log do erro ocorrido ao emitir a nota fiscal no sistema.</p>"
+
+
+def make_message(ticket_id, index, size=0):
+    """Mensagem HTML de uma resposta, com pelo menos `size` caracteres"""
+    message = f"<p>Mensagem {index} do ticket {ticket_id}</p>"
+    if size > len(message):
+        message += MESSAGE_FILLER * ((size - len(message)) // len(MESSAGE_FILLER) + 1)
+    return message
+
+
+def make_ticket(ticket_id, rng, replies=10, statuses=5, start=START, message_size=0, open_days=None):
+    """Detalhe de um ticket com `replies` respostas e `statuses` mudanças de status.
+
+    Com `open_days`, o ticket está em aberto há `open_days` dias em `start`
+    (o "agora" da análise), com as respostas distribuídas nesse período.
+    """
+    if open_days is None:
+        creation = start + datetime.timedelta(minutes=rng.randint(0, 60 * 24 * 300))
+    else:
+        creation = start - datetime.timedelta(days=open_days)
+    current = creation
+    reply_list = []
+    for index in range(replies):
+        if open_days is None:
+            current += datetime.timedelta(minutes=rng.randint(5, 60 * 48))
+        else:
+            current = creation + datetime.timedelta(seconds=open_days * 86400 * (index + rng.random()) / replies)
+        reply_list.append({
+            'id': f"{ticket_id}-r{index}",
+            'date': current.strftime(DATE_FORMAT),
+            'sender_type': 'A' if index % 2 == 0 else 'C',
+            'sender': 'Atendente' if index % 2 == 0 else 'Cliente',
+            'message': make_message(ticket_id, index, message_size) if message_size else f"Mensagem {index} do ticket {ticket_id}",
+            'attachments': [],
+        })
+
+    if open_days is None:
+        finished = rng.random() < 0.7
+        end = current + datetime.timedelta(minutes=rng.randint(5, 600))
+    else:
+        finished = False
+        end = start
+    status_list = []
+    span = (end - creation).total_seconds()
+    cursor = creation + datetime.timedelta(minutes=rng.randint(1, 120))
+    for index in range(statuses):
+        status_end = min(end, cursor + datetime.timedelta(seconds=span / max(statuses, 1)))
+        status = {
+            'description': STATUS_NAMES[index % len(STATUS_NAMES)],
+            'start': {'operator': {'date': cursor.strftime(DATE_FORMAT)}},
+        }
+        if finished or index < statuses - 1:
+            status['end'] = {'operator': {'date': status_end.strftime(DATE_FORMAT)}}
+        status_list.append(status)
+        cursor = status_end
+
+    return {
+        'id': str(ticket_id),
+        'protocol': 100000 + ticket_id,
+        'subject': f"Ticket sintético {ticket_id}",
+        'customer': {'name': f"Cliente {ticket_id % 500}", 'email': f"cliente{ticket_id % 500}@exemplo.com"},
+        'creation_date': creation.strftime(DATE_FORMAT),
+        'first_reply_date': reply_list[0]['date'] if reply_list else None,
+        'end_date': end.strftime(DATE_FORMAT) if finished else None,
+        'situation': {
+            'id': 5 if finished else 1,
+            'description': "Finalizado" if finished else "Aberto",
+            'apply_date': end.strftime(DATE_FORMAT) if finished else current.strftime(DATE_FORMAT),
+        },
+        'sla': {'deadline': {'date': (creation + datetime.timedelta(days=2)).strftime(DATE_FORMAT),
+                             'accomplished': rng.random() < 0.8}},
+        'replies': reply_list,
+        'status': status_list,
+    }
+
+
+def make_tickets(count, seed=42, replies=10, statuses=5, message_size=0, open_days=None):
+    """Lista de `count` tickets sintéticos (reprodutível pela semente)"""
+    rng = random.Random(seed)
+    return [make_ticket(ticket_id, rng, replies, statuses, message_size=message_size, open_days=open_days)
+            for ticket_id in range(count)]
+
+
+BUSINESS_HOURS = {
+    'monday': '08:00-12:00,14:00-18:00',
+    'tuesday': '08:00-12:00,14:00-18:00',
+    'wednesday': '08:00-12:00,14:00-18:00',
+    'thursday': '08:00-12:00,14:00-18:00',
+    'friday': '08:00-12:00,14:00-18:00',
+    'saturday': '',
+    'sunday': '',
+}
+
+HOLIDAYS = [(datetime.date(2024, 1, 1), "Confraternização"), (datetime.date(2024, 4, 21), "Tiradentes"),
+            (datetime.date(2024, 9, 7), "Independência"), (datetime.date(2024, 12, 25), "Natal")]
@@ -0,0 +1,246 @@
+"""Servidor HTTP local que imita a API do TomTicket, para testes de carga e latência.
+
+Serve /v2.0/ticket/list e /v2.0/ticket/detail a partir de tickets sintéticos
+(synthetic_tickets), sem rede e sem token válido. Permite medir concorrência,
+paginação e novas tentativas do ApiClient com:
+
+- latência fixa por requisição (--latency-ms), mais uma variação aleatória (--jitter-ms)
+- respostas 429 aleatórias (--rate-429, fração das requisições) e/ou acima de
+  um limite de requisições por segundo (--max-rps), com Retry-After (--retry-after)
+- tickets por página da listagem (--page-size)
+- tamanho das respostas: quantidade de respostas, status e caracteres por mensagem
+
+A listagem respeita creation_date_ge/creation_date_le e situation, como a
+API; os tickets são criados ao longo de 2024 (o intervalo é exibido ao
+iniciar). Para usar a interface ou a linha de comando contra o servidor:
+
+    python benchmarks/tomticket_stub.py --port 8080 --latency-ms 150 --rate-429 0.05
+    TICKET_ANALYZER_API_URL=http://127.0.0.1:8080/v2.0 python ticket_analyzer.py
+    python ticket_analyzer_cli.py --api-url http://127.0.0.1:8080/v2.0 --token teste \\
+        --from 2024-01-01 --to 2024-03-31 --no-store
+
+Ao encerrar (Ctrl+C), exibe as requisições atendidas por endpoint e as respostas 429.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_tickets import make_tickets
+
+API_PREFIX = "/v2.0"
+
+# Campos do detalhe que não aparecem na listagem
+DETAIL_ONLY_FIELDS = ('replies', 'status')
+
+
+class StubState:
+    """Tickets servidos, opções de comportamento e contadores de requisições"""
+
+    def __init__(self, tickets, page_size=50, latency=0.0, jitter=0.0, rate_429=0.0, max_rps=None,
+                 retry_after=1, seed=42):
+        # Ordem da listagem: data de criação (formato fixo, comparável como texto)
+        self.tickets = sorted(tickets, key=lambda ticket: ticket['creation_date'])
+        self.by_id = {ticket['id']: ticket for ticket in self.tickets}
+        self.page_size = page_size
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.max_rps = max_rps
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {}  # endpoint -> {'ok': n, '429': n, 'error': n}
+        self._window_start = 0.0
+        self._window_count = 0
+
+    def count(self, endpoint, outcome):
+        with self.lock:
+            counts = self.counts.setdefault(endpoint, {'ok': 0, '429': 0, 'error': 0})
+            counts[outcome] += 1
+
+    def delay(self):
+        """Latência simulada desta requisição (segundos)"""
+        with self.lock:
+            jitter = self.rng.uniform(0, self.jitter) if self.jitter else 0.0
+        return self.latency + jitter
+
+    def rate_limited(self):
+        """Indica se esta requisição deve receber 429 (sorteio ou limite por segundo)"""
+        with self.lock:
+            if self.rate_429 and self.rng.random() < self.rate_429:
+                return True
+            if not self.max_rps:
+                return False
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            return self._window_count > self.max_rps
+
+    def list_page(self, params):
+        """Resposta de /ticket/list para os parâmetros da consulta"""
+        date_ge = params.get('creation_date_ge', '')[:19]
+        date_le = params.get('creation_date_le', '')[:19]
+        situation = params.get('situation')
+        matches = [
+            ticket for ticket in self.tickets
+            if (not date_ge or ticket['creation_date'][:19] >= date_ge)
+            and (not date_le or ticket['creation_date'][:19] <= date_le)
+            and (not situation or str(ticket['situation']['id']) == situation)
+        ]
+        try:
+            page = max(1, int(params.get('page', 1)))
+        except ValueError:
+            page = 1
+        start = (page - 1) * self.page_size
+        data = [
+            {key: value for key, value in ticket.items() if key not in DETAIL_ONLY_FIELDS}
+            for ticket in matches[start:start + self.page_size]
+        ]
+        return {
+            'success': True,
+            'message': '',
+            'size': len(matches),
+            'pages': max(1, math.ceil(len(matches) / self.page_size)),
+            'data': data,
+        }
+
+    def detail(self, params):
+        """Resposta de /ticket/detail (None se o ticket não existir)"""
+        ticket = self.by_id.get(params.get('ticket_id', ''))
+        if ticket is None:
+            return None
+        return {'error': False, 'message': '', 'data': ticket}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Atende os endpoints da API com o estado do servidor (StubServer.state)"""
+
+    protocol_version = "HTTP/1.1"
+    # Envia cabeçalho e corpo no mesmo segmento (evita o atraso de ACK do Nagle)
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def do_GET(self):
+        state = self.server.state
+        url = urlsplit(self.path)
+        endpoint = url.path[len(API_PREFIX):].strip('/') if url.path.startswith(API_PREFIX) else url.path
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        time.sleep(state.delay())
+
+        if endpoint not in ('ticket/list', 'ticket/detail'):
+            state.count(endpoint, 'error')
+            return self.send_json(404, {'error': True, 'message': 'Endpoint não encontrado'})
+
+        if state.rate_limited():
+            state.count(endpoint, '429')
+            return self.send_json(429, {'error': True, 'message': 'Too Many Requests'},
+                                  {'Retry-After': str(state.retry_after)})
+
+        if endpoint == 'ticket/list':
+            state.count(endpoint, 'ok')
+            return self.send_json(200, state.list_page(params))
+
+        result = state.detail(params)
+        if result is None:
+            state.count(endpoint, 'error')
+            return self.send_json(200, {'error': True, 'message': 'Chamado não encontrado'})
+        state.count(endpoint, 'ok')
+        self.send_json(200, result)
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """Servidor com uma thread por conexão, compartilhando o mesmo StubState"""
+
+    daemon_threads = True
+
+    def __init__(self, address, state):
+        super().__init__(address, StubHandler)
+        self.state = state
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+
+def start_server(state, host='127.0.0.1', port=0):
+    """Sobe o servidor em segundo plano (porta 0: qualquer porta livre); retorna o StubServer"""
+    server = StubServer((host, port), state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--host', default='127.0.0.1', help="Endereço de escuta")
+    arg_parser.add_argument('--port', type=int, default=8080, help="Porta (0: qualquer porta livre)")
+    arg_parser.add_argument('--tickets', type=int, default=1000, help="Quantidade de tickets")
+    arg_parser.add_argument('--replies', type=int, default=10, help="Respostas por ticket")
+    arg_parser.add_argument('--statuses', type=int, default=5, help="Mudanças de status por ticket")
+    arg_parser.add_argument('--message-size', type=int, default=0, help="Caracteres de cada mensagem (0: curtas)")
+    arg_parser.add_argument('--page-size', type=int, default=50, help="Tickets por página da listagem")
+    arg_parser.add_argument('--latency-ms', type=float, default=0.0, help="Latência fixa por requisição (ms)")
+    arg_parser.add_argument('--jitter-ms', type=float, default=0.0, help="Latência adicional aleatória, até este valor (ms)")
+    arg_parser.add_argument('--rate-429', type=float, default=0.0, help="Fração das requisições respondidas com 429 (0 a 1)")
+    arg_parser.add_argument('--max-rps', type=float, help="Requisições por segundo acima das quais a resposta é 429")
+    arg_parser.add_argument('--retry-after', type=int, default=1, help="Valor do cabeçalho Retry-After dos 429 (s)")
+    arg_parser.add_argument('--seed', type=int, default=42, help="Semente dos tickets e dos sorteios")
+    args = arg_parser.parse_args()
+
+    if args.tickets < 1:
+        arg_parser.error("--tickets deve ser pelo menos 1.")
+    if args.page_size < 1:
+        arg_parser.error("--page-size deve ser pelo menos 1.")
+    if not 0 <= args.rate_429 <= 1:
+        arg_parser.error("--rate-429 deve estar entre 0 e 1.")
+
+    tickets = make_tickets(args.tickets, seed=args.seed, replies=args.replies, statuses=args.statuses,
+                           message_size=args.message_size)
+    state = StubState(tickets, args.page_size, args.latency_ms / 1000, args.jitter_ms / 1000,
+                      args.rate_429, args.max_rps, args.retry_after, args.seed)
+    server = start_server(state, args.host, args.port)
+
+    first, last = state.tickets[0]['creation_date'][:10], state.tickets[-1]['creation_date'][:10]
+    print(f"{len(tickets)} tickets criados entre {first} e {last}")
+    print(f"API em {server.base_url} (Ctrl+C para encerrar)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+
+    print(f"\n{'Endpoint':<16} {'OK':>8} {'429':>8} {'Erros':>8}")
+    for endpoint, counts in sorted(state.counts.items()):
+        print(f"{endpoint:<16} {counts['ok']:>8} {counts['429']:>8} {counts['error']:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
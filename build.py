@@ -20,6 +20,17 @@ PyInstaller.__main__.run([
     '--add-data=README.txt;.',             # Arquivo de ajuda
     '--add-data=enhanced_classifier.py;.', # Módulo adicional
     '--add-data=enhanced_results_tab.py;.', # Módulo adicional
+    '--add-data=ticket_batch.py;.',        # Módulo adicional
+    '--add-data=ticket_cache.py;.',        # Módulo adicional
+    '--add-data=ticket_core.py;.',         # Módulo adicional
+    '--add-data=ticket_dates.py;.',        # Módulo adicional
+    '--add-data=ticket_export.py;.',       # Módulo adicional
+    '--add-data=ticket_fetcher.py;.',      # Módulo adicional
+    '--add-data=ticket_interactions.py;.', # Módulo adicional
+    '--add-data=ticket_intervals.py;.',    # Módulo adicional
+    '--add-data=ticket_search.py;.',       # Módulo adicional
+    '--add-data=ticket_store.py;.',        # Módulo adicional
+    '--add-data=ticket_sync.py;.',         # Módulo adicional
     '--clean',                             # Limpa cache
     # Bibliotecas necessárias
     '--hidden-import=pandas',
@@ -5,332 +5,355 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QH
                             QLabel, QLineEdit, QPushButton, QComboBox, QDateEdit, 
                             QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView,
                             QCheckBox, QMessageBox, QGroupBox, QFormLayout, QSpinBox,
-                            QTimeEdit, QDialog, QScrollArea, QFileDialog, QGridLayout, QTextEdit, QSplitter, QFrame )
+                            QTimeEdit, QDialog, QScrollArea, QFileDialog, QGridLayout, QTextEdit, QSplitter, QFrame,
+                            QTableView, QStyledItemDelegate, QToolTip )
 from PyQt5.QtCore import Qt, QDate, QTime, QDateTime, QSize
-from PyQt5.QtCore import QTimer
-from PyQt5.QtGui import QColor
+from PyQt5.QtCore import QTimer, QAbstractTableModel, QModelIndex, QRect, QEvent, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter
 from PyQt5.QtGui import QIcon
 
+from ticket_dates import parse_api_datetime
+from ticket_export import tabular_format, write_export_tables
+from ticket_interactions import message_sources
+from ticket_intervals import IntervalBreakdown
 
-class InteractionPairTableView(QTableWidget):
+
+class InteractionPairModel(QAbstractTableModel):
+    """Modelo dos intervalos entre interações consecutivas de um ticket.
+
+    Cada linha é o intervalo que começa em uma interação e vai até a seguinte
+    (ou até a data final, na última). As durações corrida e comercial só são
+    calculadas quando a linha aparece na tela e ficam guardadas; os textos e
+    cores de cada classificação são criados uma única vez.
+    """
+
+    HEADERS = ["Intervalo", "Remetente", "De (Data/Hora)", "Para (Data/Hora)",
+               "Tempo Decorrido", "Tempo Comercial", "Atribuído a",
+               "Reclassificar", "Detalhes"]
+
+    RECLASSIFY_COLUMN = 7
+    DETAILS_COLUMN = 8
+
+    # Classificação da interação "De": (a quem o tempo é atribuído, cor da linha)
+    ATTRIBUTIONS = {
+        'C': ("Suporte", QColor(125, 131, 221)),
+        'A': ("Cliente", QColor(52, 237, 140)),
+        'B': ("Bug", QColor(255, 235, 162)),
+        'I': ("Ignorado", QColor(192, 192, 192)),
+    }
+    UNKNOWN_ATTRIBUTION = ("Desconhecido", QColor(255, 255, 255))
+
+    # Tipo original do remetente, por extenso
+    SENDER_TYPES = {'C': "Cliente", 'A': "Atendente", 'B': "Bug", 'I': "Ignorado"}
+
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.interactions = []
+        self.end_date = None
+        self.is_finished = False
+        self.calculator = None
+        self._durations = []  # (segundos corridos, segundos comerciais) de cada linha, ou None
+
+    def set_ticket(self, interactions, end_date, is_finished, calculator):
+        """Troca o ticket exibido; `interactions` já ordenadas por data"""
+        self.beginResetModel()
+        self.interactions = interactions
+        self.end_date = end_date
+        self.is_finished = is_finished
+        self.calculator = calculator
+        self._durations = [None] * len(interactions)
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.interactions)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def interval_indices(self, row):
+        """(índice da interação "De", índice da interação "Para" ou -1 na última linha)"""
+        return row, row + 1 if row < len(self.interactions) - 1 else -1
+
+    def interval_end(self, row):
+        """Data final do intervalo da linha"""
+        if row < len(self.interactions) - 1:
+            return self.interactions[row + 1]['date']
+        return self.end_date
+
+    def classification(self, row):
+        interaction = self.interactions[row]
+        return interaction.get('classification', interaction.get('sender_type', ''))
+
+    def attribution(self, row):
+        return self.ATTRIBUTIONS.get(self.classification(row), self.UNKNOWN_ATTRIBUTION)
+
+    def durations(self, row):
+        """Segundos corridos e comerciais do intervalo, calculados na primeira consulta"""
+        durations = self._durations[row]
+        if durations is None:
+            start = self.interactions[row]['date']
+            end = self.interval_end(row)
+            durations = ((end - start).total_seconds(), self.calculator.calculate_business_time(start, end))
+            self._durations[row] = durations
+        return durations
+
+    def refresh_row(self, row):
+        """Avisa a view de que a classificação da linha mudou"""
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    @staticmethod
+    def format_time(seconds):
+        """Formata segundos para HH:MM:SS"""
+        hours = int(seconds // 3600)
+        minutes = int((seconds % 3600) // 60)
+        secs = int(seconds % 60)
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        interaction = self.interactions[row]
+
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return f"#{row + 1}"
+            if column == 1:
+                sender_type = self.SENDER_TYPES.get(interaction.get('sender_type', ''), "Desconhecido")
+                return f"{interaction.get('sender', '')} ({sender_type.upper()})"
+            if column == 2:
+                return interaction['date'].strftime(self.DATE_FORMAT)
+            if column == 3:
+                end = self.interval_end(row)
+                return end.strftime(self.DATE_FORMAT) if isinstance(end, datetime.datetime) else str(end)
+            if column in (4, 5):
+                return self.format_time(self.durations(row)[column - 4])
+            if column == 6:
+                return self.attribution(row)[0]
+            return None
+
+        if role == Qt.BackgroundRole:
+            return self.attribution(row)[1]
+
+        if role == Qt.TextAlignmentRole:
+            if column in (0, 6):
+                return Qt.AlignCenter
+            return None
+
+        if role == Qt.ToolTipRole:
+            if column == 1:
+                return f"Tipo: {self.classification(row)}"
+            if column == 2:
+                return f"Remetente: {interaction.get('sender', '')}\nTipo: {interaction.get('sender_type', '')}"
+            if column == 3:
+                if row < len(self.interactions) - 1:
+                    return f"Remetente: {self.interactions[row + 1].get('sender', '')}"
+                return f"Remetente: Sistema\nÚltimo intervalo ({'Final do ticket' if self.is_finished else 'Estado atual'})"
+            if column == 4:
+                return f"{self.durations(row)[0] / 3600:.2f} horas"
+            if column == 5:
+                return f"{self.durations(row)[1] / 3600:.2f} horas comerciais"
+            if column == 6:
+                return f"Baseado na classificação: {self.classification(row)}"
+            return None
+
+        if role == Qt.UserRole and column == 0:
+            return self.interval_indices(row)  # Índices das interações
+        return None
+
+
+class PairActionDelegate(QStyledItemDelegate):
+    """Desenha e trata os botões das colunas "Reclassificar" e "Detalhes".
+
+    Os botões são apenas pintados em cada célula visível, sem criar widgets
+    por linha; o clique é localizado pela posição do mouse.
+    """
+
+    # (classificação, texto, cor, dica)
+    RECLASSIFY_BUTTONS = [
+        ('C', "SUPORTE", QColor(125, 131, 221), "Atribuir tempo ao Suporte"),
+        ('A', "CLIENTE", QColor(52, 237, 140), "Atribuir tempo ao Cliente"),
+        ('B', "BUG", QColor(255, 235, 162), "Classificar como Bug"),
+        ('I', "IGNORAR", QColor(192, 192, 192), "Classificar como Ignorado"),
+    ]
+    DETAILS_BUTTON = (None, "Detalhes", QColor(236, 240, 241), "Detalhes do intervalo")
+
+    BUTTON_WIDTH = 100
+    MARGIN = 2
+    BORDER_COLOR = QColor(120, 120, 120)
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+
+    def buttons(self, index, rect):
+        """[(retângulo, botão)] da célula"""
+        if index.column() == InteractionPairModel.DETAILS_COLUMN:
+            return [(rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN), self.DETAILS_BUTTON)]
+
+        count = len(self.RECLASSIFY_BUTTONS)
+        width = min(self.BUTTON_WIDTH, (rect.width() - self.MARGIN * (count + 1)) // count)
+        height = rect.height() - 2 * self.MARGIN
+        return [
+            (QRect(rect.left() + self.MARGIN + n * (width + self.MARGIN), rect.top() + self.MARGIN, width, height), button)
+            for n, button in enumerate(self.RECLASSIFY_BUTTONS)
+        ]
+
+    def button_at(self, index, rect, pos):
+        for button_rect, button in self.buttons(index, rect):
+            if button_rect.contains(pos):
+                return button
+        return None
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.fillRect(option.rect, index.data(Qt.BackgroundRole))
+        painter.setRenderHint(QPainter.Antialiasing)
+        for button_rect, (_, text, color, _) in self.buttons(index, option.rect):
+            painter.setPen(self.BORDER_COLOR)
+            painter.setBrush(color)
+            painter.drawRoundedRect(button_rect, 3, 3)
+            painter.setPen(Qt.black)
+            painter.drawText(button_rect, Qt.AlignCenter, text)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        count = len(self.RECLASSIFY_BUTTONS) if index.column() == InteractionPairModel.RECLASSIFY_COLUMN else 1
+        return QSize(count * (self.BUTTON_WIDTH + self.MARGIN) + self.MARGIN, 30)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
+            button = self.button_at(index, option.rect, event.pos())
+            if button is not None:
+                classification = button[0]
+                if classification is None:
+                    self.view.show_interval_details(index.row())
+                else:
+                    self.view.reclassify_interval(index.row(), classification)
+                return True
+        return super().editorEvent(event, model, option, index)
+
+    def helpEvent(self, event, view, option, index):
+        if event.type() == QEvent.ToolTip:
+            button = self.button_at(index, option.rect, event.pos())
+            if button is not None:
+                QToolTip.showText(event.globalPos(), button[3], view)
+                return True
+        return super().helpEvent(event, view, option, index)
+
+
+class InteractionPairTableView(QTableView):
     """Tabela personalizada que mostra pares de interações consecutivas com o tempo entre elas"""
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.initUI()
         self.current_ticket = None
+        self.calculator = None
+        self.sorted_interactions = []
+        self._row_by_interaction = {}  # id(interação "De") -> linha da tabela
+        self.initUI()
         
     def initUI(self):
         # Configurar tabela
-        self.setColumnCount(9)
-        self.setHorizontalHeaderLabels([
-            "Intervalo", "Remetente", "De (Data/Hora)", "Para (Data/Hora)", 
-            "Tempo Decorrido", "Tempo Comercial", "Atribuído a", 
-            "Reclassificar", "Detalhes"
-        ])
+        self.pair_model = InteractionPairModel(self)
+        self.setModel(self.pair_model)
+        
+        action_delegate = PairActionDelegate(self)
+        self.setItemDelegateForColumn(InteractionPairModel.RECLASSIFY_COLUMN, action_delegate)
+        self.setItemDelegateForColumn(InteractionPairModel.DETAILS_COLUMN, action_delegate)
         
-        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
-        self.horizontalHeader().setSectionResizeMode(0, QHeaderView.Fixed)
-        self.horizontalHeader().setSectionResizeMode(7, QHeaderView.Fixed)
-        self.horizontalHeader().setSectionResizeMode(8, QHeaderView.Fixed)
+        header = self.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        # Mede o conteúdo só das linhas visíveis (as durações das demais não são calculadas)
+        header.setResizeContentsPrecision(0)
+        header.setSectionResizeMode(0, QHeaderView.Fixed)
+        header.setSectionResizeMode(7, QHeaderView.Fixed)
+        header.setSectionResizeMode(8, QHeaderView.Fixed)
         
         # Tamanhos específicos
         self.setColumnWidth(0, 80)  # Intervalo
         self.setColumnWidth(7, 420)  # Reclassificar
         self.setColumnWidth(8, 80)  # Detalhes
         
-        self.setSelectionBehavior(QTableWidget.SelectRows)
-        self.setSelectionMode(QTableWidget.SingleSelection)
+        # Altura fixa das linhas, suficiente para os botões
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(30)
+        
+        self.setSelectionBehavior(QTableView.SelectRows)
+        self.setSelectionMode(QTableView.SingleSelection)
         
     def load_ticket_data(self, ticket_data, calculator):
         """Carrega dados do ticket na tabela de pares de interações"""
         self.current_ticket = ticket_data
         self.calculator = calculator
-        
-        if not ticket_data or 'interactions' not in ticket_data:
-            return
-            
-        interactions = [i for i in ticket_data['interactions'] if i.get('date')]
-        # Ordena por data
-        interactions.sort(key=lambda x: x['date'])
-        
-        # Resetar tabela
-        self.setRowCount(0)
+        self.sorted_interactions = []
+        self._row_by_interaction = {}
+        
+        interactions = []
+        if ticket_data and 'interactions' in ticket_data:
+            interactions = [i for i in ticket_data['interactions'] if i.get('date')]
+            # Ordena por data
+            interactions.sort(key=lambda x: x['date'])
+        # As linhas da tabela referem-se a esta lista ordenada
+        self.sorted_interactions = interactions
+        self._row_by_interaction = {id(interaction): row for row, interaction in enumerate(interactions)}
         
         if not interactions:
+            self.pair_model.set_ticket([], None, False, calculator)
             return
 
         # Determinar a data final para cálculos (data atual ou de fechamento do ticket)
-        is_finished = False
         end_date = self._get_end_date_for_calculations(interactions)
-
-        # Verifica end_date do ticket
-        if ticket_data.get('end_date'):
-            try:
-                is_finished = True
-            except:
-                pass
+        is_finished = bool(ticket_data.get('end_date'))
         
         # Verifica situation do ticket
         situation_id = ticket_data.get('situation', {}).get('id')
         if situation_id in [4, 5]:  # Cancelada ou Finalizada
             is_finished = True
-            try:
-                situation_date = self.parse_datetime(ticket_data.get('situation', {}).get('apply_date'))
-                if situation_date:
-                    end_date = situation_date
-            except:
-                pass
-        
-        # Criar linhas para cada par de interações incluindo o último
-        for i in range(len(interactions)):
-            from_interaction = interactions[i]
-            
-            if i < len(interactions) - 1:
-                # Intervalo entre duas interações
-                to_interaction = interactions[i+1]
-                time_diff = (to_interaction['date'] - from_interaction['date']).total_seconds()
-                business_time = calculator.calculate_business_time(from_interaction['date'], to_interaction['date'])
-            else:
-                # Último intervalo - da última interação até end_date
-                to_interaction = {'date': end_date, 'sender': 'Sistema', 'sender_type': 'S', 
-                                'message': 'Final do ticket' if is_finished else 'Estado atual'}
-                time_diff = (end_date - from_interaction['date']).total_seconds()
-                business_time = calculator.calculate_business_time(from_interaction['date'], end_date)
-            
-            # Determinar a quem este tempo é atribuído
-            current_classification = from_interaction.get('classification', from_interaction.get('sender_type', ''))
-            
-            if current_classification == 'C':
-                attributed_to = "Suporte"
-                attribution_color = QColor(125, 131, 221)  # Verde claro
-            elif current_classification == 'A':
-                attributed_to = "Cliente"
-                attribution_color = QColor(52, 237, 140)  # Azul claro
-            elif current_classification == 'B':
-                attributed_to = "Bug"
-                attribution_color = QColor(255, 235, 162)  # Vermelho claro
-            elif current_classification == 'I':
-                attributed_to = "Ignorado"
-                attribution_color = QColor(192, 192, 192)   # Cinza claro
-            else:
-                attributed_to = "Desconhecido"
-                attribution_color = QColor(255, 255, 255)  # Branco
-                
-            # Tipo Original (De) - Expandido ao invés de abreviado
-            from_type = from_interaction.get('sender_type', '')
-            if from_type == 'C':
-                displayed_type = "Cliente"
-            elif from_type == 'A':
-                displayed_type = "Atendente"
-            elif from_type == 'B':
-                displayed_type = "Bug"
-            elif from_type == 'I':
-                displayed_type = "Ignorado"
-            else:
-                displayed_type = "Desconhecido"
-            
-            # Adicionar linha
-            row = self.rowCount()
-            self.insertRow(row)
-            
-            # Intervalo
-            interval_item = QTableWidgetItem(f"#{i+1}")
-            interval_item.setTextAlignment(Qt.AlignCenter)
-            interval_item.setData(Qt.UserRole, (i, i+1 if i < len(interactions) - 1 else -1))  # Índices das interações
-            self.setItem(row, 0, interval_item)
-            
-            # Remetente (De)
-            sender_item_str = f"{from_interaction.get('sender', '')} ({displayed_type.upper()})"
-            from_sender_item = QTableWidgetItem(sender_item_str)
-            from_sender_item.setToolTip(f"Tipo: {current_classification}")
-            self.setItem(row, 1, from_sender_item)
-            
-            # De (Data/Hora)
-            from_date_item = QTableWidgetItem(from_interaction['date'].strftime("%Y-%m-%d %H:%M:%S"))
-            from_date_item.setToolTip(f"Remetente: {from_interaction.get('sender', '')}\nTipo: {from_interaction.get('sender_type', '')}")
-            self.setItem(row, 2, from_date_item)
-            
-            # Para (Data/Hora)
-            to_date_str = to_interaction['date'].strftime("%Y-%m-%d %H:%M:%S") if isinstance(to_interaction['date'], datetime.datetime) else str(to_interaction['date'])
-            to_date_item = QTableWidgetItem(to_date_str)
-            to_tip = f"Remetente: {to_interaction.get('sender', '')}"
-            if i == len(interactions) - 1:
-                to_tip += f"\nÚltimo intervalo ({('Final do ticket' if is_finished else 'Estado atual')})"
-            self.setItem(row, 3, to_date_item)
-            to_date_item.setToolTip(to_tip)
-            
-            # Tempo Decorrido
-            time_diff_str = self.format_time(time_diff)
-            time_diff_item = QTableWidgetItem(time_diff_str)
-            time_diff_item.setToolTip(f"{time_diff/3600:.2f} horas")
-            self.setItem(row, 4, time_diff_item)
-            
-            # Tempo Comercial
-            business_time_str = self.format_time(business_time)
-            business_time_item = QTableWidgetItem(business_time_str)
-            business_time_item.setToolTip(f"{business_time/3600:.2f} horas comerciais")
-            self.setItem(row, 5, business_time_item)
-            
-            # Atribuído a
-            attributed_item = QTableWidgetItem(attributed_to)
-            attributed_item.setBackground(attribution_color)
-            attributed_item.setTextAlignment(Qt.AlignCenter)
-            attributed_item.setToolTip(f"Baseado na classificação: {current_classification}")
-            self.setItem(row, 6, attributed_item)
-            
-            # Colorir a linha inteira baseado na atribuição
-            for col in range(self.columnCount()):
-                if self.item(row, col):
-                    self.item(row, col).setBackground(attribution_color)
-        
-        # Adicionar widgets para as colunas de ação
-        self._add_action_widgets()
+            situation_date = self.parse_datetime(ticket_data.get('situation', {}).get('apply_date'))
+            if situation_date:
+                end_date = situation_date
+        
+        self.pair_model.set_ticket(interactions, end_date, is_finished, calculator)
     
     def _get_end_date_for_calculations(self, interactions):
         """Determina a data final apropriada para cálculos"""
         # Verifica se há data de fechamento no ticket
-        if hasattr(self, 'current_ticket') and self.current_ticket:
-            if self.current_ticket.get('end_date'):
-                try:
-                    return datetime.datetime.strptime(self.current_ticket['end_date'], "%Y-%m-%d %H:%M:%S") 
-                except:
-                    pass
+        if self.current_ticket and self.current_ticket.get('end_date'):
+            end_date = self.parse_datetime(self.current_ticket['end_date'])
+            if end_date:
+                return end_date
         
         # Se não houver data de fechamento, usa a data atual
         return datetime.datetime.now()
        
     def parse_datetime(self, datetime_str):
         """Analisa string de datetime da API"""
-        if not datetime_str:
-            return None
-        try:
-            if '-03:00' in datetime_str:
-                dt_str = datetime_str.split('-03:00')[0].strip()
-            elif '-0300' in datetime_str:
-                dt_str = datetime_str.split('-0300')[0].strip()
-            else:
-                dt_str = datetime_str
-            return datetime.datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            return None
-        
-    def _add_action_widgets(self):
-        """Adiciona widgets de ação (botões) para cada linha da tabela"""
-        for row in range(self.rowCount()):
-            # Obter índices das interações
-            interval_indices = self.item(row, 0).data(Qt.UserRole)
-            
-            # Criar widget para reclassificação
-            reclass_widget = QWidget()
-            reclass_layout = QHBoxLayout(reclass_widget)
-            reclass_layout.setContentsMargins(2, 2, 2, 2)
-            reclass_layout.setSpacing(2)
-            
-            # Botões para reclassificação
-            btn_client = QPushButton("SUPORTE")
-            btn_client.setStyleSheet("background-color:rgb(125, 131, 221)")
-            btn_client.setToolTip("Atribuir tempo ao Suporte")
-            btn_client.setFixedWidth(100)
-            btn_client.clicked.connect(lambda _, r=row, t='C': self.reclassify_interval(r, t))
-            
-            btn_agent = QPushButton("CLIENTE")
-            btn_agent.setStyleSheet("background-color:rgb(52, 237, 140)")
-            btn_agent.setToolTip("Atribuir tempo ao Cliente")
-            btn_agent.setMaximumWidth(100)
-            btn_agent.clicked.connect(lambda _, r=row, t='A': self.reclassify_interval(r, t))
-            
-            btn_bug = QPushButton("BUG")
-            btn_bug.setStyleSheet("background-color:rgb(255, 235, 162)")
-            btn_bug.setToolTip("Classificar como Bug")
-            btn_bug.setMaximumWidth(100)
-            btn_bug.clicked.connect(lambda _, r=row, t='B': self.reclassify_interval(r, t))
-            
-            btn_ignore = QPushButton("IGNORAR")
-            btn_ignore.setStyleSheet("background-color:rgb(192, 192, 192)")
-            btn_ignore.setToolTip("Classificar como Ignorado")
-            btn_ignore.setMaximumWidth(100)
-            btn_ignore.clicked.connect(lambda _, r=row, t='I': self.reclassify_interval(r, t))
-            
-            # Adicionar botões ao layout
-            reclass_layout.addWidget(btn_client)
-            reclass_layout.addWidget(btn_agent)
-            reclass_layout.addWidget(btn_bug)
-            reclass_layout.addWidget(btn_ignore)
-            
-            self.setCellWidget(row, 7, reclass_widget)
-            
-            # Criar widget para detalhes
-            details_widget = QWidget()
-            details_layout = QHBoxLayout(details_widget)
-            details_layout.setContentsMargins(2, 2, 2, 2)
-            
-            # Botão para detalhes
-            btn_details = QPushButton("Detalhes")
-            btn_details.clicked.connect(lambda _, r=row: self.show_interval_details(r))
-            details_layout.addWidget(btn_details)
-            
-            self.setCellWidget(row, 8, details_widget)
-            
-            # Colorir a linha inteira baseado na atribuição
-            attribution = self.item(row, 6).text()
-            if attribution == "Cliente":
-                color = QColor(52, 237, 140)  # Azul claro
-            elif attribution == "Suporte":
-                color = QColor(125, 131, 221)  # Verde claro
-            elif attribution == "Bug":
-                color = QColor(255, 235, 162)  # Vermelho claro
-            elif attribution == "Ignorado":
-                color = QColor(192, 192, 192)   # Cinza claro
-            else:
-                color = QColor(255, 255, 255)  # Branco
-
-            # Aplica a cor a todas as células da linha
-            for col in range(self.columnCount()):
-                if self.item(row, col):
-                    self.item(row, col).setBackground(color)
-    
-    # Na classe InteractionPairTableView:
+        return parse_api_datetime(datetime_str)
 
     def reclassify_interval(self, row, new_classification):
         """Reclassifica uma interação com base na linha da tabela"""
         if not self.current_ticket:
             return
         
-        # Obter índices das interações
-        interval_indices = self.item(row, 0).data(Qt.UserRole)
-        if not interval_indices or len(interval_indices) != 2:
-            return
-        
-        from_idx = interval_indices[0]
+        from_idx, _ = self.pair_model.interval_indices(row)
         
         # Atualizar a classificação da interação "De"
-        interactions = self.current_ticket.get('interactions', [])
+        interactions = self.sorted_interactions
         if 0 <= from_idx < len(interactions):
-            interactions[from_idx]['classification'] = new_classification
+            interaction = interactions[from_idx]
+            previous_classification = interaction.get('classification')
+            interaction['classification'] = new_classification
             
             # Atualizar a visualização
-            if new_classification == 'C':
-                attributed_to = "Suporte"
-                attribution_color = QColor(125, 131, 221)
-            elif new_classification == 'A':
-                attributed_to = "Cliente"
-                attribution_color = QColor(52, 237, 140)
-            elif new_classification == 'B':
-                attributed_to = "Bug"
-                attribution_color = QColor(255, 230, 230)
-            elif new_classification == 'I':
-                attributed_to = "Ignorado"
-                attribution_color = QColor(192, 192, 192) 
-            else:
-                attributed_to = "Desconhecido"
-                attribution_color = QColor(255, 255, 255)
-            
-            # Atualizar item na tabela
-            attributed_item = self.item(row, 6)
-            attributed_item.setText(attributed_to)
-            attributed_item.setBackground(attribution_color)
-            attributed_item.setToolTip(f"Baseado na classificação: {new_classification}")
+            self.show_attribution(row, new_classification)
             
             # Emitir sinal de que houve alteração
             # Modificação aqui: Procurar o diálogo correto
@@ -346,48 +369,36 @@ class InteractionPairTableView(QTableWidget):
                 parent = parent.parent()
             
             if dialog and hasattr(dialog, 'on_classification_changed'):
-                dialog.on_classification_changed()
+                dialog.on_classification_changed(interaction, previous_classification)
             else:
                 # Se não encontrar, ao menos recalcular os tempos para refletir a alteração
                 print("Aviso: Não foi possível encontrar o método on_classification_changed. Usando fallback.")
                 # Marcar como modificado diretamente
                 if dialog:
                     dialog.modified = True
-                    
-            # Colorir a linha inteira baseado na nova atribuição
-            if attributed_to == "Cliente":
-                color = QColor(52, 237, 140)  # Azul claro
-            elif attributed_to == "Suporte":
-                color = QColor(125, 131, 221)  # Verde claro
-            elif attributed_to == "Bug":
-                color = QColor(255, 235, 162)  # Vermelho claro
-            elif attributed_to == "Ignorado":
-                color = QColor(192, 192, 192)   # Cinza claro
-            else:
-                color = QColor(255, 255, 255)  # Branco
 
-            # Aplica a cor a todas as células da linha
-            for col in range(self.columnCount()):
-                item = self.item(row, col)
-                if item:
-                    item.setBackground(color)
-                    
-            
+    def refresh_interaction(self, interaction):
+        """Atualiza apenas a linha do intervalo que começa na interação informada"""
+        row = self._row_by_interaction.get(id(interaction))
+        if row is not None:
+            self.show_attribution(row, interaction.get('classification'))
+
+    def show_attribution(self, row, classification):
+        """Atualiza a coluna "Atribuído a" e a cor da linha conforme a classificação.
+
+        O modelo lê a classificação da própria interação; basta repintar a linha.
+        """
+        self.pair_model.refresh_row(row)
         
     def show_interval_details(self, row):
         """Mostra detalhes das interações no intervalo selecionado"""
         if not self.current_ticket:
             return
             
-        # Obter índices das interações
-        interval_indices = self.item(row, 0).data(Qt.UserRole)
-        if not interval_indices or len(interval_indices) != 2:
-            return
-            
-        from_idx, to_idx = interval_indices
+        from_idx, to_idx = self.pair_model.interval_indices(row)
         
         # Obter as interações
-        interactions = self.current_ticket.get('interactions', [])
+        interactions = self.sorted_interactions
         if 0 <= from_idx < len(interactions) and 0 <= to_idx < len(interactions):
             from_interaction = interactions[from_idx]
             to_interaction = interactions[to_idx]
@@ -398,15 +409,15 @@ class InteractionPairTableView(QTableWidget):
     
     def format_time(self, seconds):
         """Formata segundos para HH:MM:SS"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+        return InteractionPairModel.format_time(seconds)
 
 
 class InteractionPairDetailsDialog(QDialog):
     """Diálogo para mostrar detalhes de um par de interações"""
     
+    # ID do ticket cujas mensagens terminaram de carregar (emitido na thread da busca)
+    messages_loaded = pyqtSignal(str)
+    
     def __init__(self, from_interaction, to_interaction, calculator, parent=None):
         super().__init__(parent)
         self.from_interaction = from_interaction
@@ -419,6 +430,26 @@ class InteractionPairDetailsDialog(QDialog):
         
         self.initUI()
         
+        # Mensagens fora do cache chegam da API em segundo plano
+        self.message_sources = message_sources([{'interactions': [from_interaction, to_interaction]}])
+        self.messages_loaded.connect(self.on_messages_loaded)
+        # A mesma referência é usada para remover o ouvinte (cada acesso ao sinal gera outro objeto)
+        self._message_listener = self.messages_loaded.emit
+        for source in self.message_sources:
+            source.add_listener(self._message_listener)
+        self.finished.connect(self.release_message_sources)
+        
+    def release_message_sources(self):
+        """Deixa de receber os avisos das fontes de mensagens (diálogo fechado)"""
+        for source in self.message_sources:
+            source.remove_listener(self._message_listener)
+        
+    def on_messages_loaded(self, ticket_id):
+        """Exibe as mensagens quando as do ticket do intervalo chegam"""
+        if str(getattr(self.from_interaction, 'ticket_id', None)) == ticket_id:
+            self.left_message.setHtml(self.from_interaction.get('message', ''))
+            self.right_message.setHtml(self.to_interaction.get('message', ''))
+        
     def initUI(self):
         layout = QVBoxLayout(self)
         
@@ -434,11 +465,11 @@ class InteractionPairDetailsDialog(QDialog):
         left_layout.addWidget(left_info)
         
         # Conteúdo da mensagem
-        left_message = QTextEdit()
-        left_message.setReadOnly(True)
-        left_message.setHtml(self.from_interaction.get('message', ''))
+        self.left_message = QTextEdit()
+        self.left_message.setReadOnly(True)
+        self.left_message.setHtml(self.from_interaction.get('message', ''))
         left_layout.addWidget(QLabel("Conteúdo:"))
-        left_layout.addWidget(left_message)
+        left_layout.addWidget(self.left_message)
         
         # Painel direito - Interação "Para"
         right_panel = QGroupBox("Interação de Destino")
@@ -449,11 +480,11 @@ class InteractionPairDetailsDialog(QDialog):
         right_layout.addWidget(right_info)
         
         # Conteúdo da mensagem
-        right_message = QTextEdit()
-        right_message.setReadOnly(True)
-        right_message.setHtml(self.to_interaction.get('message', ''))
+        self.right_message = QTextEdit()
+        self.right_message.setReadOnly(True)
+        self.right_message.setHtml(self.to_interaction.get('message', ''))
         right_layout.addWidget(QLabel("Conteúdo:"))
-        right_layout.addWidget(right_message)
+        right_layout.addWidget(self.right_message)
         
         # Adicionar painéis ao splitter
         splitter.addWidget(left_panel)
@@ -606,11 +637,16 @@ class InteractionPairDetailsDialog(QDialog):
 class InteractionClassifierDialogUpdated(QDialog):
     """Versão aprimorada do diálogo para classificação manual de interações de tickets"""
     
+    # ID do ticket cujas mensagens terminaram de carregar (emitido na thread da busca)
+    messages_loaded = pyqtSignal(str)
+    
     def __init__(self, tickets_data, parent=None):
         super().__init__(parent)
         self.tickets_data = tickets_data  # Lista de análises de tickets
         self.current_ticket_index = 0
         self.modified = False  # Flag para indicar se houve modificações
+        # Durações por intervalo de cada ticket já recalculado (índice -> IntervalBreakdown)
+        self._interval_breakdowns = {}
         
         self.setWindowTitle("Classificador de Interações")
         self.setMinimumSize(1000, 700)
@@ -619,6 +655,27 @@ class InteractionClassifierDialogUpdated(QDialog):
         self.init_ui()
         self.load_current_ticket()
         
+        # Mensagens fora do cache chegam da API em segundo plano; o sinal traz o aviso para esta thread
+        self.message_sources = message_sources(self.tickets_data)
+        self.messages_loaded.connect(self.on_messages_loaded)
+        # A mesma referência é usada para remover o ouvinte (cada acesso ao sinal gera outro objeto)
+        self._message_listener = self.messages_loaded.emit
+        for source in self.message_sources:
+            source.add_listener(self._message_listener)
+        self.finished.connect(self.release_message_sources)
+        
+    def release_message_sources(self):
+        """Deixa de receber os avisos das fontes de mensagens (diálogo fechado)"""
+        for source in self.message_sources:
+            source.remove_listener(self._message_listener)
+        
+    def on_messages_loaded(self, ticket_id):
+        """Atualiza prévias e mensagem exibida quando as mensagens do ticket atual chegam"""
+        if 0 <= self.current_ticket_index < len(self.tickets_data):
+            if str(self.tickets_data[self.current_ticket_index].get('id')) == ticket_id:
+                self.update_interaction_table()
+                self.show_selected_message()
+        
     def init_ui(self):
         """Inicializa os componentes da UI"""
         layout = QVBoxLayout()
@@ -1122,13 +1179,7 @@ class InteractionClassifierDialogUpdated(QDialog):
                     interaction['classification'] = interaction.get('sender_type', '')
             
             # Obtém o calculador de horas comerciais
-            calculator = None
-            parent = self.parent()
-            
-            if hasattr(parent, 'calculator'):
-                calculator = parent.calculator
-            elif hasattr(parent, 'analyzer') and hasattr(parent.analyzer, 'calculator'):
-                calculator = parent.analyzer.calculator
+            calculator = self.get_calculator()
             
             # Carregar na nova visualização de pares
             if calculator:
@@ -1140,15 +1191,24 @@ class InteractionClassifierDialogUpdated(QDialog):
             # Atualizar métricas
             self.update_metrics_comparison()
 
-    def on_classification_changed(self):
-        """Chamado quando uma classificação é alterada na tabela de pares"""
+    def on_classification_changed(self, interaction=None, previous_classification=None):
+        """Chamado quando uma classificação é alterada.
+
+        Com a interação alterada e as durações do ticket já calculadas, apenas
+        o intervalo dela muda de grupo; caso contrário, recalcula tudo.
+        """
         self.modified = True
         
         # Atualizar visualização tradicional em lista
         self.update_interaction_table()
         
         # Atualizar métricas
-        self.recalculate_times()
+        breakdown = self._interval_breakdowns.get(self.current_ticket_index)
+        if interaction is not None and breakdown is not None:
+            breakdown.reclassify(interaction, previous_classification)
+            self.apply_interval_breakdown(breakdown)
+        else:
+            self.recalculate_times()
 
     def reset_classifications(self):
         """Reseta todas as classificações para seus valores originais"""
@@ -1164,6 +1224,9 @@ class InteractionClassifierDialogUpdated(QDialog):
                     modified = True
             
             if modified:
+                # As durações em cache usam as classificações antigas
+                self._interval_breakdowns.pop(self.current_ticket_index, None)
+                
                 # Reset reclassified metrics to original values
                 ticket['reclassified_time_with_client'] = ticket.get('time_with_client', 0)
                 ticket['reclassified_time_with_support'] = ticket.get('time_with_support', 0)
@@ -1268,9 +1331,14 @@ class InteractionClassifierDialogUpdated(QDialog):
 
     def on_interaction_selected(self, selected, deselected):
         """Lida com seleção de interação"""
-        indexes = selected.indexes()
-        if indexes:
-            row = indexes[0].row()
+        if selected.indexes():
+            self.show_selected_message()
+            
+    def show_selected_message(self):
+        """Exibe a mensagem da interação selecionada na área de visualização"""
+        selected_rows = self.interaction_table.selectionModel().selectedRows()
+        if selected_rows:
+            row = selected_rows[0].row()
             orig_index = self.interaction_table.item(row, 0).data(Qt.UserRole)
             
             # Obtém a interação selecionada
@@ -1290,28 +1358,15 @@ class InteractionClassifierDialogUpdated(QDialog):
         orig_index = self.interaction_table.item(row, 0).data(Qt.UserRole)
         
         # Atualiza a classificação
-        self.tickets_data[self.current_ticket_index]['interactions'][orig_index]['classification'] = classification
-        self.modified = True
-        
-        # Atualiza as visualizações
-        self.update_interaction_table()
+        interaction = self.tickets_data[self.current_ticket_index]['interactions'][orig_index]
+        previous_classification = interaction.get('classification')
+        interaction['classification'] = classification
         
-        # Atualiza a visualização de pares
-        calculator = None
-        parent = self.parent()
-        
-        if hasattr(parent, 'calculator'):
-            calculator = parent.calculator
-        elif hasattr(parent, 'analyzer') and hasattr(parent.analyzer, 'calculator'):
-            calculator = parent.analyzer.calculator
-            
-        if calculator:
-            # Recarrega a visualização de pares
-            ticket = self.tickets_data[self.current_ticket_index]
-            self.pairs_table.load_ticket_data(ticket, calculator)
+        # Atualiza só a linha correspondente na visualização de pares
+        self.pairs_table.refresh_interaction(interaction)
         
-        # Recalcula métricas
-        self.recalculate_times()
+        # Atualiza a lista e as métricas
+        self.on_classification_changed(interaction, previous_classification)
 
     def apply_filters(self):
         """Aplica filtros à tabela de interações"""
@@ -1524,167 +1579,48 @@ class InteractionClassifierDialogUpdated(QDialog):
         secs = int(seconds % 60)
         return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
+    def get_calculator(self):
+        """Calculador de horas comerciais da janela principal, se houver"""
+        parent = self.parent()
+        if hasattr(parent, 'calculator'):
+            return parent.calculator
+        if hasattr(parent, 'analyzer') and hasattr(parent.analyzer, 'calculator'):
+            return parent.analyzer.calculator
+        return None
+
     def recalculate_times(self):
-        """Recalcula métricas de tempo com base nas classificações atuais"""
+        """Recalcula métricas de tempo com base nas classificações atuais.
+
+        As durações de cada intervalo ficam guardadas, para que as próximas
+        reclassificações deste ticket só movam o intervalo alterado.
+        """
         if 0 <= self.current_ticket_index < len(self.tickets_data):
             current_ticket = self.tickets_data[self.current_ticket_index]
-            interactions = current_ticket.get('interactions', [])
-            
-            # Inicializa métricas
-            time_with_client = 0
-            time_with_support = 0
-            time_in_bug = 0
-            time_ignored = 0
-            business_time_with_client = 0
-            business_time_with_support = 0
-            business_time_in_bug = 0
-            business_time_ignored = 0
             
             # Obtém o calculador de horas comerciais
-            calculator = None
-            parent = self.parent()
-            
-            if hasattr(parent, 'calculator'):
-                calculator = parent.calculator
-            elif hasattr(parent, 'analyzer') and hasattr(parent.analyzer, 'calculator'):
-                calculator = parent.analyzer.calculator
+            calculator = self.get_calculator()
             
             if calculator:
-                # Ordena interações por data
-                sorted_interactions = sorted(
-                    [i for i in interactions if i.get('date')],
-                    key=lambda x: x.get('date')
-                )
-                
-                # Obtém data de criação do ticket
-                creation_dt = None
-                if hasattr(parent, 'analyzer') and hasattr(parent.analyzer, 'parse_datetime') and current_ticket.get('creation_date'):
-                    creation_dt = parent.analyzer.parse_datetime(current_ticket.get('creation_date'))
-                else:
-                    try:
-                        dt_str = current_ticket.get('creation_date').rsplit('-', 1)[0].strip()
-                        creation_dt = datetime.datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-                    except Exception as e:
-                        print(f"Erro ao analisar data de criação: {e}")
-                
-                if not creation_dt:
+                breakdown = IntervalBreakdown(current_ticket, calculator)
+                if not breakdown.valid:
                     print("Falha ao analisar data de criação")
                     return
-                    
-                # Verifica se o ticket está finalizado
-                end_date = None
-                is_finished = False
-                
-                # Verifica end_date
-                if current_ticket.get('end_date'):
-                    try:
-                        dt_str = current_ticket.get('end_date').rsplit('-', 1)[0].strip()
-                        end_date = datetime.datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-                        is_finished = True
-                    except Exception as e:
-                        print(f"Erro ao analisar data final: {e}")
-                
-                # Verifica situation
-                situation_id = current_ticket.get('situation', {}).get('id')
-                situation_date = None
-                
-                if situation_id in [4, 5]:  # Cancelada ou Finalizada
-                    is_finished = True
-                    try:
-                        dt_str = current_ticket.get('situation', {}).get('apply_date', '').rsplit('-', 1)[0].strip()
-                        situation_date = datetime.datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-                    except Exception as e:
-                        print(f"Erro ao analisar data da situação: {e}")
-                
-                # Determina a data final para cálculos (pode ser a data atual)
-                current_dt = datetime.datetime.now()
-                if is_finished:
-                    if end_date:
-                        final_date = end_date
-                    elif situation_date:
-                        final_date = situation_date
-                    else:
-                        # Se não houver data de finalização, usa a data da última interação
-                        if sorted_interactions:
-                            final_date = sorted_interactions[-1].get('date')
-                        else:
-                            final_date = current_dt
-                else:
-                    final_date = current_dt
-                
-                if len(sorted_interactions) > 0:
-                    # Inicializa com a primeira interação (ou criação do ticket)
-                    last_dt = creation_dt
-                    last_classification = 'C'  # Assumir que o ticket começa com o cliente
-                    
-                    # Processa todas as interações
-                    for interaction in sorted_interactions:
-                        current_dt = interaction.get('date')
-                        current_classification = interaction.get('classification')
-                        
-                        # Calcula tempos
-                        time_diff = (current_dt - last_dt).total_seconds()
-                        business_time = calculator.calculate_business_time(last_dt, current_dt)
-                        
-                        # Atribui tempo com base na classificação anterior
-                        if last_classification == 'C':
-                            time_with_support += time_diff
-                            business_time_with_support += business_time
-                        elif last_classification == 'A':
-                            time_with_client += time_diff
-                            business_time_with_client += business_time
-                        elif last_classification == 'B':
-                            time_in_bug += time_diff
-                            business_time_in_bug += business_time
-                        elif last_classification == 'I':
-                            time_ignored += time_diff
-                            business_time_ignored += business_time
-                        
-                        # Atualiza para próxima iteração
-                        last_dt = current_dt
-                        last_classification = current_classification
-                    
-                    # Calcula o tempo entre a última interação e a data final
-                    if last_dt < final_date:
-                        # Tempo entre a última interação e a data final
-                        time_diff = (final_date - last_dt).total_seconds()
-                        business_time = calculator.calculate_business_time(last_dt, final_date)
-                        
-                        # Atribui tempo com base na classificação da última interação
-                        if last_classification == 'C':
-                            time_with_support += time_diff
-                            business_time_with_support += business_time
-                        elif last_classification == 'A':
-                            time_with_client += time_diff
-                            business_time_with_client += business_time
-                        elif last_classification == 'B':
-                            time_in_bug += time_diff
-                            business_time_in_bug += business_time
-                        elif last_classification == 'I':
-                            time_ignored += time_diff
-                            business_time_ignored += business_time
-                
-                # Atualiza o ticket com os valores calculados
-                current_ticket['reclassified_time_with_client'] = time_with_client
-                current_ticket['reclassified_time_with_support'] = time_with_support
-                current_ticket['reclassified_time_in_bug'] = time_in_bug
-                current_ticket['reclassified_time_ignored'] = time_ignored
-                current_ticket['reclassified_business_time_with_client'] = business_time_with_client
-                current_ticket['reclassified_business_time_with_support'] = business_time_with_support
-                current_ticket['reclassified_business_time_in_bug'] = business_time_in_bug
-                current_ticket['reclassified_business_time_ignored'] = business_time_ignored
-                
-                # Garantir que as alterações sejam refletidas no dicionário original
-                self.tickets_data[self.current_ticket_index] = current_ticket
-                
-                # Marca que houve modificações
-                self.modified = True
                 
-                # Atualiza a interface
-                self.update_metrics_comparison()
+                self._interval_breakdowns[self.current_ticket_index] = breakdown
+                self.apply_interval_breakdown(breakdown)
             else:
                 QMessageBox.warning(self, "Erro", "Calculadora de horário comercial não encontrada.")
 
+    def apply_interval_breakdown(self, breakdown):
+        """Grava os totais no ticket atual e atualiza a comparação de métricas"""
+        breakdown.apply_to(self.tickets_data[self.current_ticket_index])
+        
+        # Marca que houve modificações
+        self.modified = True
+        
+        # Atualiza a interface
+        self.update_metrics_comparison()
+
     def export_to_csv(self):
         """Exporta dados reclassificados para CSV"""
         if 0 <= self.current_ticket_index < len(self.tickets_data):
@@ -1825,12 +1761,20 @@ class InteractionClassifierDialogUpdated(QDialog):
                 # Solicita local para salvar o arquivo
                 filename, _ = QFileDialog.getSaveFileName(
                     self, 
-                    "Salvar CSV", 
+                    "Salvar Exportação", 
                     f"ticket_reclassificado_{ticket.get('protocol', '')}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv", 
-                    "Arquivos CSV (*.csv)"
+                    "Arquivos CSV (*.csv);;Arquivos Parquet (*.parquet);;Arquivos Arrow (*.arrow)"
                 )
                 
-                if filename:
+                file_format = tabular_format(filename) if filename else None
+                if file_format:
+                    if calculator is None:
+                        raise Exception("Calculador de horas comerciais indisponível para a exportação")
+                    # Tabelas tipadas do ticket, com os intervalos na classificação atual (requer pyarrow)
+                    paths = write_export_tables(filename, [ticket], calculator, file_format)
+                    QMessageBox.information(self, "Exportação Concluída",
+                                            "Dados exportados para:\n" + "\n".join(paths.values()))
+                elif filename:
                     # Cria arquivo CSV
                     with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
                         writer = csv.writer(csvfile)
@@ -1873,98 +1817,6 @@ class InteractionClassifierDialogUpdated(QDialog):
         # Chama o método da classe base para aceitar o diálogo
         super().accept()
 
-    # Função de integração para o aplicativo principal
-    def update_main_app_for_enhanced_classifier():
-        """Atualiza o aplicativo principal para usar o classificador aprimorado"""
-        
-        # Substitui a função results_tab.analyze_selected para usar a nova versão do diálogo
-        def new_analyze_selected(self):
-            """Nova versão da função analyze_selected que usa o diálogo aprimorado"""
-            selected_ids = self.get_selected_tickets()
-            
-            if not selected_ids:
-                QMessageBox.warning(self, "Seleção Inválida", "Selecione pelo menos um ticket para analisar.")
-                return
-                
-            # Create progress dialog
-            progress = QMessageBox()
-            progress.setWindowTitle("Processando")
-            progress.setText("Analisando tickets, aguarde...")
-            progress.setStandardButtons(QMessageBox.NoButton)
-            progress.show()
-            QApplication.processEvents()
-            
-            try:
-                # Fetch details and analyze
-                analysis_results = []
-                
-                for ticket_id in selected_ids:
-                    # Get ticket details
-                    print(f"Obtendo detalhes do ticket ID: {ticket_id}")
-                    response = self.api_client.get_ticket_details(ticket_id)
-                    
-                    if not response.get('error', True):
-                        # Analyze ticket data from response
-                        ticket_data = response.get('data', {})
-                        analysis = self.analyzer.analyze_ticket(ticket_data)
-                        analysis_results.append(analysis)
-                    else:
-                        progress.close()
-                        QMessageBox.warning(
-                            self, 
-                            "API Error", 
-                            f"Erro ao obter detalhes do ticket {ticket_id}: {response.get('message', 'Erro desconhecido')}"
-                        )
-                        return
-                        
-                # Close progress
-                progress.close()
-                
-                # If we have results to show
-                if analysis_results:
-                    # Ask what to do
-                    dialog = QMessageBox()
-                    dialog.setWindowTitle("Resultados da Análise")
-                    dialog.setText("Análise concluída. O que você gostaria de fazer?")
-                    dialog.addButton("Ver Resumo", QMessageBox.AcceptRole)
-                    dialog.addButton("Classificar Interações", QMessageBox.ActionRole)
-                    dialog.addButton("Cancelar", QMessageBox.RejectRole)
-                    
-                    action = dialog.exec_()
-                    
-                    if action == 0:  # View Summary
-                        # Mostra o resumo com os dados originais
-                        self.show_analysis_results(analysis_results)
-                        
-                    elif action == 1:  # Classify Interactions
-                        # Abre o diálogo de classificação APRIMORADO em vez do original
-                        classifier = InteractionClassifierDialogUpdated(analysis_results, self)
-                        classifier_result = classifier.exec_()
-                        
-                        # Se o usuário clicou em Apply Changes
-                        if classifier_result == QDialog.Accepted:
-                            print("Dialog accepted, checking data before showing results:")
-                            for i, ticket in enumerate(classifier.tickets_data):
-                                print(f"Ticket {i}, client time: {ticket.get('reclassified_time_with_client', 0)/3600:.2f}h, "
-                                    f"support time: {ticket.get('reclassified_time_with_support', 0)/3600:.2f}h")
-                                
-                                # Ajuste temporário para depuração - forçar valores diretamente nos dados originais
-                                for key in ['time_with_client', 'time_with_support', 'business_time_with_client', 'business_time_with_support']:
-                                    if f'reclassified_{key}' in ticket:
-                                        ticket[key] = ticket[f'reclassified_{key}']
-                            
-                            # Usamos diretamente os dados da instância classifier
-                            self.show_analysis_results(classifier.tickets_data)
-                else:
-                    QMessageBox.warning(self, "Sem Resultados", "Não foi possível analisar nenhum dos tickets selecionados.")
-                    
-            except Exception as e:
-                progress.close()
-                QMessageBox.critical(self, "Error", str(e))
-        
-        # Retorna a função atualizada para ser usada no aplicativo principal
-        return new_analyze_selected
-    
     def show_help(self):
         """Exibe ajuda sobre as regras de cálculo"""
         help_dialog = QDialog(self)
@@ -2086,100 +1938,11 @@ def install_enhanced_classifier():
         # Obtém a classe ResultsTab do módulo principal
         ResultsTab = main_module.ResultsTab
         
-        # Guarda a função original para referência
-        original_analyze_selected = ResultsTab.analyze_selected
-        
-        # Define a nova função
-        def new_analyze_selected(self):
-            """Nova versão da função analyze_selected que usa o diálogo aprimorado"""
-            print("EXECUTANDO analyze_selected NOVA!")
-            
-            selected_ids = self.get_selected_tickets()
-            
-            if not selected_ids:
-                QMessageBox.warning(self, "Seleção Inválida", "Selecione pelo menos um ticket para analisar.")
-                return
-                
-            # Create progress dialog
-            progress = QMessageBox()
-            progress.setWindowTitle("Processando")
-            progress.setText("Analisando tickets, aguarde...")
-            progress.setStandardButtons(QMessageBox.NoButton)
-            progress.show()
-            QApplication.processEvents()
-            
-            try:
-                # Fetch details and analyze
-                analysis_results = []
-                
-                for ticket_id in selected_ids:
-                    # Get ticket details
-                    print(f"Obtendo detalhes do ticket ID: {ticket_id}")
-                    response = self.api_client.get_ticket_details(ticket_id)
-                    
-                    if not response.get('error', True):
-                        # Analyze ticket data from response
-                        ticket_data = response.get('data', {})
-                        analysis = self.analyzer.analyze_ticket(ticket_data)
-                        analysis_results.append(analysis)
-                    else:
-                        progress.close()
-                        QMessageBox.warning(
-                            self, 
-                            "API Error", 
-                            f"Erro ao obter detalhes do ticket {ticket_id}: {response.get('message', 'Erro desconhecido')}"
-                        )
-                        return
-                        
-                # Close progress
-                progress.close()
-                
-                # If we have results to show
-                if analysis_results:
-                    # Ask what to do
-                    dialog = QMessageBox()
-                    dialog.setWindowTitle("Resultados da Análise")
-                    dialog.setText("Análise concluída. O que você gostaria de fazer?")
-                    dialog.addButton("Ver Resumo", QMessageBox.AcceptRole)
-                    dialog.addButton("Classificar Interações", QMessageBox.ActionRole)
-                    dialog.addButton("Cancelar", QMessageBox.RejectRole)
-                    
-                    action = dialog.exec_()
-                    
-                    if action == 0:  # View Summary
-                        # Mostra o resumo com os dados originais
-                        self.show_analysis_results(analysis_results)
-                        
-                    elif action == 1:  # Classify Interactions
-                        # Abre o diálogo de classificação APRIMORADO em vez do original
-                        classifier = InteractionClassifierDialogUpdated(analysis_results, self)
-                        classifier_result = classifier.exec_()
-                        
-                        # Se o usuário clicou em Apply Changes
-                        if classifier_result == QDialog.Accepted:
-                            print("Dialog accepted, checking data before showing results:")
-                            for i, ticket in enumerate(classifier.tickets_data):
-                                print(f"Ticket {i}, client time: {ticket.get('reclassified_time_with_client', 0)/3600:.2f}h, "
-                                    f"support time: {ticket.get('reclassified_time_with_support', 0)/3600:.2f}h")
-                                
-                                # Ajuste temporário para depuração - forçar valores diretamente nos dados originais
-                                for key in ['time_with_client', 'time_with_support', 'business_time_with_client', 'business_time_with_support']:
-                                    if f'reclassified_{key}' in ticket:
-                                        ticket[key] = ticket[f'reclassified_{key}']
-                            
-                            # Usamos diretamente os dados da instância classifier
-                            self.show_analysis_results(classifier.tickets_data)
-                else:
-                    QMessageBox.warning(self, "Sem Resultados", "Não foi possível analisar nenhum dos tickets selecionados.")
-                    
-            except Exception as e:
-                progress.close()
-                QMessageBox.critical(self, "Error", str(e))
-        
-        # Substitui o método na classe (isso afeta todas as instâncias)
-        ResultsTab.analyze_selected = new_analyze_selected
+        # A busca e a análise continuam em segundo plano (ResultsTab.start_analysis);
+        # só o diálogo de classificação é substituído pela versão aprimorada
+        ResultsTab.classifier_dialog_class = InteractionClassifierDialogUpdated
         
-        print("Método ResultsTab.analyze_selected substituído com sucesso!")
+        print("Diálogo de classificação de ResultsTab substituído com sucesso!")
     else:
         print("ERRO: Não foi possível encontrar a classe ResultsTab no módulo principal!")
         
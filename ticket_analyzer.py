@@ -3,26 +3,34 @@ import re
 import sys
 import os
 import json
-import configparser
+import threading
 import datetime
-import pandas as pd
-import requests
-from dateutil import parser
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QLabel, QLineEdit, QPushButton, QComboBox, QDateEdit, 
-                            QTabWidget, QTableWidget, QTableWidgetItem, QHeaderView,
-                            QCheckBox, QMessageBox, QGroupBox, QFormLayout, QSpinBox,
-                            QTimeEdit, QDialog, QScrollArea, QFileDialog, QGridLayout, QTextEdit, QSplitter, QFrame )
-from PyQt5.QtCore import Qt, QDate, QTime, QDateTime, QSize
-from PyQt5.QtCore import QTimer, QPropertyAnimation
+                            QTabWidget, QTableWidget, QTableWidgetItem, QTableView, QHeaderView,
+                            QCheckBox, QMessageBox, QGroupBox, QFormLayout, QSpinBox, QDoubleSpinBox,
+                            QTimeEdit, QDialog, QScrollArea, QFileDialog, QGridLayout, QTextEdit, QSplitter, QFrame,
+                            QProgressDialog )
+from PyQt5.QtCore import Qt, QDate, QTime, QDateTime, QSize, QAbstractTableModel, QModelIndex
+from PyQt5.QtCore import QTimer, QPropertyAnimation, QThread, pyqtSignal
 from PyQt5.QtGui import QColor, QIcon, QCursor, QPixmap
-
-from enhanced_classifier import (
-    InteractionPairTableView,
-    InteractionPairDetailsDialog, 
-    InteractionClassifierDialogUpdated,
-    install_enhanced_classifier
+from ticket_cache import TicketDetailCache
+from ticket_store import TicketStore
+from ticket_sync import TicketSync
+from ticket_dates import parse_api_datetime
+from ticket_core import (
+    ConfigManager,
+    ApiClient,
+    BusinessHoursCalculator,
+    TicketAnalyzer,
+    build_search_params,
+    collect_status_types,
+    effective_time
 )
+from ticket_export import tabular_format, write_export_csv, write_export_tables
+from ticket_fetcher import FetchCancelled, TicketDetailFetcher, TimeSlicedTicketSearch
+from ticket_interactions import MessageSource, message_sources
+from ticket_search import SearchIndex
 
 class TimeCalculatorDialog(QDialog):
     """Diálogo para calcular diferença de tempo entre duas datas, considerando horário comercial,
@@ -237,6 +245,9 @@ class TimeCalculatorDialog(QDialog):
 class InteractionClassifierDialog(QDialog):
     """Diálogo para classificação manual de interações de tickets"""
     
+    # ID do ticket cujas mensagens terminaram de carregar (emitido na thread da busca)
+    messages_loaded = pyqtSignal(str)
+    
     def __init__(self, tickets_data, parent=None):
         super().__init__(parent)
         self.tickets_data = tickets_data  # Lista de análises de tickets
@@ -250,6 +261,27 @@ class InteractionClassifierDialog(QDialog):
         self.init_ui()
         self.load_current_ticket()
         
+        # Mensagens fora do cache chegam da API em segundo plano; o sinal traz o aviso para esta thread
+        self.message_sources = message_sources(self.tickets_data)
+        self.messages_loaded.connect(self.on_messages_loaded)
+        # A mesma referência é usada para remover o ouvinte (cada acesso ao sinal gera outro objeto)
+        self._message_listener = self.messages_loaded.emit
+        for source in self.message_sources:
+            source.add_listener(self._message_listener)
+        self.finished.connect(self.release_message_sources)
+        
+    def release_message_sources(self):
+        """Deixa de receber os avisos das fontes de mensagens (diálogo fechado)"""
+        for source in self.message_sources:
+            source.remove_listener(self._message_listener)
+        
+    def on_messages_loaded(self, ticket_id):
+        """Atualiza prévias e mensagem exibida quando as mensagens do ticket atual chegam"""
+        if 0 <= self.current_ticket_index < len(self.tickets_data):
+            if str(self.tickets_data[self.current_ticket_index].get('id')) == ticket_id:
+                self.update_interaction_table()
+                self.show_selected_message()
+        
     def init_ui(self):
         """Inicializa os componentes da UI"""
         layout = QVBoxLayout()
@@ -597,9 +629,14 @@ class InteractionClassifierDialog(QDialog):
                 
     def on_interaction_selected(self, selected, deselected):
         """Lida com seleção de interação"""
-        indexes = selected.indexes()
-        if indexes:
-            row = indexes[0].row()
+        if selected.indexes():
+            self.show_selected_message()
+            
+    def show_selected_message(self):
+        """Exibe a mensagem da interação selecionada na área de visualização"""
+        selected_rows = self.interaction_table.selectionModel().selectedRows()
+        if selected_rows:
+            row = selected_rows[0].row()
             orig_index = self.interaction_table.item(row, 0).data(Qt.UserRole)
             
             # Obtém a interação selecionada
@@ -846,15 +883,7 @@ class InteractionClassifierDialog(QDialog):
                 )
                 
                 # Obtém data de criação do ticket
-                creation_dt = None
-                if hasattr(parent, 'analyzer') and hasattr(parent.analyzer, 'parse_datetime') and current_ticket.get('creation_date'):
-                    creation_dt = parent.analyzer.parse_datetime(current_ticket.get('creation_date'))
-                else:
-                    try:
-                        dt_str = current_ticket.get('creation_date').rsplit('-', 1)[0].strip()
-                        creation_dt = datetime.datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-                    except Exception as e:
-                        print(f"Erro ao analisar data de criação: {e}")
+                creation_dt = parse_api_datetime(current_ticket.get('creation_date'))
                 
                 if not creation_dt:
                     print("Falha ao analisar data de criação")
@@ -866,12 +895,11 @@ class InteractionClassifierDialog(QDialog):
                 
                 # Verifica end_date
                 if current_ticket.get('end_date'):
-                    try:
-                        dt_str = current_ticket.get('end_date').rsplit('-', 1)[0].strip()
-                        end_date = datetime.datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
+                    end_date = parse_api_datetime(current_ticket.get('end_date'))
+                    if end_date:
                         is_finished = True
-                    except Exception as e:
-                        print(f"Erro ao analisar data final: {e}")
+                    else:
+                        print(f"Erro ao analisar data final: {current_ticket.get('end_date')}")
                 
                 # Verifica situation
                 situation_id = current_ticket.get('situation', {}).get('id')
@@ -879,11 +907,9 @@ class InteractionClassifierDialog(QDialog):
                 
                 if situation_id in [4, 5]:  # Cancelada ou Finalizada
                     is_finished = True
-                    try:
-                        dt_str = current_ticket.get('situation', {}).get('apply_date', '').rsplit('-', 1)[0].strip()
-                        situation_date = datetime.datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-                    except Exception as e:
-                        print(f"Erro ao analisar data da situação: {e}")
+                    situation_date = parse_api_datetime(current_ticket.get('situation', {}).get('apply_date'))
+                    if not situation_date:
+                        print("Erro ao analisar data da situação")
                 
                 # Determina a data final para cálculos (pode ser a data atual)
                 current_dt = datetime.datetime.now()
@@ -1039,250 +1065,6 @@ class InteractionClassifierDialog(QDialog):
         # Chama o método da classe base para aceitar o diálogo
         super().accept()    
 
-class ConfigManager:
-    """Gerencia a persistência da configuração da aplicação"""
-    
-    def __init__(self):
-        self.config_file = os.path.join(os.path.expanduser("~"), ".ticket_analyzer_config.ini")
-        self.config = configparser.ConfigParser()
-        self.load_config()
-    
-    def load_config(self):
-        """Carrega configuração do arquivo se ele existir"""
-        if os.path.exists(self.config_file):
-            self.config.read(self.config_file)
-        else:
-            # Inicializa com seções padrão
-            self.config['API'] = {'token': ''}
-            self.config['BusinessHours'] = {
-                'monday': '08:00-12:00,14:00-18:00',
-                'tuesday': '08:00-12:00,14:00-18:00',
-                'wednesday': '08:00-12:00,14:00-18:00',
-                'thursday': '08:00-12:00,14:00-18:00',
-                'friday': '08:00-12:00,14:00-18:00',
-                'saturday': '',
-                'sunday': ''
-            }
-            self.save_config()
-    
-    def save_config(self):
-        """Salva configuração no arquivo"""
-        with open(self.config_file, 'w') as f:
-            self.config.write(f)
-    
-    def get_api_token(self):
-        """Obtém o token da API"""
-        return self.config['API'].get('token', '')
-    
-    def set_api_token(self, token):
-        """Define o token da API"""
-        self.config['API']['token'] = token
-        self.save_config()
-    
-    def get_business_hours(self):
-        """Obtém configuração de horário comercial"""
-        return dict(self.config['BusinessHours'])
-    
-    def set_business_hours(self, day, hours):
-        """Define horário comercial para um dia específico"""
-        self.config['BusinessHours'][day] = hours
-        self.save_config()
-        
-    def get_holidays(self):
-        """Obtém lista de feriados"""
-        if 'Holidays' not in self.config:
-            self.config['Holidays'] = {}
-        
-        holidays = []
-        for date_str, description in self.config['Holidays'].items():
-            try:
-                date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
-                holidays.append((date, description))
-            except ValueError:
-                pass  # Ignora datas inválidas
-        
-        return sorted(holidays, key=lambda x: x[0])  # Ordena por data
-
-    def add_holiday(self, date, description):
-        """Adiciona um feriado"""
-        if 'Holidays' not in self.config:
-            self.config['Holidays'] = {}
-            
-        date_str = date.strftime("%Y-%m-%d")
-        self.config['Holidays'][date_str] = description
-        self.save_config()
-        
-    def remove_holiday(self, date):
-        """Remove um feriado"""
-        if 'Holidays' not in self.config:
-            return
-            
-        date_str = date.strftime("%Y-%m-%d")
-        if date_str in self.config['Holidays']:
-            del self.config['Holidays'][date_str]
-            self.save_config()
-
-
-class ApiClient:
-    """Gerencia comunicação com a API do TomTicket"""
-    
-    BASE_URL = "https://api.tomticket.com/v2.0"
-    
-    def __init__(self, token):
-        self.token = token
-        self.headers = {
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'Authorization': f'Bearer {token}'
-        }
-    
-    def list_tickets(self, params):
-        """Obtém lista de tickets com base nos parâmetros de filtro"""
-        endpoint = f"{self.BASE_URL}/ticket/list"
-        print("Enviando parâmetros:", params)
-        
-        try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                raise Exception(f"Erro na API: {response.status_code} - {response.text}")
-        except Exception as e:
-            raise Exception(f"Falha na chamada da API list_tickets: {str(e)}")
-    
-    def get_ticket_details(self, ticket_id):
-        """Obtém informações detalhadas sobre um ticket específico"""
-        endpoint = f"{self.BASE_URL}/ticket/detail"
-        
-        # Parâmetros para a requisição GET
-        params = {'ticket_id': ticket_id}
-        
-        try:
-            # Imprimir informações para debug
-            print(f"Chamando API: {endpoint}")
-            print(f"Headers: {self.headers}")
-            print(f"Parâmetros: {params}")
-            
-            # Usar GET em vez de POST
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            
-            print(f"Resposta: {response.text}")
-            
-            if response.status_code == 200:
-                result = response.json()
-                # Check for valid data structure
-                if not result.get('error', True) and result.get('data'):
-                    return result
-                else:
-                    raise Exception(f"Erro na resposta da API: {result.get('message', 'Erro desconhecido')}")
-            else:
-                raise Exception(f"Erro na API: {response.status_code} - {response.text}")
-        except Exception as e:
-            raise Exception(f"Falha na chamada da API: {e}, endpoint = {endpoint}, params = {params}")
-
-
-class BusinessHoursCalculator:
-    """Calcula tempo de trabalho com base no horário comercial, excluindo feriados"""
-    
-    def __init__(self, business_hours_config, holidays=None):
-        self.business_hours = self._parse_business_hours(business_hours_config)
-        self.holidays = set(date for date, _ in (holidays or []))  # Conjunto de datas de feriados
-        
-    def _parse_business_hours(self, config):
-        """Analisa horário comercial de formato string para dados estruturados"""
-        business_hours = {}
-        days_map = {
-            'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
-            'friday': 4, 'saturday': 5, 'sunday': 6
-        }
-        
-        for day, hours_str in config.items():
-            day_index = days_map.get(day.lower())
-            if day_index is None:
-                continue
-                
-            ranges = []
-            if hours_str:
-                for time_range in hours_str.split(','):
-                    if '-' in time_range:
-                        start, end = time_range.split('-')
-                        start_h, start_m = map(int, start.split(':'))
-                        end_h, end_m = map(int, end.split(':'))
-                        ranges.append((
-                            datetime.time(start_h, start_m),
-                            datetime.time(end_h, end_m)
-                        ))
-            
-            business_hours[day_index] = ranges
-            
-        return business_hours
-    
-    def is_business_hours(self, dt):
-        """Verifica se um datetime está dentro do horário comercial e não é feriado"""
-        # Verifica se a data é feriado
-        if dt.date() in self.holidays:
-            return False
-            
-        # Verifica horário comercial
-        day_of_week = dt.weekday()
-        time_ranges = self.business_hours.get(day_of_week, [])
-        
-        if not time_ranges:
-            return False
-            
-        current_time = dt.time()
-        return any(start <= current_time <= end for start, end in time_ranges)
-    
-    def calculate_business_time(self, start_dt, end_dt):
-        """Calcula tempo comercial entre dois datetimes em segundos, excluindo feriados"""
-        if start_dt >= end_dt:
-            return 0
-            
-        # Inicializa variáveis
-        current_dt = start_dt
-        total_seconds = 0
-        
-        # Itera através de cada dia
-        while current_dt.date() <= end_dt.date():
-            # Pula se for feriado
-            if current_dt.date() in self.holidays:
-                current_dt = datetime.datetime.combine(
-                    current_dt.date() + datetime.timedelta(days=1),
-                    datetime.time(0, 0)
-                )
-                continue
-                
-            day_ranges = self.business_hours.get(current_dt.weekday(), [])
-            
-            if not day_ranges:
-                # Sem horário comercial para este dia
-                current_dt = datetime.datetime.combine(
-                    current_dt.date() + datetime.timedelta(days=1),
-                    datetime.time(0, 0)
-                )
-                continue
-                
-            for start_time, end_time in day_ranges:
-                range_start = datetime.datetime.combine(current_dt.date(), start_time)
-                range_end = datetime.datetime.combine(current_dt.date(), end_time)
-                
-                # Pula se o intervalo estiver completamente antes de start_dt ou depois de end_dt
-                if range_end <= start_dt or range_start >= end_dt:
-                    continue
-                    
-                # Ajusta intervalo se sobrepor com start_dt ou end_dt
-                calc_start = max(range_start, start_dt)
-                calc_end = min(range_end, end_dt)
-                
-                # Adiciona segundos neste intervalo
-                total_seconds += (calc_end - calc_start).total_seconds()
-            
-            # Move para o próximo dia
-            current_dt = datetime.datetime.combine(
-                current_dt.date() + datetime.timedelta(days=1),
-                datetime.time(0, 0))
-            
-        return total_seconds
 
 def recalculate_times(self):
     """Recalcula métricas de tempo com base nas classificações atuais"""
@@ -1364,245 +1146,11 @@ def classify_interaction(self, interaction_index, new_classification):
         self.recalculate_times()
 
 
-class TicketAnalyzer:
-    """Analisa dados de tickets e calcula métricas de tempo"""
-    
-    def __init__(self, business_hours_calculator):
-        self.calculator = business_hours_calculator
-    
-    def parse_datetime(self, datetime_str):
-        """Analisa string de datetime da API e retorna no formato %Y-%m-%d %H:%M:%S (sem fuso e sem milissegundos)."""
-        if not datetime_str:
-            return None
-        try:
-            dt = parser.parse(datetime_str)
-            # Remove fuso horário e milissegundos, e retransforma em datetime sem tzinfo
-            dt_clean = dt.replace(tzinfo=None, microsecond=0)
-            return dt_clean  # Retorna datetime no formato padrão
-        except (ValueError, TypeError):
-            return None
-    
-    def seconds_to_time_format(self, seconds):
-        """Converte segundos para formato HH:MM:SS"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
-    
-    
-    def get_status_at_time(self, statuses, timestamp):
-        """
-        Determina o status do ticket em um momento específico
-        
-        Args:
-            statuses (list): Lista de status do ticket, cada um com start e end
-            timestamp (datetime): Data/hora para verificar
-            
-        Returns:
-            str: Descrição do status ativo naquele momento ou None se nenhum status ativo
-        """
-        if not timestamp or not statuses:
-            return None
-            
-        # Ordena os status por data de início
-        sorted_statuses = sorted(
-            statuses, 
-            key=lambda x: self.parse_datetime(x.get('start', {}).get('operator', {}).get('date')) or datetime.datetime.min
-        )
-        
-        # Encontra o status ativo no momento do timestamp
-        for status in sorted_statuses:
-            start_dt = self.parse_datetime(status.get('start', {}).get('operator', {}).get('date'))
-            end_dt = self.parse_datetime(status.get('end', {}).get('operator', {}).get('date'))
-            
-            # Verifica se o timestamp está dentro do intervalo deste status
-            if start_dt and start_dt <= timestamp and (not end_dt or timestamp <= end_dt):
-                return status.get('description')
-                
-        # Se chegou aqui, não encontrou um status ativo
-        return None
-        
-    def analyze_ticket(self, ticket_details):
-        """Analisa interações de ticket e calcula métricas de tempo"""
-        result = {
-            'id': ticket_details.get('id'),
-            'protocol': ticket_details.get('protocol'),
-            'subject': ticket_details.get('subject'),
-            'customer_name': ticket_details.get('customer', {}).get('name'),
-            'customer_email': ticket_details.get('customer', {}).get('email'),
-            'creation_date': ticket_details.get('creation_date'),
-            'creation_dt': self.parse_datetime(ticket_details.get('creation_date')),
-            'first_reply_date': ticket_details.get('first_reply_date'),
-            'end_date': ticket_details.get('end_date'),
-            'current_situation': ticket_details.get('situation', {}).get('description'),
-            'situation_id': ticket_details.get('situation', {}).get('id'),
-            'situation_apply_date': ticket_details.get('situation', {}).get('apply_date'),
-            'time_with_client': 0,  # em segundos
-            'time_with_support': 0,  # em segundos
-            'status_time': {},       # tempo total em cada status
-            'status_business_time': {},  # tempo em horário comercial para cada status
-            'business_time_with_client': 0,  # em segundos durante horário comercial
-            'business_time_with_support': 0,  # em segundos durante horário comercial
-            'time_to_first_status': 0,  # tempo da criação até o primeiro status
-            'business_time_to_first_status': 0,  # tempo comercial da criação até o primeiro status
-            'interactions': [],  # Lista para armazenar todas as interações
-        }
-        
-        # Obtém respostas e status
-        replies = ticket_details.get('replies', [])
-        statuses = ticket_details.get('status', []) if isinstance(ticket_details.get('status'), list) else []
-        
-        # Ordena por data
-        replies.sort(key=lambda x: self.parse_datetime(x.get('date')) or datetime.datetime.min)
-        statuses.sort(key=lambda x: self.parse_datetime(x.get('start', {}).get('operator', {}).get('date')) or datetime.datetime.min)
-        
-        # Calcula tempo com cliente vs suporte baseado nas respostas
-        creation_dt = self.parse_datetime(ticket_details.get('creation_date'))
-        if creation_dt:
-            creation_interaction = {
-                'id': 'creation',
-                'date': creation_dt,
-                'sender_type': 'C',  # Assume que o ticket é criado pelo cliente
-                'classification': 'C',  # Classificação inicial igual ao tipo
-                'sender': ticket_details.get('customer', {}).get('name', 'Cliente'),
-                'message': 'Ticket criado',
-                'status': None,
-                'has_attachments': False,
-                'is_virtual': True  # Marca como interação virtual
-            }
-            result['interactions'].append(creation_interaction)
-            
-        
-        # Determina se o ticket está finalizado
-        is_finished = False
-        end_dt = None
-        
-        # Verifica end_date
-        if ticket_details.get('end_date'):
-            end_dt = self.parse_datetime(ticket_details.get('end_date'))
-            is_finished = True
-        
-        # Verifica situation
-        situation_id = ticket_details.get('situation', {}).get('id')
-        situation_dt = self.parse_datetime(ticket_details.get('situation', {}).get('apply_date'))
-        
-        if situation_id in [4, 5]:  # Cancelada ou Finalizada
-            is_finished = True
-            if not end_dt and situation_dt:
-                end_dt = situation_dt
-        
-        # Define data final para cálculos
-        final_date = datetime.datetime.now()
-        if is_finished and end_dt:
-            final_date = end_dt
-        
-        # Inicializa com a criação do ticket
-        last_dt = creation_dt
-        last_sender = 'C'  # Assumindo que o ticket começa com o cliente
-        
-        # Processar interações (replies) - APENAS UM LOOP
-        for reply in replies:
-            interaction = {
-                'id': reply.get('id'),
-                'date': self.parse_datetime(reply.get('date')),
-                'sender_type': reply.get('sender_type'),  # Original
-                'classification': reply.get('sender_type'),  # Classificação atual (inicialmente igual ao original)
-                'sender': reply.get('sender'),
-                'message': reply.get('message'),
-                'status': self.get_status_at_time(statuses, self.parse_datetime(reply.get('date'))),
-                'has_attachments': len(reply.get('attachments', [])) > 0
-            }
-            result['interactions'].append(interaction)
-            
-            current_dt = interaction['date']
-            sender_type = interaction['sender_type']
-            
-            if not current_dt or not sender_type:
-                continue
-                
-            time_diff = (current_dt - last_dt).total_seconds()
-            business_time = self.calculator.calculate_business_time(last_dt, current_dt)
-            
-            # Se o último remetente foi cliente, o tempo foi com suporte
-            if last_sender == 'C':
-                result['time_with_support'] += time_diff
-                result['business_time_with_support'] += business_time
-            # Se o último remetente foi suporte, o tempo foi com cliente
-            elif last_sender == 'A':
-                result['time_with_client'] += time_diff
-                result['business_time_with_client'] += business_time
-                
-            last_dt = current_dt
-            last_sender = sender_type
-        
-        # Calcula tempo da última resposta até agora/fim
-        if last_dt and last_dt < final_date:
-            time_diff = (final_date - last_dt).total_seconds()
-            business_time = self.calculator.calculate_business_time(last_dt, final_date)
-            
-            # Se o último remetente foi cliente, o tempo é com suporte
-            if last_sender == 'C':
-                result['time_with_support'] += time_diff
-                result['business_time_with_support'] += business_time
-            # Se o último remetente foi suporte, o tempo é com cliente
-            elif last_sender == 'A':
-                result['time_with_client'] += time_diff
-                result['business_time_with_client'] += business_time
-        
-        # Calcula tempo da criação até o primeiro status
-        if statuses and creation_dt:
-            first_status_start = self.parse_datetime(statuses[0].get('start', {}).get('operator', {}).get('date'))
-            if first_status_start:
-                result['time_to_first_status'] = (first_status_start - creation_dt).total_seconds()
-                # Calcula tempo em horário comercial
-                result['business_time_to_first_status'] = self.calculator.calculate_business_time(
-                    creation_dt, first_status_start
-                )
-        
-        # LOOP SEPARADO PARA CALCULAR TEMPO EM CADA STATUS
-        # Calcula tempo em cada status
-        for status in statuses:
-            start_dt = self.parse_datetime(status.get('start', {}).get('operator', {}).get('date'))
-            end_dt = self.parse_datetime(status.get('end', {}).get('operator', {}).get('date'))
-            status_desc = status.get('description')
-            
-            if not start_dt or not status_desc:
-                continue
-                
-            # Usa data final se fornecida, caso contrário usa agora ou data final do ticket
-            if not end_dt:
-                if is_finished and end_dt:
-                    end_dt = end_dt
-                else:
-                    end_dt = final_date
-                    
-            # Calcula tempo neste status (total e horário comercial)
-            time_diff = (end_dt - start_dt).total_seconds()
-            business_time = self.calculator.calculate_business_time(start_dt, end_dt)
-            
-            # Adiciona ao dicionário de tempo total por status
-            if status_desc in result['status_time']:
-                result['status_time'][status_desc] += time_diff
-            else:
-                result['status_time'][status_desc] = time_diff
-                
-            # Adiciona ao dicionário de tempo em horário comercial por status
-            if status_desc in result['status_business_time']:
-                result['status_business_time'][status_desc] += business_time
-            else:
-                result['status_business_time'][status_desc] = business_time
-        
-        # Ordenar interações por data (mantive caso ainda haja necessidade)
-        result['interactions'].sort(key=lambda x: x['date'] or datetime.datetime.min)
-            
-        return result
-
-
-
-
 class BusinessHoursDialog(QDialog):
     """Dialog for configuring business hours"""
     
+    calendar_changed = pyqtSignal()  # horário comercial salvo na configuração
+    
     def __init__(self, config_manager, parent=None):
         super().__init__(parent)
         self.config_manager = config_manager
@@ -1798,6 +1346,7 @@ class BusinessHoursDialog(QDialog):
                 
             # Save to config
             self.config_manager.set_business_hours(day, ','.join(ranges))
+        self.calendar_changed.emit()
         
         QMessageBox.information(self, "Sucesso", "Horários comerciais salvos com sucesso!")    
         self.accept()
@@ -1806,6 +1355,8 @@ class BusinessHoursDialog(QDialog):
 class HolidaysDialog(QDialog):
     """Dialog for managing holidays"""
     
+    calendar_changed = pyqtSignal()  # feriados incluídos ou excluídos na configuração
+    
     def __init__(self, config_manager, parent=None):
         super().__init__(parent)
         self.config_manager = config_manager
@@ -2054,6 +1605,7 @@ class HolidaysDialog(QDialog):
         
         # Add to config
         self.config_manager.add_holiday(date, description)
+        self.calendar_changed.emit()
         
         # Reload table
         self.all_holidays = self.config_manager.get_holidays()
@@ -2083,6 +1635,7 @@ class HolidaysDialog(QDialog):
             if reply == QMessageBox.Yes:
                 # Remove from config
                 self.config_manager.remove_holiday(date)
+                self.calendar_changed.emit()
                 
                 # Reload table
                 self.all_holidays = self.config_manager.get_holidays()
@@ -2128,6 +1681,9 @@ class HolidaysDialog(QDialog):
                 # Data inválida
                 pass
         
+        if count > 0:
+            self.calendar_changed.emit()
+        
         # Recarrega a tabela
         self.all_holidays = self.config_manager.get_holidays()
         self.apply_filter()
@@ -2147,6 +1703,8 @@ class FilterTab(QWidget):
         super().__init__()
         self.api_client = api_client
         self.results_tab = results_tab
+        self.search_worker = None
+        self.sync_worker = None
         self.init_ui()
         
     def init_ui(self):
@@ -2322,6 +1880,13 @@ class FilterTab(QWidget):
         
         # Botões de Ação
         button_layout = QHBoxLayout()
+        
+        # Ignorar o cache local de detalhes (força nova busca na API durante a análise)
+        self.bypass_cache = QCheckBox("Ignorar cache local")
+        self.bypass_cache.setToolTip("Busca novamente na API os detalhes de todos os tickets analisados, "
+                                     "inclusive os finalizados já salvos em disco")
+        self.bypass_cache.toggled.connect(self.on_bypass_cache_toggled)
+        button_layout.addWidget(self.bypass_cache)
         button_layout.addStretch()
         
         clear_btn = QPushButton("Limpar Filtros")
@@ -2340,7 +1905,7 @@ class FilterTab(QWidget):
         """)
         clear_btn.clicked.connect(self.clear_filters)
         
-        search_btn = QPushButton("Pesquisar Tickets")
+        self.search_btn = search_btn = QPushButton("Pesquisar Tickets")
         search_btn.setStyleSheet("""
             QPushButton {
                 background-color: #3498DB;
@@ -2356,7 +1921,28 @@ class FilterTab(QWidget):
         """)
         search_btn.clicked.connect(self.search_tickets)
         
+        # Sincronização incremental com o banco local (apenas o que mudou desde a última vez)
+        self.sync_btn = QPushButton("Sincronizar")
+        self.sync_btn.setToolTip("Carrega os tickets já sincronizados para estes filtros e busca na API apenas "
+                                 "os tickets novos, alterados ou em aberto, da data inicial até hoje")
+        self.sync_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #2ECC71;
+                color: white;
+                padding: 10px 20px;
+                border-radius: 4px;
+                font-weight: bold;
+                font-size: 14px;
+            }
+            QPushButton:hover {
+                background-color: #27AE60;
+            }
+        """)
+        self.sync_btn.clicked.connect(self.sync_tickets)
+        self.sync_btn.setVisible(self.results_tab.ticket_store is not None)
+        
         button_layout.addWidget(clear_btn)
+        button_layout.addWidget(self.sync_btn)
         button_layout.addWidget(search_btn)
         
         filter_layout.addLayout(button_layout)
@@ -2371,7 +1957,7 @@ class FilterTab(QWidget):
         info_icon = QLabel("ℹ️")
         info_icon.setStyleSheet("font-size: 16px;")
         
-        tips_text = QLabel("Dica: Para resultados mais precisos, utilize o período mais curto possível. A pesquisa retorna no máximo 50 tickets.")
+        tips_text = QLabel("Dica: Para resultados mais precisos, utilize o período mais curto possível. Todas as páginas de resultados são carregadas e os tickets aparecem na aba de resultados conforme chegam.")
         tips_text.setWordWrap(True)
         tips_text.setStyleSheet("color: #9A7D0A; font-size: 12px;")
         
@@ -2385,6 +1971,10 @@ class FilterTab(QWidget):
         
         self.setLayout(main_layout)
     
+    def on_bypass_cache_toggled(self, checked):
+        """Repassa a opção de ignorar o cache para a aba de resultados"""
+        self.results_tab.bypass_cache = checked
+        
     def clear_filters(self):
         """Limpa todos os filtros para uma nova pesquisa"""
         self.date_from.setDate(QDate.currentDate().addDays(-30))
@@ -2400,98 +1990,588 @@ class FilterTab(QWidget):
             QMessageBox.warning(self, "Erro de Validação", 
                               "A data inicial não pode ser posterior à data final.")
             return
-            
-        # Mostra indicador de carregamento
-        cursor = QCursor(Qt.WaitCursor)
-        QApplication.setOverrideCursor(cursor)
         
-        try:
-            # Monta os parâmetros
-            params = {}
+        if self.search_worker is not None and self.search_worker.isRunning():
+            # Durante a pesquisa, o botão a cancela (as páginas já recebidas são mantidas)
+            self.search_worker.cancel()
+            self.search_btn.setEnabled(False)
+            self.search_btn.setText("Cancelando...")
+            return
+        
+        params = self.build_search_params()
+        print("Parâmetros finais:", params)
+        
+        # As páginas são buscadas em segundo plano e exibidas conforme chegam
+        self.results_tab.clear_results()
+        self.search_btn.setText("Cancelar Pesquisa")
+        
+        worker = TicketSearchWorker(self.api_client, params, self.results_tab.fetch_concurrency, self)
+        worker.page_loaded.connect(self.on_page_loaded)
+        worker.search_finished.connect(self.on_search_finished)
+        worker.search_cancelled.connect(self.on_search_cancelled)
+        worker.search_failed.connect(self.on_search_failed)
+        self.search_worker = worker
+        worker.start()
+    
+    def sync_filters(self):
+        """Data inicial e filtros da sincronização (o período vai sempre até hoje)"""
+        return {
+            'date_from': self.date_from.date().toString("yyyy-MM-dd"),
+            'situation': self.situation.currentData(),
+            'priority': self.priority.currentData(),
+            'category_id': self.category.currentData(),
+        }
+    
+    def create_ticket_sync(self):
+        return TicketSync(self.api_client, self.results_tab.analyzer, self.results_tab.ticket_store,
+                          self.results_tab.fetch_concurrency, self.results_tab.detail_cache)
+    
+    def load_synced_tickets(self):
+        """Exibe os tickets já sincronizados para os filtros atuais, sem acessar a API"""
+        tickets = self.create_ticket_sync().load_tickets(**self.sync_filters())
+        self.results_tab.clear_results()
+        if tickets:
+            self.results_tab.append_results(tickets)
+            self.show_results_tab()
+        return len(tickets)
+    
+    def sync_tickets(self):
+        """Sincroniza os tickets dos filtros atuais com o banco local, em segundo plano"""
+        if self.sync_worker is not None and self.sync_worker.isRunning():
+            self.sync_worker.cancel()
+            self.sync_btn.setEnabled(False)
+            self.sync_btn.setText("Cancelando...")
+            return
+        
+        if self.search_worker is not None and self.search_worker.isRunning():
+            QMessageBox.information(self, "Pesquisa em Andamento", "Aguarde a conclusão da pesquisa atual.")
+            return
+        
+        # O que já foi sincronizado aparece na hora; a tabela é recarregada ao final
+        self.load_synced_tickets()
+        
+        worker = TicketSyncWorker(self.create_ticket_sync(), self.sync_filters(), self)
+        worker.progress.connect(
+            lambda done, total: self.sync_btn.setText(f"Cancelar ({done} de {total})")
+        )
+        worker.sync_finished.connect(self.on_sync_finished)
+        worker.sync_cancelled.connect(self.on_sync_cancelled)
+        worker.sync_failed.connect(self.on_sync_failed)
+        self.sync_worker = worker
+        self.search_btn.setEnabled(False)
+        self.sync_btn.setText("Cancelar Sincronização")
+        worker.start()
+    
+    def on_sync_finished(self, summary):
+        self.reset_sync_button()
+        total = self.load_synced_tickets()
+        message = (f"{summary['listed']} tickets listados, {summary['analyzed']} novos, alterados ou em aberto "
+                   f"analisados.\n{total} tickets sincronizados para estes filtros.")
+        if summary.get('removed'):
+            message += f"\n{summary['removed']} ticket(s) deixaram de atender aos filtros."
+        failures = summary.get('failures') or []
+        if failures:
+            message += f"\n\n{len(failures)} ticket(s) falharam e serão buscados na próxima sincronização."
+        QMessageBox.information(self, "Sincronização Concluída", message)
+    
+    def on_sync_cancelled(self):
+        self.reset_sync_button()
+        self.load_synced_tickets()
+    
+    def on_sync_failed(self, message):
+        self.reset_sync_button()
+        QMessageBox.critical(self, "Erro na Sincronização", message)
+    
+    def reset_sync_button(self):
+        self.sync_worker = None
+        self.search_btn.setEnabled(True)
+        self.sync_btn.setEnabled(True)
+        self.sync_btn.setText("Sincronizar")
+    
+    def build_search_params(self):
+        """Monta os parâmetros de /ticket/list a partir dos filtros"""
+        return build_search_params(
+            self.date_from.date().toString("yyyy-MM-dd"),
+            self.date_to.date().toString("yyyy-MM-dd"),
+            situation=self.situation.currentData(),
+            priority=self.priority.currentData(),
+            category_id=self.category.currentData()
+        )
+    
+    def on_page_loaded(self, tickets):
+        """Acrescenta uma página de tickets à aba de resultados"""
+        first_page = not self.results_tab.tickets
+        self.results_tab.append_results(tickets)
+        if first_page:
+            self.show_results_tab()
+    
+    def on_search_finished(self, total):
+        """Finaliza a pesquisa, avisando se não houve resultados"""
+        self.reset_search_button()
+        if not total:
+            # Exibe popup se não houver resultados
+            QMessageBox.information(self, "Sem Resultados", 
+                                  "A pesquisa não retornou nenhum resultado. Tente ajustar os filtros.")
+    
+    def on_search_cancelled(self, total):
+        """Pesquisa interrompida pelo usuário"""
+        self.reset_search_button()
+        print(f"Pesquisa cancelada após {total} tickets")
+    
+    def on_search_failed(self, message):
+        """Exibe o erro da pesquisa; as páginas já carregadas são mantidas"""
+        self.reset_search_button()
+        QMessageBox.critical(self, "Erro", message)
+    
+    def reset_search_button(self):
+        self.search_btn.setEnabled(True)
+        self.search_btn.setText("Pesquisar Tickets")
+    
+    def show_results_tab(self):
+        """Procura o QTabWidget e muda para a aba de resultados"""
+        widget = self
+        while widget:
+            parent = widget.parent()
+            if not parent:
+                break
+                
+            if isinstance(parent, QTabWidget):
+                # Encontrou o QTabWidget
+                parent.setCurrentWidget(self.results_tab)
+                break
+            
+            # Tentar também com os widgets irmãos
+            for sibling in parent.children():
+                if isinstance(sibling, QTabWidget):
+                    # Verificar se nosso results_tab está entre as abas
+                    for i in range(sibling.count()):
+                        if sibling.widget(i) == self.results_tab:
+                            sibling.setCurrentWidget(self.results_tab)
+                            break
+            
+            widget = parent
 
-            # Obtém data/hora atual com timezone -0300
-            now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S-0300")
 
-            # Data inicial (00:00:00 do dia selecionado)
-            date_from = self.date_from.date().toString("yyyy-MM-dd") + " 00:00:00-0300"
-            if date_from > now:
-                date_from = now  # Garante que não está no futuro
+class TicketSearchWorker(QThread):
+    """Percorre as páginas de /ticket/list em segundo plano, emitindo cada bloco de tickets recebido"""
+    
+    page_loaded = pyqtSignal(list)  # tickets de uma página
+    search_finished = pyqtSignal(int)  # total de tickets encontrados
+    search_cancelled = pyqtSignal(int)  # total de tickets recebidos até o cancelamento
+    search_failed = pyqtSignal(str)  # mensagem de erro
+    
+    def __init__(self, api_client, params, concurrency=4, parent=None):
+        super().__init__(parent)
+        self.api_client = api_client
+        self.params = dict(params)
+        self.concurrency = concurrency
+        self._cancel_event = threading.Event()
+        
+    def cancel(self):
+        """Solicita o cancelamento; as páginas já emitidas continuam na tabela"""
+        self._cancel_event.set()
+        
+    def run(self):
+        total = 0
+        try:
+            # Períodos longos são divididos em fatias de data consultadas em paralelo
+            search = TimeSlicedTicketSearch(self.api_client, concurrency=self.concurrency)
+            for page_tickets in search.iter_pages(self.params, self._cancel_event):
+                if self._cancel_event.is_set():
+                    raise FetchCancelled()
+                total += len(page_tickets)
+                self.page_loaded.emit(page_tickets)
+        except FetchCancelled:
+            self.search_cancelled.emit(total)
+            return
+        except Exception as e:
+            self.search_failed.emit(str(e))
+            return
+        self.search_finished.emit(total)
 
-            # Data final (23:59:59 do dia selecionado)
-            date_to = self.date_to.date().toString("yyyy-MM-dd") + " 23:59:59-0300"
-            if date_to > now:
-                date_to = now  # Garante que não está no futuro
 
-            # Define os parâmetros de data para a API
-            params['creation_date_ge'] = date_from
-            params['creation_date_le'] = date_to
+class TicketSyncWorker(QThread):
+    """Executa TicketSync.sync em segundo plano"""
+    
+    progress = pyqtSignal(int, int)  # detalhes buscados, total a buscar
+    sync_finished = pyqtSignal(dict)  # resumo de TicketSync.sync
+    sync_cancelled = pyqtSignal()
+    sync_failed = pyqtSignal(str)  # mensagem de erro
+    
+    def __init__(self, ticket_sync, filters, parent=None):
+        super().__init__(parent)
+        self.ticket_sync = ticket_sync
+        self.filters = dict(filters)
+        self._cancel_event = threading.Event()
+        
+    def cancel(self):
+        """Solicita o cancelamento; as análises já gravadas são mantidas"""
+        self._cancel_event.set()
+        
+    def run(self):
+        try:
+            summary = self.ticket_sync.sync(cancel_event=self._cancel_event, on_progress=self.progress.emit,
+                                            **self.filters)
+        except FetchCancelled:
+            self.sync_cancelled.emit()
+            return
+        except Exception as e:
+            self.sync_failed.emit(str(e))
+            return
+        if self._cancel_event.is_set():
+            self.sync_cancelled.emit()
+        else:
+            self.sync_finished.emit(summary)
 
-            # Situação (use 'situation' ao invés de 'situation_id')
-            if self.situation.currentData():
-                params['situation'] = str(self.situation.currentData())
 
-            # Prioridade (API aceita vários separados por vírgula)
-            if self.priority.currentData():
-                params['priority'] = str(self.priority.currentData())
+class TicketAnalysisWorker(QThread):
+    """Busca e analisa tickets em segundo plano, mantendo a interface responsiva"""
+    
+    progress = pyqtSignal(int, int)  # tickets concluídos, total
+    ticket_failed = pyqtSignal(str, str)  # ID do ticket, mensagem de erro
+    analysis_finished = pyqtSignal(list, list)  # análises, lista de (ID, mensagem de erro)
+    
+    def __init__(self, api_client, analyzer, ticket_ids, concurrency=4, parent=None,
+                 cache=None, apply_dates=None, bypass_cache=False, store=None):
+        super().__init__(parent)
+        self.api_client = api_client
+        self.analyzer = analyzer
+        self.ticket_ids = list(ticket_ids)
+        self.concurrency = concurrency
+        self.cache = cache
+        self.apply_dates = apply_dates or {}
+        self.bypass_cache = bypass_cache
+        self.store = store
+        self._cancel_event = threading.Event()
+        
+    def cancel(self):
+        """Solicita o cancelamento; as análises já concluídas são preservadas"""
+        self._cancel_event.set()
+    
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+        
+    def run(self):
+        order = {ticket_id: index for index, ticket_id in enumerate(self.ticket_ids)}
+        analyzed = []
+        
+        def on_result(ticket_id, response):
+            # Analisa cada ticket assim que os detalhes chegam
+            if response.get('error', True):
+                raise Exception(response.get('message', 'Erro desconhecido'))
+            analysis = self.analyzer.analyze_ticket(response.get('data', {}))
+            analyzed.append((order[ticket_id], analysis))
+        
+        try:
+            fetcher = TicketDetailFetcher(self.api_client, concurrency=self.concurrency, cache=self.cache)
+            _, failures = fetcher.fetch(
+                self.ticket_ids,
+                on_result,
+                on_error=lambda ticket_id, error: self.ticket_failed.emit(str(ticket_id), str(error)),
+                on_progress=self.progress.emit,
+                cancel_event=self._cancel_event,
+                apply_dates=self.apply_dates,
+                bypass_cache=self.bypass_cache
+            )
+        except Exception as e:
+            failures = [('-', str(e))]
+        
+        # Mantém a ordem da seleção, independente da ordem de chegada
+        analyzed.sort(key=lambda item: item[0])
+        results = [analysis for _, analysis in analyzed]
+        
+        # Grava as análises no banco local, ainda fora da thread da interface
+        if self.store is not None and results:
+            try:
+                self.store.save_analyses(results)
+            except Exception as e:
+                print(f"Erro ao gravar as análises no banco local: {e}")
+        
+        self.analysis_finished.emit(results, failures)
 
-            # Categoria
-            if self.category.currentData():
-                params['category_id'] = str(self.category.currentData())
 
-            # Chamada da API
-            print("Parâmetros finais:", params)
-            result = self.api_client.list_tickets(params)
+class TicketTableModel(QAbstractTableModel):
+    """Modelo da tabela de resultados, sobre os próprios dicts da listagem de tickets.
 
-            if result.get('success'):
-                data = result.get('data', [])
-                self.results_tab.load_results(data)
-                if data:
-                    # Procurar o QTabWidget e mudar para a aba de resultados
-                    widget = self
-                    while widget:
-                        parent = widget.parent()
-                        if not parent:
-                            break
-                            
-                        if isinstance(parent, QTabWidget):
-                            # Encontrou o QTabWidget
-                            parent.setCurrentWidget(self.results_tab)
-                            break
-                        
-                        # Tentar também com os widgets irmãos
-                        for sibling in parent.children():
-                            if isinstance(sibling, QTabWidget):
-                                # Verificar se nosso results_tab está entre as abas
-                                for i in range(sibling.count()):
-                                    if sibling.widget(i) == self.results_tab:
-                                        sibling.setCurrentWidget(self.results_tab)
-                                        break
-                        
-                        widget = parent
-                else:
-                    # Exibe popup se não houver resultados
-                    QMessageBox.information(self, "Sem Resultados", 
-                                          "A pesquisa não retornou nenhum resultado. Tente ajustar os filtros.")
-            else:
-                QMessageBox.warning(self, "Erro da API", 
-                                  f"Erro: {result.get('message', 'Erro desconhecido')}")
+    O texto de cada linha só é formatado quando a linha aparece na tela (ou é
+    filtrada), e as marcações ficam em um bytearray, mais um conjunto com as
+    linhas marcadas para que a seleção custe O(marcados).
+    Com um filtro (set_filter), o modelo expõe apenas as linhas encontradas no
+    índice de busca; os métodos que recebem ou devolvem "linhas" usam a
+    posição do ticket em `tickets`, não a linha exibida.
+    """
+    
+    HEADERS = ["", "Protocolo", "Assunto", "Cliente",
+               "Prioridade", "Criado", "Prazo", "SLA",
+               "Situação", "Departamento"]
+    
+    # Nome de cada coluna (exceto a do checkbox) nas consultas do filtro
+    SEARCH_FIELDS = ["protocolo", "assunto", "cliente", "prioridade", "criado",
+                     "prazo", "sla", "situacao", "departamento"]
+    
+    # Prioridade: (texto, fundo, texto)
+    PRIORITY_STYLES = {
+        "4": ("Crítica", QColor("#FFEBEE"), QColor("#D32F2F")),
+        "3": ("Alta", QColor("#FFF3E0"), QColor("#E64A19")),
+        "2": ("Média", QColor("#E8F5E9"), QColor("#388E3C")),
+        "1": ("Baixa", QColor("#E3F2FD"), QColor("#1976D2")),
+    }
+    
+    # Situação: cor de fundo (Aberto / Fechado / Cancelado)
+    SITUATION_COLORS = {"1": QColor("#E3F2FD"), "5": QColor("#E8F5E9"), "6": QColor("#FFEBEE")}
+    
+    SLA_OK_COLORS = (QColor("#E8F5E9"), QColor("#388E3C"))
+    SLA_MISSED_COLORS = (QColor("#FFEBEE"), QColor("#D32F2F"))
+    
+    checked_changed = pyqtSignal()  # marcações alteradas
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tickets = []
+        self._rows = []  # Textos formatados de cada linha (None até a primeira exibição)
+        self._checked = bytearray()
+        self._checked_rows = set()
+        self._search_index = SearchIndex(self.SEARCH_FIELDS)
+        self._filter_text = ""
+        self._visible = None  # Linhas que passam no filtro (None = todas)
+        self._view_rows = None  # Linha do ticket -> linha exibida (montado sob demanda, com filtro)
+    
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.tickets) if self._visible is None else len(self._visible)
+    
+    def source_row(self, view_row):
+        """Posição em `tickets` do ticket exibido em `view_row`"""
+        return view_row if self._visible is None else self._visible[view_row]
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+    
+    def flags(self, index):
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        if index.column() == 0:
+            flags |= Qt.ItemIsUserCheckable
+        return flags
+    
+    @staticmethod
+    def format_date(value):
+        """'2024-01-31 14:05:00-0300' -> '31/01/2024 14:05'"""
+        if not value:
+            return ""
+        try:
+            date_parts = value.split(' ')[0].split('-')
+            time_parts = value.split(' ')[1].split(':')
+            return f"{date_parts[2]}/{date_parts[1]}/{date_parts[0]} {time_parts[0]}:{time_parts[1]}"
+        except IndexError:
+            return value
+    
+    def row_texts(self, row):
+        """Textos das colunas de uma linha, formatados na primeira consulta"""
+        texts = self._rows[row]
+        if texts is None:
+            ticket = self.tickets[row]
+            priority = str(ticket.get('priority', ''))
+            sla_accomplished = ticket.get('sla', {}).get('deadline', {}).get('accomplished', None)
+            texts = (
+                "",
+                str(ticket.get('protocol', '')),
+                str(ticket.get('subject', '')),
+                str(ticket.get('customer', {}).get('name', '')),
+                self.PRIORITY_STYLES[priority][0] if priority in self.PRIORITY_STYLES else priority,
+                self.format_date(ticket.get('creation_date', '')),
+                self.format_date(ticket.get('sla', {}).get('deadline', {}).get('date', '')),
+                "" if sla_accomplished is None else ("✓" if sla_accomplished else "✗"),
+                str(ticket.get('situation', {}).get('description', '')),
+                str(ticket.get('department', {}).get('name', '')),
+            )
+            self._rows[row] = texts
+        return texts
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = self.source_row(index.row()), index.column()
         
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", str(e))
-        finally:
-            # Remove o indicador de carregamento
-            QApplication.restoreOverrideCursor()
+        if role == Qt.DisplayRole:
+            return self.row_texts(row)[column] if column else None
+        
+        if role == Qt.CheckStateRole:
+            if column == 0:
+                return Qt.Checked if self._checked[row] else Qt.Unchecked
+            return None
+        
+        if role == Qt.UserRole:
+            return str(self.tickets[row].get('id', ''))  # ID do ticket
+        
+        ticket = self.tickets[row]
+        if role == Qt.TextAlignmentRole:
+            if column in (4, 7):
+                return Qt.AlignCenter
+        elif role == Qt.ToolTipRole:
+            if column == 2:
+                return self.row_texts(row)[2]
+            if column == 7:
+                accomplished = ticket.get('sla', {}).get('deadline', {}).get('accomplished', None)
+                if accomplished is not None:
+                    return "SLA cumprido" if accomplished else "SLA não cumprido"
+        elif role in (Qt.BackgroundRole, Qt.ForegroundRole):
+            background = foreground = None
+            if column == 4:
+                style = self.PRIORITY_STYLES.get(str(ticket.get('priority', '')))
+                if style:
+                    _, background, foreground = style
+            elif column == 7:
+                accomplished = ticket.get('sla', {}).get('deadline', {}).get('accomplished', None)
+                if accomplished is not None:
+                    background, foreground = self.SLA_OK_COLORS if accomplished else self.SLA_MISSED_COLORS
+            elif column == 8:
+                background = self.SITUATION_COLORS.get(str(ticket.get('situation', {}).get('id', '')))
+            return background if role == Qt.BackgroundRole else foreground
+        return None
+    
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole or index.column() != 0:
+            return False
+        self.set_checked([self.source_row(index.row())], value == Qt.Checked)
+        return True
+    
+    def append_tickets(self, tickets):
+        """Acrescenta tickets ao final do modelo (com filtro, só os encontrados aparecem)"""
+        if not tickets:
+            return
+        first_row = len(self.tickets)
+        
+        if self._visible is None:
+            self.beginInsertRows(QModelIndex(), first_row, first_row + len(tickets) - 1)
+        self.tickets.extend(tickets)
+        self._rows.extend([None] * len(tickets))
+        self._checked.extend(bytes(len(tickets)))
+        if self._visible is None:
+            self.endInsertRows()
+            return
+        
+        self._update_search_index()
+        matches = self._search_index.search(self._filter_text, range(first_row, len(self.tickets)))
+        if matches:
+            first_view_row = len(self._visible)
+            self.beginInsertRows(QModelIndex(), first_view_row, first_view_row + len(matches) - 1)
+            self._visible.extend(matches)
+            if self._view_rows is not None:
+                self._view_rows.update((row, view_row) for view_row, row in enumerate(matches, first_view_row))
+            self.endInsertRows()
+    
+    def clear(self):
+        """Remove todos os tickets (o filtro atual continua valendo para os próximos)"""
+        self.beginResetModel()
+        self.tickets = []
+        self._rows = []
+        self._checked = bytearray()
+        self._checked_rows = set()
+        self._search_index.clear()
+        self._visible = None if self._visible is None else []
+        self._view_rows = None
+        self.endResetModel()
+        self.checked_changed.emit()
+    
+    def _update_search_index(self):
+        """Indexa as linhas acrescentadas desde a última busca"""
+        for row in range(len(self._search_index), len(self.tickets)):
+            self._search_index.add(self.row_texts(row)[1:])
+    
+    def set_filter(self, text):
+        """Exibe apenas os tickets que atendem à consulta (vazia = todos)"""
+        self._filter_text = text
+        self._update_search_index()
+        matches = self._search_index.search(text)
+        if matches is None and self._visible is None:
+            return
+        
+        self.beginResetModel()
+        self._visible = matches
+        self._view_rows = None
+        self.endResetModel()
+    
+    def _view_row_map(self):
+        """Linha do ticket -> linha exibida, para as linhas que passam no filtro"""
+        if self._view_rows is None:
+            self._view_rows = {row: view_row for view_row, row in enumerate(self._visible or [])}
+        return self._view_rows
+    
+    def visible_rows(self):
+        """Linhas (em `tickets`) que passam no filtro atual"""
+        return range(len(self.tickets)) if self._visible is None else list(self._visible)
+    
+    def set_checked(self, rows, checked):
+        """Marca ou desmarca as linhas informadas, com um único dataChanged"""
+        value = 1 if checked else 0
+        changed = [row for row in rows if self._checked[row] != value]
+        if not changed:
+            return
+        for row in changed:
+            self._checked[row] = value
+        if checked:
+            self._checked_rows.update(changed)
+        else:
+            self._checked_rows.difference_update(changed)
+        
+        if self._visible is None:
+            view_rows = changed
+        else:
+            view_row_map = self._view_row_map()
+            view_rows = [view_row_map[row] for row in changed if row in view_row_map]
+        if view_rows:
+            self.dataChanged.emit(self.index(min(view_rows), 0), self.index(max(view_rows), 0), [Qt.CheckStateRole])
+        self.checked_changed.emit()
+    
+    def checked_rows(self, visible_only=False):
+        """Linhas marcadas, em ordem (opcionalmente só as que passam no filtro)"""
+        rows = sorted(self._checked_rows)
+        if visible_only and rows and self._visible is not None:
+            view_row_map = self._view_row_map()
+            rows = [row for row in rows if row in view_row_map]
+        return rows
 
 
 class ResultsTab(QWidget):
     """Tab for displaying ticket search results"""
     
+    # Diálogo usado em "Classificar Interações" (substituído por install_enhanced_classifier
+    # ou, na EnhancedResultsTab, carregado apenas quando o diálogo é aberto)
+    classifier_dialog_class = None
+    
+    # Quantidade de requisições paralelas ao buscar detalhes (ajustada pela MainWindow)
+    fetch_concurrency = 4
+    
+    # Cache em disco dos detalhes (TicketDetailCache) e opção de ignorá-lo (FilterTab)
+    detail_cache = None
+    bypass_cache = False
+    
+    # Banco local onde as análises são gravadas (TicketStore)
+    ticket_store = None
+    
+    # Espera (ms) após a última tecla antes de filtrar os resultados
+    FILTER_DELAY_MS = 200
+    
     def __init__(self, api_client, analyzer):
         super().__init__()
         self.api_client = api_client
         self.analyzer = analyzer
-        self.tickets = []
+        self.results_model = TicketTableModel(self)
+        self._response_time_total = 0.0
+        self._response_time_count = 0
+        self._sla_compliant = 0
         self.init_ui()
+    
+    @property
+    def tickets(self):
+        """Tickets carregados, na ordem da tabela"""
+        return self.results_model.tickets
         
     def init_ui(self):
         layout = QVBoxLayout()
@@ -2549,9 +2629,20 @@ class ResultsTab(QWidget):
         search_label = QLabel("Filtrar:")
         
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Digite para filtrar resultados")
+        self.search_input.setPlaceholderText("Filtrar (ex.: cliente:acme prioridade:alta)")
+        self.search_input.setToolTip(
+            "Todos os termos precisam aparecer no ticket. Use campo:valor para buscar em uma coluna\n"
+            "(protocolo, assunto, cliente, prioridade, criado, prazo, sla, situacao, departamento)\n"
+            "e aspas para frases, como assunto:\"nota fiscal\"."
+        )
         self.search_input.setStyleSheet("padding: 5px; border: 1px solid #CCCCCC; border-radius: 4px; max-width: 250px;")
-        self.search_input.textChanged.connect(self.filter_results)
+        
+        # Aplica o filtro só quando a digitação pausa
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(self.FILTER_DELAY_MS)
+        self.filter_timer.timeout.connect(lambda: self.filter_results(self.search_input.text()))
+        self.search_input.textChanged.connect(self.filter_timer.start)
         
         # Botões de seleção
         select_all_btn = QPushButton("Selecionar Todos")
@@ -2599,19 +2690,16 @@ class ResultsTab(QWidget):
         table_layout.setContentsMargins(10, 10, 10, 10)
         
         # Create table for results
-        self.table = QTableWidget()
-        self.table.setColumnCount(10) # Reduzi para as colunas mais importantes
-        self.table.setHorizontalHeaderLabels([
-            "", "Protocolo", "Assunto", "Cliente", 
-            "Prioridade", "Criado", "Prazo", "SLA",
-            "Situação", "Departamento"
-        ])
+        self.table = QTableView()
+        self.table.setModel(self.results_model)
         
         # Set table properties
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
         self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch) # Assunto estica
+        # Ajusta as colunas só pelas linhas visíveis (com milhares de tickets, medir todas é lento)
+        self.table.horizontalHeader().setResizeContentsPrecision(0)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 border: none;
                 gridline-color: #E0E0E0;
                 alternate-background-color: #F9F9F9;
@@ -2623,19 +2711,19 @@ class ResultsTab(QWidget):
                 border: none;
                 border-bottom: 1px solid #E0E0E0;
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 4px;
                 border-bottom: 1px solid #F0F0F0;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #EBF5FB;  /* Azul muito claro para seleção */
                 color: black;  /* Mantém o texto em preto quando selecionado */
             }
         """)
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
         self.table.verticalHeader().setVisible(False)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)
         
         table_layout.addWidget(self.table)
         layout.addWidget(table_widget, 1) # 1 = stretch
@@ -2667,9 +2755,10 @@ class ResultsTab(QWidget):
         """)
         analyze_btn.setEnabled(False)
         analyze_btn.clicked.connect(self.analyze_selected)
+        self.analyze_btn = analyze_btn
         
-        # Atualizar o estado do botão quando a seleção muda
-        self.table.itemSelectionChanged.connect(lambda: self.update_selection_count(analyze_btn))
+        # Atualizar o estado do botão quando as marcações mudam
+        self.results_model.checked_changed.connect(self.update_selection_count)
         
         actions_layout.addWidget(self.selected_count)
         actions_layout.addStretch()
@@ -2681,155 +2770,54 @@ class ResultsTab(QWidget):
         
     def load_results(self, tickets):
         """Load tickets into the table"""
-        self.tickets = tickets
-        self.table.setRowCount(len(tickets))
+        self.clear_results()
+        self.append_results(tickets)
+    
+    def clear_results(self):
+        """Remove todos os tickets da tabela e zera as estatísticas"""
+        self.results_model.clear()
+        self._response_time_total = 0.0
+        self._response_time_count = 0
+        self._sla_compliant = 0
+        
+        self.result_count.setText("0 tickets encontrados")
+        self.avg_response_time.setText("Tempo médio de resposta: -")
+        self.sla_percentage.setText("SLA cumprido: -")
+        self.update_selection_count()
+    
+    def append_results(self, tickets):
+        """Acrescenta tickets ao final da tabela (ex.: uma nova página da pesquisa)"""
+        # O filtro de texto atual também vale para as linhas novas
+        self.results_model.append_tickets(tickets)
         
         # Atualizar contador de resultados
-        self.result_count.setText(f"{len(tickets)} tickets encontrados")
-        
-        # Estatísticas
-        response_times = []
-        sla_compliant = 0
-        
-        for row, ticket in enumerate(tickets):
-            # Widget para checkbox com estilo
-            checkbox_widget = QWidget()
-            checkbox_layout = QHBoxLayout(checkbox_widget)
-            checkbox_layout.setContentsMargins(4, 0, 0, 0)
-            checkbox_layout.setAlignment(Qt.AlignCenter)
-            
-            checkbox = QCheckBox()
-            checkbox.setStyleSheet("QCheckBox { margin: 0 auto; }")
-            checkbox_layout.addWidget(checkbox)
-            
-            self.table.setCellWidget(row, 0, checkbox_widget)
-            
-            # Protocolo
-            protocol_item = QTableWidgetItem(str(ticket.get('protocol', '')))
-            protocol_item.setData(Qt.UserRole, str(ticket.get('id', '')))  # Armazena ID como dado oculto
-            self.table.setItem(row, 1, protocol_item)
-            
-            # Assunto
-            subject_item = QTableWidgetItem(str(ticket.get('subject', '')))
-            subject_item.setToolTip(str(ticket.get('subject', '')))
-            self.table.setItem(row, 2, subject_item)
-            
-            # Cliente
-            self.table.setItem(row, 3, QTableWidgetItem(str(ticket.get('customer', {}).get('name', ''))))
-            
-            # Prioridade (com cores)
-            priority = str(ticket.get('priority', ''))
-            priority_item = QTableWidgetItem(priority)
-            priority_item.setTextAlignment(Qt.AlignCenter)
-            
-            # Cores baseadas na prioridade
-            if priority == "4":  # Crítica
-                priority_item.setBackground(QColor("#FFEBEE"))
-                priority_item.setForeground(QColor("#D32F2F"))
-                priority_item.setText("Crítica")
-            elif priority == "3":  # Alta
-                priority_item.setBackground(QColor("#FFF3E0"))
-                priority_item.setForeground(QColor("#E64A19"))
-                priority_item.setText("Alta")
-            elif priority == "2":  # Média
-                priority_item.setBackground(QColor("#E8F5E9"))
-                priority_item.setForeground(QColor("#388E3C"))
-                priority_item.setText("Média")
-            elif priority == "1":  # Baixa
-                priority_item.setBackground(QColor("#E3F2FD"))
-                priority_item.setForeground(QColor("#1976D2"))
-                priority_item.setText("Baixa")
-                
-            self.table.setItem(row, 4, priority_item)
-            
-            # Data de criação (formatada)
-            creation_date = ticket.get('creation_date', '')
-            if creation_date:
-                try:
-                    # Tenta formatar a data para exibição mais legível
-                    date_parts = creation_date.split(' ')[0].split('-')
-                    time_parts = creation_date.split(' ')[1].split(':')
-                    formatted_date = f"{date_parts[2]}/{date_parts[1]}/{date_parts[0]} {time_parts[0]}:{time_parts[1]}"
-                    self.table.setItem(row, 5, QTableWidgetItem(formatted_date))
-                except:
-                    self.table.setItem(row, 5, QTableWidgetItem(creation_date))
-            else:
-                self.table.setItem(row, 5, QTableWidgetItem(""))
-            
-            # Prazo SLA
-            deadline = ticket.get('sla', {}).get('deadline', {}).get('date', '')
-            if deadline:
-                try:
-                    # Tenta formatar a data para exibição mais legível
-                    date_parts = deadline.split(' ')[0].split('-')
-                    time_parts = deadline.split(' ')[1].split(':')
-                    formatted_deadline = f"{date_parts[2]}/{date_parts[1]}/{date_parts[0]} {time_parts[0]}:{time_parts[1]}"
-                    self.table.setItem(row, 6, QTableWidgetItem(formatted_deadline))
-                except:
-                    self.table.setItem(row, 6, QTableWidgetItem(deadline))
-            else:
-                self.table.setItem(row, 6, QTableWidgetItem(""))
-            
-            # Status SLA (com cores)
-            sla_accomplished = ticket.get('sla', {}).get('deadline', {}).get('accomplished', None)
-            sla_item = QTableWidgetItem()
-            sla_item.setTextAlignment(Qt.AlignCenter)
-            
-            if sla_accomplished is not None:
-                if sla_accomplished:
-                    sla_item.setText("✓")
-                    sla_item.setToolTip("SLA cumprido")
-                    sla_item.setBackground(QColor("#E8F5E9"))
-                    sla_item.setForeground(QColor("#388E3C"))
-                    sla_compliant += 1
-                else:
-                    sla_item.setText("✗")
-                    sla_item.setToolTip("SLA não cumprido")
-                    sla_item.setBackground(QColor("#FFEBEE"))
-                    sla_item.setForeground(QColor("#D32F2F"))
-            
-            self.table.setItem(row, 7, sla_item)
-            
-            # Situação
-            situation_item = QTableWidgetItem(str(ticket.get('situation', {}).get('description', '')))
-            situation_id = str(ticket.get('situation', {}).get('id', ''))
-            
-            # Cores baseadas na situação
-            if situation_id == "1":  # Aberto
-                situation_item.setBackground(QColor("#E3F2FD"))
-            elif situation_id == "5":  # Fechado
-                situation_item.setBackground(QColor("#E8F5E9"))
-            elif situation_id == "6":  # Cancelado
-                situation_item.setBackground(QColor("#FFEBEE"))
-                
-            self.table.setItem(row, 8, situation_item)
-            
-            # Departamento
-            self.table.setItem(row, 9, QTableWidgetItem(str(ticket.get('department', {}).get('name', ''))))
+        self.result_count.setText(f"{len(self.tickets)} tickets encontrados")
+        
+        # Coletar dados para estatísticas (o texto das linhas é formatado só quando exibido)
+        for ticket in tickets:
+            if ticket.get('sla', {}).get('deadline', {}).get('accomplished', None):
+                self._sla_compliant += 1
             
-            # Coletar dados para estatísticas
-            first_reply = ticket.get('first_reply_date')
-            creation = ticket.get('creation_date')
-            if first_reply and creation:
-                try:
-                    from datetime import datetime
-                    first_reply_dt = datetime.strptime(first_reply.split('-03')[0], "%Y-%m-%d %H:%M:%S")
-                    creation_dt = datetime.strptime(creation.split('-03')[0], "%Y-%m-%d %H:%M:%S")
-                    response_time = (first_reply_dt - creation_dt).total_seconds()  # segundos
-                    response_times.append(response_time)
-                except:
-                    pass
-        
-        # Atualizar estatísticas
-        if response_times:
-            avg_time = sum(response_times) / len(response_times)
+            first_reply_dt = parse_api_datetime(ticket.get('first_reply_date'))
+            creation_dt = parse_api_datetime(ticket.get('creation_date'))
+            if first_reply_dt and creation_dt:
+                response_time = (first_reply_dt - creation_dt).total_seconds()  # segundos
+                self._response_time_total += response_time
+                self._response_time_count += 1
+        
+        self.update_statistics()
+    
+    def update_statistics(self):
+        """Atualiza o tempo médio de resposta e o percentual de SLA dos tickets carregados"""
+        if self._response_time_count:
+            avg_time = self._response_time_total / self._response_time_count
             hours = int(avg_time // 3600)
             minutes = int((avg_time % 3600) // 60)
             secs = int(avg_time % 60)
             self.avg_response_time.setText(f"Tempo médio de resposta: {hours:02d}:{minutes:02d}:{secs:02d}")
         
-        if tickets:
-            sla_pct = (sla_compliant / len(tickets)) * 100
+        if self.tickets:
+            sla_pct = (self._sla_compliant / len(self.tickets)) * 100
             self.sla_percentage.setText(f"SLA cumprido: {sla_pct:.1f}%")
             
             # Definir cor baseada na porcentagem de SLA
@@ -2848,57 +2836,36 @@ class ResultsTab(QWidget):
         selected_count = len(self.get_selected_tickets())
         self.selected_count.setText(f"{selected_count} tickets selecionados")
         
+        analyze_btn = analyze_btn or getattr(self, 'analyze_btn', None)
         if analyze_btn:
             analyze_btn.setEnabled(selected_count > 0)
     
     def filter_results(self, text):
-        """Filtra os resultados na tabela conforme o texto digitado"""
-        text = text.lower()
-        
-        for row in range(self.table.rowCount()):
-            visible = False
-            
-            # Verifica cada coluna exceto a primeira (checkbox)
-            for col in range(1, self.table.columnCount()):
-                item = self.table.item(row, col)
-                if item and text in item.text().lower():
-                    visible = True
-                    break
-            
-            # Esconde ou mostra a linha conforme o filtro
-            self.table.setRowHidden(row, not visible)
+        """Filtra os resultados na tabela conforme a consulta (ver ticket_search.parse_query)"""
+        self.filter_timer.stop()
+        self.results_model.set_filter(text)
+        self.update_selection_count()
     
     def select_all(self):
         """Select all tickets"""
-        for row in range(self.table.rowCount()):
-            if not self.table.isRowHidden(row):  # Seleciona apenas linhas visíveis
-                checkbox = self.table.cellWidget(row, 0).findChild(QCheckBox)
-                if checkbox:
-                    checkbox.setChecked(True)
+        # Seleciona apenas linhas visíveis
+        self.results_model.set_checked(self.results_model.visible_rows(), True)
         
         self.update_selection_count()
                 
     def deselect_all(self):
         """Deselect all tickets"""
-        for row in range(self.table.rowCount()):
-            checkbox = self.table.cellWidget(row, 0).findChild(QCheckBox)
-            if checkbox:
-                checkbox.setChecked(False)
+        self.results_model.set_checked(self.results_model.checked_rows(), False)
                 
         self.update_selection_count()
                 
     def get_selected_tickets(self):
         """Get IDs of selected tickets"""
-        selected = []
-        
-        for row in range(self.table.rowCount()):
-            if not self.table.isRowHidden(row):  # Considera apenas linhas visíveis
-                checkbox = self.table.cellWidget(row, 0).findChild(QCheckBox)
-                if checkbox and checkbox.isChecked():
-                    ticket_id = self.table.item(row, 1).data(Qt.UserRole)  # Obtém ID armazenado
-                    selected.append(ticket_id)
-                
-        return selected
+        # Considera apenas linhas visíveis
+        return [
+            str(self.tickets[row].get('id', ''))
+            for row in self.results_model.checked_rows(visible_only=True)
+        ]
     
     def analyze_selected(self):
         """Analyze selected tickets"""
@@ -2907,82 +2874,134 @@ class ResultsTab(QWidget):
         if not selected_ids:
             QMessageBox.warning(self, "Seleção Inválida", "Selecione pelo menos um ticket para analisar.")
             return
+        
+        if getattr(self, 'analysis_worker', None) is not None:
+            QMessageBox.information(self, "Análise em Andamento", "Aguarde a conclusão da análise atual.")
+            return
             
-        # Create progress dialog
-        progress = QMessageBox()
+        self.start_analysis(selected_ids)
+    
+    def create_progress_dialog(self, total):
+        """Cria o diálogo de progresso da análise"""
+        progress = QProgressDialog("Analisando tickets, aguarde...", "Cancelar", 0, total, self)
         progress.setWindowTitle("Processando")
-        progress.setText("Analisando tickets, aguarde...")
-        progress.setStandardButtons(QMessageBox.NoButton)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        progress.setAutoReset(False)
+        return progress
+    
+    def start_analysis(self, ticket_ids):
+        """Busca e analisa os tickets em segundo plano, exibindo o progresso"""
+        progress = self.create_progress_dialog(len(ticket_ids))
+        
+        # Data da situação atual de cada ticket (da listagem), para revalidar o cache
+        apply_dates = {
+            str(ticket.get('id', '')): (ticket.get('situation') or {}).get('apply_date')
+            for ticket in self.tickets
+        }
+        worker = TicketAnalysisWorker(
+            self.api_client, self.analyzer, ticket_ids, self.fetch_concurrency, self,
+            cache=self.detail_cache, apply_dates=apply_dates, bypass_cache=self.bypass_cache,
+            store=self.ticket_store
+        )
+        
+        failed = []
+        
+        def progress_text(done, total):
+            text = f"Analisando tickets: {done} de {total} concluídos..."
+            if failed:
+                text += f"\n{len(failed)} ticket(s) com falha (detalhes ao final)"
+            return text
+        
+        def on_progress(done, total):
+            progress.setValue(done)
+            if not worker.is_cancelled():
+                progress.setLabelText(progress_text(done, total))
+        
+        def on_ticket_failed(ticket_id, message):
+            # Falhas aparecem durante a análise; a lista completa é exibida ao final
+            print(f"Falha ao analisar o ticket {ticket_id}: {message}")
+            failed.append(ticket_id)
+            if not worker.is_cancelled():
+                progress.setLabelText(progress_text(progress.value(), progress.maximum()))
+        
+        def on_cancel():
+            progress.setLabelText("Cancelando, aguardando requisições em andamento...")
+            worker.cancel()
+        
+        worker.progress.connect(on_progress)
+        worker.ticket_failed.connect(on_ticket_failed)
+        progress.canceled.connect(on_cancel)
+        worker.analysis_finished.connect(
+            lambda results, failures: self.on_analysis_finished(results, failures, progress)
+        )
+        worker.finished.connect(worker.deleteLater)
+        
+        self.analysis_worker = worker
         progress.show()
-        QApplication.processEvents()
+        worker.start()
+    
+    def on_analysis_finished(self, results, failures, progress):
+        """Recebe o resultado da análise em segundo plano"""
+        self.analysis_worker = None
+        progress.close()
+        
+        if failures:
+            details = "\n".join(f"Ticket {ticket_id}: {message}" for ticket_id, message in failures[:10])
+            if len(failures) > 10:
+                details += f"\n... e mais {len(failures) - 10}"
+            QMessageBox.warning(
+                self,
+                "Erro na API",
+                f"{len(failures)} ticket(s) não puderam ser analisados:\n\n{details}"
+            )
         
-        try:
-            # Fetch details and analyze
-            analysis_results = []
+        if results:
+            self.present_analysis_results(results)
+        else:
+            QMessageBox.warning(self, "Sem Resultados", "Não foi possível analisar nenhum dos tickets selecionados.")
+    
+    def present_analysis_results(self, analysis_results):
+        """Pergunta o que fazer com os tickets analisados"""
+        dialog = QMessageBox()
+        dialog.setWindowTitle("Resultados da Análise")
+        dialog.setText("Análise concluída. O que você gostaria de fazer?")
+        dialog.addButton("Ver Resumo", QMessageBox.AcceptRole)
+        dialog.addButton("Classificar Interações", QMessageBox.ActionRole)
+        dialog.addButton("Cancelar", QMessageBox.RejectRole)
+        
+        action = dialog.exec_()
+        
+        if action == 0:  # View Summary
+            # Mostra o resumo com os dados originais
+            self.show_analysis_results(analysis_results)
             
-            for ticket_id in selected_ids:
-                # Get ticket details
-                print(f"Obtendo detalhes do ticket ID: {ticket_id}")
-                response = self.api_client.get_ticket_details(ticket_id)
-                
-                if not response.get('error', True):
-                    # Analyze ticket data from response
-                    ticket_data = response.get('data', {})
-                    analysis = self.analyzer.analyze_ticket(ticket_data)
-                    analysis_results.append(analysis)
-                else:
-                    progress.close()
-                    QMessageBox.warning(
-                        self, 
-                        "Erro na API", 
-                        f"Erro ao obter detalhes do ticket {ticket_id}: {response.get('message', 'Erro desconhecido')}"
-                    )
-                    return
-                    
-            # Close progress
-            progress.close()
+        elif action == 1:  # Classify Interactions
+            self.open_classifier(analysis_results)
+    
+    def get_classifier_dialog_class(self):
+        """Classe do diálogo de classificação de interações"""
+        return self.classifier_dialog_class or InteractionClassifierDialog
+    
+    def open_classifier(self, analysis_results):
+        """Abre o diálogo de classificação e mostra o resumo se as alterações forem aplicadas"""
+        dialog_class = self.get_classifier_dialog_class()
+        classifier = dialog_class(analysis_results, self)
+        classifier_result = classifier.exec_()
+        
+        # Se o usuário clicou em Apply Changes
+        if classifier_result == QDialog.Accepted:
+            # Grava as classificações (reaplicadas nas próximas análises) e os totais reclassificados
+            if self.ticket_store is not None:
+                try:
+                    self.ticket_store.save_reclassifications(classifier.tickets_data)
+                    self.ticket_store.save_analyses(classifier.tickets_data)
+                except Exception as e:
+                    print(f"Erro ao gravar as reclassificações no banco local: {e}")
             
-            # If we have results to show
-            if analysis_results:
-                # Ask what to do
-                dialog = QMessageBox()
-                dialog.setWindowTitle("Resultados da Análise")
-                dialog.setText("Análise concluída. O que você gostaria de fazer?")
-                dialog.addButton("Ver Resumo", QMessageBox.AcceptRole)
-                dialog.addButton("Classificar Interações", QMessageBox.ActionRole)
-                dialog.addButton("Cancelar", QMessageBox.RejectRole)
-                
-                action = dialog.exec_()
-                
-                if action == 0:  # View Summary
-                    # Mostra o resumo com os dados originais
-                    self.show_analysis_results(analysis_results)
-                    
-                elif action == 1:  # Classify Interactions
-                    # Abre o diálogo de classificação
-                    classifier = InteractionClassifierDialog(analysis_results, self)
-                    classifier_result = classifier.exec_()
-                    
-                    # Se o usuário clicou em Apply Changes
-                    if classifier_result == QDialog.Accepted:
-                        print("Dialog accepted, checking data before showing results:")
-                        for i, ticket in enumerate(classifier.tickets_data):
-                            print(f"Ticket {i}, client time: {ticket.get('reclassified_time_with_client', 0)/3600:.2f}h, "
-                                f"support time: {ticket.get('reclassified_time_with_support', 0)/3600:.2f}h")
-                            
-                            # Ajuste temporário para depuração - forçar valores diretamente nos dados originais
-                            for key in ['time_with_client', 'time_with_support', 'business_time_with_client', 'business_time_with_support']:
-                                if f'reclassified_{key}' in ticket:
-                                    ticket[key] = ticket[f'reclassified_{key}']
-                        
-                        # Usamos diretamente os dados da instância classifier
-                        self.show_analysis_results(classifier.tickets_data)
-            else:
-                QMessageBox.warning(self, "Sem Resultados", "Não foi possível analisar nenhum dos tickets selecionados.")
-                
-        except Exception as e:
-            progress.close()
-            QMessageBox.critical(self, "Erro", str(e))
+            # Usamos diretamente os dados da instância classifier
+            self.show_analysis_results(classifier.tickets_data)
             
     def show_analysis_results(self, results):
         """Show analysis results in a dialog"""
@@ -3028,13 +3047,13 @@ class ResultsTab(QWidget):
                 table.setItem(row, col, cell)
             
             # Convert seconds to HH:MM:SS format and add to table with colors
-            client_time = self.analyzer.seconds_to_time_format(analysis.get('time_with_client', 0))
-            support_time = self.analyzer.seconds_to_time_format(analysis.get('time_with_support', 0))
+            client_time = self.analyzer.seconds_to_time_format(effective_time(analysis, 'time_with_client'))
+            support_time = self.analyzer.seconds_to_time_format(effective_time(analysis, 'time_with_support'))
             bug_time = self.analyzer.seconds_to_time_format(analysis.get('reclassified_time_in_bug', 0))
             ignored_time = self.analyzer.seconds_to_time_format(analysis.get('reclassified_time_ignored', 0))
             
-            business_client_time = self.analyzer.seconds_to_time_format(analysis.get('business_time_with_client', 0))
-            business_support_time = self.analyzer.seconds_to_time_format(analysis.get('business_time_with_support', 0))
+            business_client_time = self.analyzer.seconds_to_time_format(effective_time(analysis, 'business_time_with_client'))
+            business_support_time = self.analyzer.seconds_to_time_format(effective_time(analysis, 'business_time_with_support'))
             
             # Definir células com cores correspondentes
             set_time_cell(3, client_time, "#E0E0FF")  # Azul claro para Cliente
@@ -3074,24 +3093,8 @@ class ResultsTab(QWidget):
         
         layout.addWidget(title_frame)
         
-        # Combine all status types
-        all_statuses = set()
-        for analysis in results:
-            all_statuses.update(analysis.get('status_time', {}).keys())
-            all_statuses.update(analysis.get('status_business_time', {}).keys())
-        
-        # Se ainda não encontramos status, procura nos dados brutos de 'status'
-        if not all_statuses:
-            for analysis in results:
-                statuses = analysis.get('status', [])
-                if isinstance(statuses, list):
-                    for status in statuses:
-                        desc = status.get('description')
-                        if desc:
-                            all_statuses.add(desc)
-        
-        # Sorted for consistent display
-        all_statuses = sorted(all_statuses)
+        # Combine all status types (sorted for consistent display)
+        all_statuses = collect_status_types(results)
         
         # Create table for status times
         status_table = QTableWidget()
@@ -3162,80 +3165,27 @@ class ResultsTab(QWidget):
         dialog.exec_()
         
     def export_results(self, results, status_types):
-        """Export analysis results to CSV"""
-        
-        def seconds_to_time_format_util_csv(seconds):
-            """Converte segundos para formato HH:MM:SS"""
-            if seconds < 0:
-                prefix = "-"
-                seconds = abs(seconds)
-            else:
-                prefix = ""
-                
-            hours = int(seconds // 3600)
-            minutes = int((seconds % 3600) // 60)
-            secs = int(seconds % 60)
-            return f"{prefix}{hours:02d}:{minutes:02d}:{secs:02d}"
-        
+        """Export analysis results to CSV, Parquet or Arrow"""
         try:
-            # Create DataFrame
-            data = []
-            
-            for analysis in results:
-                row = {
-                    'protocol': analysis.get('protocol', ''),
-                    'subject': analysis.get('subject', ''),
-                    'client': analysis.get('customer_name', ''),
-                    'time_to_first_status': seconds_to_time_format_util_csv(analysis.get('business_time_to_first_status', 0)),
-                    'time_with_client': seconds_to_time_format_util_csv(analysis.get('time_with_client', 0)),
-                    'time_with_support': seconds_to_time_format_util_csv(analysis.get('time_with_support', 0)),
-                    'time_in_bug': seconds_to_time_format_util_csv(analysis.get('reclassified_time_in_bug', 0)),
-                    'time_ignored': seconds_to_time_format_util_csv(analysis.get('reclassified_time_ignored', 0)),
-                    'time_with_client (business)': seconds_to_time_format_util_csv(analysis.get('business_time_with_client', 0)),
-                    'time_with_support (business)': seconds_to_time_format_util_csv(analysis.get('business_time_with_support', 0)),
-                    'time_in_bug (business)': seconds_to_time_format_util_csv(analysis.get('reclassified_business_time_in_bug', 0)),
-                    'time_ignored (business)': seconds_to_time_format_util_csv(analysis.get('reclassified_business_time_ignored', 0)),
-                    'current_status': analysis.get('current_situation', '')
-                }
-                
-                # Adiciona informações de SLA
-                sla_deadline = analysis.get('sla', {}).get('deadline', {})
-                if sla_deadline:
-                    sla_date = sla_deadline.get('date', '')
-                    sla_accomplished = "Sim" if sla_deadline.get('accomplished') else "Não"
-                    row['sla_deadline'] = sla_date
-                    row['sla_accomplished'] = sla_accomplished
-                
-                # Adiciona data de criação e encerramento
-                row['creation_date'] = analysis.get('creation_date', '')
-                row['end_date'] = analysis.get('end_date', '')
-                
-                # Add status times
-                for status in status_types:
-                    # Tempo total no status
-                    time_sec = analysis.get('status_time', {}).get(status, 0)
-                    time_hours = seconds_to_time_format_util_csv(time_sec)
-                    row[f'Status: {status}'] = time_hours
-                    
-                    # Tempo comercial no status
-                    business_time_sec = analysis.get('status_business_time', {}).get(status, 0)
-                    business_time_hours = seconds_to_time_format_util_csv(business_time_sec)
-                    row[f'Status (comercial): {status}'] = business_time_hours
-                    
-                data.append(row)
-                
-            df = pd.DataFrame(data)
-            
             # Save to file
             filename, _ = QFileDialog.getSaveFileName(
                 self, 
-                "Salvar CSV", 
+                "Salvar Exportação", 
                 f"ticket_analysis_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv", 
-                "CSV Files (*.csv)"
+                "CSV Files (*.csv);;Parquet Files (*.parquet);;Arrow Files (*.arrow)"
             )
             
             if filename:
-                df.to_csv(filename, index=False, encoding='utf-8-sig')  # Usa codificação UTF-8 com BOM para melhor compatibilidade com Excel
+                file_format = tabular_format(filename)
+                if file_format:
+                    # Tabelas tipadas de tickets, tempo por status e intervalos (requer pyarrow)
+                    paths = write_export_tables(filename, results, self.analyzer.calculator, file_format)
+                    QMessageBox.information(self, "Sucesso na Exportação",
+                                            "Dados Exportados para:\n" + "\n".join(paths.values()))
+                    return
+
+                # As linhas são gravadas uma a uma, em UTF-8 com BOM (compatível com o Excel)
+                write_export_csv(filename, results, status_types)
                 QMessageBox.information(self, "Sucesso na Exportação", f"Dados Exportados para {filename}")
                 
         except Exception as e:
@@ -3355,7 +3305,7 @@ class MainWindow(QMainWindow):
         
         # Initialize API client
         token = self.config_manager.get_api_token()
-        self.api_client = ApiClient(token)
+        self.api_client = self.create_api_client(token)
         
         # Initialize business hours calculator with holidays
         business_hours_config = self.config_manager.get_business_hours()
@@ -3365,6 +3315,19 @@ class MainWindow(QMainWindow):
         # Initialize ticket analyzer
         self.analyzer = TicketAnalyzer(self.calculator)
         
+        # Cache em disco dos detalhes de tickets
+        self.detail_cache = TicketDetailCache(
+            self.config_manager.get_cache_dir(),
+            max_bytes=self.config_manager.get_cache_max_bytes()
+        )
+        
+        # Banco local das análises (opcional: sem ele, as análises só ficam em memória)
+        try:
+            self.ticket_store = TicketStore(self.config_manager.get_store_path())
+        except Exception as e:
+            print(f"Banco local de análises indisponível: {e}")
+            self.ticket_store = None
+        
         # Set window properties
         self.setWindowTitle("Analisador de Tickets de Suporte")
         self.setMinimumSize(1024, 768)
@@ -3552,10 +3515,33 @@ class MainWindow(QMainWindow):
         time_calculator_btn.setStyleSheet("padding: 3px 6px;")
         time_calculator_btn.clicked.connect(self.open_time_calculator)
         
+        # Requisições paralelas ao buscar detalhes dos tickets
+        concurrency_label = QLabel("Requisições paralelas:")
+        self.concurrency_input = QSpinBox()
+        self.concurrency_input.setRange(1, ConfigManager.MAX_FETCH_CONCURRENCY)
+        self.concurrency_input.setValue(self.config_manager.get_fetch_concurrency())
+        self.concurrency_input.setToolTip("Quantidade de tickets buscados simultaneamente durante a análise")
+        self.concurrency_input.valueChanged.connect(self.save_fetch_concurrency)
+        
+        # Limite de requisições por segundo: define a vazão máxima, qualquer que seja a quantidade paralela
+        rate_label = QLabel("Requisições/s:")
+        self.rate_input = QDoubleSpinBox()
+        self.rate_input.setRange(0.1, 100)
+        self.rate_input.setDecimals(1)
+        self.rate_input.setSingleStep(0.5)
+        self.rate_input.setValue(self.config_manager.get_requests_per_second())
+        self.rate_input.setToolTip("Limite de requisições por segundo à API, compartilhado pelas requisições "
+                                   "paralelas (a API do TomTicket aceita cerca de 100 por minuto)")
+        self.rate_input.valueChanged.connect(self.save_requests_per_second)
+        
         tools_layout.addWidget(configure_hours_btn)
         tools_layout.addWidget(manage_holidays_btn)
         tools_layout.addWidget(time_calculator_btn)
         tools_layout.addStretch()
+        tools_layout.addWidget(concurrency_label)
+        tools_layout.addWidget(self.concurrency_input)
+        tools_layout.addWidget(rate_label)
+        tools_layout.addWidget(self.rate_input)
         
         config_layout.addWidget(tools_widget)
         
@@ -3577,6 +3563,16 @@ class MainWindow(QMainWindow):
         # Create tabs
         from enhanced_results_tab import EnhancedResultsTab
         self.results_tab = EnhancedResultsTab(self.api_client, self.analyzer)
+        self.results_tab.fetch_concurrency = self.config_manager.get_fetch_concurrency()
+        self.results_tab.detail_cache = self.detail_cache
+        self.results_tab.ticket_store = self.ticket_store
+        self.analyzer.reclassifications = self.ticket_store
+        
+        # Mensagens das interações lidas do cache de detalhes (ou da API) só quando exibidas
+        self.message_source = MessageSource(self.detail_cache, self.api_client)
+        self.analyzer.message_source = self.message_source
+        if self.ticket_store is not None:
+            self.ticket_store.message_source = self.message_source
         self.filter_tab = FilterTab(self.api_client, self.results_tab)
         
         tabs.addTab(self.filter_tab, "Filtros de Pesquisa")
@@ -3635,6 +3631,15 @@ class MainWindow(QMainWindow):
         
         central_widget.setLayout(layout)
 
+    def create_api_client(self, token):
+        """Cria o cliente da API com as configurações de conexão salvas"""
+        pool_size, timeout = self.config_manager.get_connection_settings()
+        # O pool precisa comportar todas as requisições paralelas da análise, inclusive se a
+        # quantidade for aumentada depois, com o cliente já criado (conexões ociosas não custam nada)
+        pool_size = max(pool_size, ConfigManager.MAX_FETCH_CONCURRENCY)
+        return ApiClient(token, self.config_manager.get_requests_per_second(), pool_size, timeout,
+                         base_url=self.config_manager.get_api_base_url())
+        
     def toggle_config_panel(self):
         """Toggle visibility of config panel"""
         is_visible = self.config_panel.isVisible()
@@ -3652,7 +3657,9 @@ class MainWindow(QMainWindow):
         self.config_manager.set_api_token(token)
         
         # Update API client
-        self.api_client = ApiClient(token)
+        self.api_client.close()
+        self.api_client = self.create_api_client(token)
+        self.message_source.api_client = self.api_client
         self.results_tab.api_client = self.api_client
         self.filter_tab.api_client = self.api_client
         
@@ -3665,16 +3672,29 @@ class MainWindow(QMainWindow):
         
         QMessageBox.information(self, "Token Salvo", "API token foi salvo com sucesso.")
         
+    def save_fetch_concurrency(self, value):
+        """Salva a quantidade de requisições paralelas"""
+        self.config_manager.set_fetch_concurrency(value)
+        self.results_tab.fetch_concurrency = value
+    
+    def save_requests_per_second(self, value):
+        """Salva o limite de requisições por segundo e o aplica ao cliente atual"""
+        self.config_manager.set_requests_per_second(value)
+        self.api_client.rate_limiter.set_rate(value)
+        
     def configure_business_hours(self):
         """Open dialog to configure business hours"""
         dialog = BusinessHoursDialog(self.config_manager, self)
-        if dialog.exec_():
-            # Update business hours calculator
-            business_hours_config = self.config_manager.get_business_hours()
-            holidays = self.config_manager.get_holidays()
-            self.calculator = BusinessHoursCalculator(business_hours_config, holidays)
-            self.analyzer = TicketAnalyzer(self.calculator)
-            self.results_tab.analyzer = self.analyzer
+        dialog.calendar_changed.connect(self.reload_calendar)
+        dialog.exec_()
+            
+    def reload_calendar(self):
+        """Aplica ao calculador (no próprio objeto) o horário comercial e os feriados salvos.
+        
+        Analisador, abas e a calculadora de tempo compartilham o mesmo
+        calculador; o cache de tempo comercial é invalidado.
+        """
+        self.calculator.update_calendar(self.config_manager.get_business_hours(), self.config_manager.get_holidays())
             
     def open_time_calculator(self):
         """Open time calculator dialog"""
@@ -3686,13 +3706,8 @@ class MainWindow(QMainWindow):
     def manage_holidays(self):
         """Open dialog to manage holidays"""
         dialog = HolidaysDialog(self.config_manager, self)
-        if dialog.exec_():
-            # Update business hours calculator with new holidays
-            business_hours_config = self.config_manager.get_business_hours()
-            holidays = self.config_manager.get_holidays()
-            self.calculator = BusinessHoursCalculator(business_hours_config, holidays)
-            self.analyzer = TicketAnalyzer(self.calculator)
-            self.results_tab.analyzer = self.analyzer
+        dialog.calendar_changed.connect(self.reload_calendar)
+        dialog.exec_()
             
     # Adicione este método à classe MainWindow:
     def show_user_guide(self):
@@ -4027,6 +4042,9 @@ class MainWindow(QMainWindow):
     <p>O sistema tenta automaticamente novas tentativas ao atingir limites.</p>
     </blockquote>
 
+    <p>As buscas respeitam o campo <b>Requisições/s</b> do painel de configuração (padrão: 3 por segundo).
+    Aumentar as <b>Requisições paralelas</b> só acelera a análise até esse limite.</p>
+
     <h3>Perguntas Frequentes</h3>
 
     <p><b>P: Por que os tempos calculados são diferentes do TomTicket?</b><br>
@@ -4095,9 +4113,8 @@ def main():
     app = QApplication(sys.argv)
     window = MainWindow()
     
-    # Instala o classificador aprimorado
-    install_enhanced_classifier()
-    
+    # O classificador aprimorado é usado pela EnhancedResultsTab e carregado
+    # apenas na primeira classificação (ver get_classifier_dialog_class)
     window.show()
     sys.exit(app.exec_())
 
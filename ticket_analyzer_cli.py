@@ -0,0 +1,213 @@
+"""Análise de tickets em lote pela linha de comando, sem interface gráfica.
+
+Usa a mesma configuração (~/.ticket_analyzer_config.ini), o mesmo cache de
+detalhes e o mesmo cálculo da interface, e grava o CSV no formato do botão
+"Exportar para CSV". Não importa PyQt5, podendo rodar em servidores sem
+display (ex.: cron).
+
+Uso:
+    python ticket_analyzer_cli.py --from 2024-01-01 --to 2024-01-31 -o analise.csv
+"""
+import argparse
+import datetime
+import sys
+
+from ticket_cache import TicketDetailCache
+from ticket_core import (
+    ConfigManager,
+    ApiClient,
+    BusinessHoursCalculator,
+    TicketAnalyzer,
+    build_search_params,
+    collect_status_types
+)
+from ticket_export import TABULAR_FORMATS, write_export_csv, write_export_tables
+from ticket_fetcher import TicketDetailFetcher, TimeSlicedTicketSearch
+from ticket_interactions import MessageSource
+from ticket_store import TicketStore
+from ticket_sync import TicketSync
+
+
+def log(message):
+    """Mensagens de progresso vão para stderr, separadas da saída das bibliotecas"""
+    print(message, file=sys.stderr, flush=True)
+
+
+def parse_args(argv=None):
+    today = datetime.date.today().strftime("%Y-%m-%d")
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--from', dest='date_from', required=True, help="Data inicial de criação (AAAA-MM-DD)")
+    arg_parser.add_argument('--to', dest='date_to', default=today, help="Data final de criação (AAAA-MM-DD, padrão: hoje)")
+    arg_parser.add_argument('-o', '--output', help="Arquivo de saída (padrão: ticket_analysis_<data>.<formato>)")
+    arg_parser.add_argument('--format', choices=['csv'] + list(TABULAR_FORMATS), default='csv',
+                            help="Formato da exportação; parquet e arrow geram tabelas tipadas e requerem pyarrow")
+    arg_parser.add_argument('--situation', help="ID da situação (filtro da API)")
+    arg_parser.add_argument('--priority', help="Prioridades separadas por vírgula (filtro da API)")
+    arg_parser.add_argument('--category', help="ID da categoria (filtro da API)")
+    arg_parser.add_argument('--token', help="Token da API (padrão: o token salvo na configuração)")
+    arg_parser.add_argument('--api-url', help="Endereço base da API (padrão: TICKET_ANALYZER_API_URL, "
+                                              "base_url da configuração ou a API do TomTicket)")
+    arg_parser.add_argument('--concurrency', type=int, help="Requisições paralelas (padrão: o valor da configuração)")
+    arg_parser.add_argument('--requests-per-second', type=float,
+                            help="Limite de requisições por segundo à API, que define a vazão máxima "
+                                 "(padrão: o valor da configuração, 3 se não configurado)")
+    arg_parser.add_argument('--no-cache', action='store_true', help="Ignora o cache local de detalhes")
+    arg_parser.add_argument('--no-store', action='store_true', help="Não grava as análises no banco local")
+    arg_parser.add_argument('--sync', action='store_true',
+                            help="Sincroniza o banco local desde --from (tickets novos, alterados ou em aberto) "
+                                 "e exporta do banco o período pedido")
+    args = arg_parser.parse_args(argv)
+
+    for value in (args.date_from, args.date_to):
+        try:
+            datetime.datetime.strptime(value, "%Y-%m-%d")
+        except ValueError:
+            arg_parser.error(f"Data inválida: {value} (use AAAA-MM-DD)")
+    if args.date_from > args.date_to:
+        arg_parser.error("A data inicial não pode ser posterior à data final.")
+    if args.requests_per_second is not None and args.requests_per_second <= 0:
+        arg_parser.error("--requests-per-second deve ser maior que zero.")
+    if args.sync and args.no_store:
+        arg_parser.error("--sync usa o banco local e não pode ser combinado com --no-store.")
+    return args
+
+
+def on_progress(done, total):
+    if done == total or done % 50 == 0:
+        log(f"{done}/{total} tickets analisados")
+
+
+def sync_results(args, api_client, analyzer, cache, concurrency, store):
+    """Sincroniza o banco local e devolve (análises do período pedido, falhas)"""
+    ticket_sync = TicketSync(api_client, analyzer, store, concurrency, cache)
+    summary = ticket_sync.sync(args.date_from, args.situation, args.priority, args.category,
+                               on_progress=on_progress,
+                               on_listed=lambda count: log(f"{count} tickets listados..."))
+    log(f"{summary['listed']} tickets listados, {summary['analyzed']} novos, alterados ou em aberto analisados")
+    if summary['removed']:
+        log(f"{summary['removed']} tickets deixaram de atender aos filtros e saíram da listagem")
+    tickets = ticket_sync.load_tickets(args.date_from, args.situation, args.priority, args.category,
+                                       date_to=args.date_to)
+    analyses = {str(analysis['id']): analysis
+                for analysis in store.load_analyses(ticket_ids=[ticket.get('id') for ticket in tickets])}
+    # Mesma ordem da listagem (data de criação)
+    results = [analyses[str(ticket.get('id'))] for ticket in tickets if str(ticket.get('id')) in analyses]
+    return results, summary['failures']
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config_manager = ConfigManager()
+
+    token = args.token or config_manager.get_api_token()
+    if not token:
+        log("Token da API não configurado. Informe --token ou salve o token pela interface.")
+        return 1
+
+    concurrency = args.concurrency or config_manager.get_fetch_concurrency()
+    pool_size, timeout = config_manager.get_connection_settings()
+    requests_per_second = args.requests_per_second or config_manager.get_requests_per_second()
+    api_client = ApiClient(token, requests_per_second, max(pool_size, concurrency), timeout,
+                           base_url=args.api_url or config_manager.get_api_base_url())
+
+    # Banco local: recebe as análises e fornece as classificações manuais já feitas
+    store = None
+    if not args.no_store:
+        try:
+            store = TicketStore(config_manager.get_store_path())
+        except Exception as e:
+            log(f"Banco local indisponível: {e}")
+            if args.sync:
+                api_client.close()
+                return 1
+
+    calculator = BusinessHoursCalculator(config_manager.get_business_hours(), config_manager.get_holidays())
+    cache = TicketDetailCache(config_manager.get_cache_dir(), max_bytes=config_manager.get_cache_max_bytes())
+    # A exportação não usa o HTML das mensagens: as análises não o guardam (fica no cache de detalhes)
+    analyzer = TicketAnalyzer(calculator, reclassifications=store, message_source=MessageSource(cache))
+
+    try:
+        return analyze(args, api_client, analyzer, cache, concurrency, store)
+    finally:
+        api_client.close()
+        if store is not None:
+            store.close()
+
+
+def analyze(args, api_client, analyzer, cache, concurrency, store):
+    """Pesquisa (ou sincroniza), analisa e exporta; retorna o código de saída"""
+    if args.sync:
+        try:
+            results, failures = sync_results(args, api_client, analyzer, cache, concurrency, store)
+        except Exception as e:
+            log(f"Erro: {e}")
+            return 1
+        for ticket_id, message in failures:
+            log(f"Falha no ticket {ticket_id}: {message}")
+        return export(args, results, failures, analyzer.calculator)
+
+    try:
+        params = build_search_params(args.date_from, args.date_to, args.situation, args.priority, args.category)
+        tickets = []
+        for page_tickets in TimeSlicedTicketSearch(api_client, concurrency=concurrency).iter_pages(params):
+            tickets.extend(page_tickets)
+            log(f"{len(tickets)} tickets encontrados...")
+
+        if not tickets:
+            log("A pesquisa não retornou nenhum resultado.")
+            return 0
+
+        ticket_ids = [str(ticket.get('id')) for ticket in tickets]
+        apply_dates = {
+            str(ticket.get('id')): (ticket.get('situation') or {}).get('apply_date')
+            for ticket in tickets
+        }
+        order = {ticket_id: index for index, ticket_id in enumerate(ticket_ids)}
+        analyzed = []
+
+        def on_result(ticket_id, response):
+            if response.get('error', True):
+                raise Exception(response.get('message', 'Erro desconhecido'))
+            analyzed.append((order[ticket_id], analyzer.analyze_ticket(response.get('data', {}))))
+
+        fetcher = TicketDetailFetcher(api_client, concurrency=concurrency, cache=cache)
+        _, failures = fetcher.fetch(ticket_ids, on_result, on_progress=on_progress,
+                                    apply_dates=apply_dates, bypass_cache=args.no_cache)
+    except Exception as e:
+        log(f"Erro: {e}")
+        return 1
+
+    for ticket_id, message in failures:
+        log(f"Falha no ticket {ticket_id}: {message}")
+
+    # Mantém a ordem da pesquisa, independente da ordem de chegada
+    analyzed.sort(key=lambda item: item[0])
+    results = [analysis for _, analysis in analyzed]
+
+    if store is not None and results:
+        try:
+            store.save_analyses(results)
+        except Exception as e:
+            log(f"Erro ao gravar as análises no banco local: {e}")
+
+    return export(args, results, failures, analyzer.calculator)
+
+
+def export(args, results, failures, calculator):
+    """Grava o arquivo de saída no formato pedido"""
+    status_types = collect_status_types(results)
+    output = args.output or f"ticket_analysis_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.{args.format}"
+    if args.format == 'csv':
+        write_export_csv(output, results, status_types)
+    else:
+        try:
+            output = ", ".join(write_export_tables(output, results, calculator, args.format).values())
+        except Exception as e:
+            log(f"Erro: {e}")
+            return 1
+    log(f"{len(results)} tickets exportados para {output} ({len(failures)} falhas)")
+    return 1 if failures and not results else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""Análise em lote de muitos tickets com NumPy/pandas.
+
+As respostas de todos os tickets são achatadas em colunas (ticket, data,
+remetente, classificação, status) e os tempos com cliente, suporte, bug e
+ignorado (corridos e comerciais) são calculados de uma só vez: cada trecho
+entre duas interações vira uma linha, o tempo comercial sai da tabela
+cumulativa do BusinessHoursCalculator e as somas por ticket são feitas com
+`numpy.bincount`. Os valores são os mesmos de TicketAnalyzer.analyze_ticket
+(e, para as classificações B/I, do recálculo do diálogo de classificação).
+"""
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from ticket_core import StatusTimeline
+from ticket_dates import parse_api_datetime
+
+# Código numérico de cada classificação nas colunas
+CLASSIFICATION_CODES = {'C': 0, 'A': 1, 'B': 2, 'I': 3}
+
+# Métrica acumulada para o trecho que segue cada classificação
+# (após o cliente, o tempo é do suporte e vice-versa)
+METRICS_BY_CODE = ('time_with_support', 'time_with_client', 'time_in_bug', 'time_ignored')
+
+# Ordinal de 1970-01-01 (época do datetime64)
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+MICROSECONDS_PER_DAY = 86400 * 1000000
+
+
+# Sufixos de fuso aceitos pela conversão em lote; outros formatos usam parse_api_datetime
+FIXED_SUFFIXES = ('', '-03:00', '-0300')
+
+
+def parse_api_datetimes(values):
+    """Versão em lote de parse_api_datetime: converte uma coluna de datas da API.
+
+    O formato fixo é convertido pelo pandas de uma só vez; valores fora dele
+    (outros fusos, frações de segundo, formatos livres) passam um a um por
+    parse_api_datetime, com o mesmo resultado da conversão individual.
+
+    Returns:
+        Series: datetime64 sem fuso, com NaT para valores vazios ou inválidos
+    """
+    values = pd.Series(values, dtype=object)
+    present = values.notna() & values.astype(bool)
+    text = values.where(present, '').astype(str)
+    fixed = present & text.str.slice(19).isin(FIXED_SUFFIXES)
+
+    parsed = pd.to_datetime(text.str.slice(0, 19).where(fixed), format="%Y-%m-%d %H:%M:%S", errors='coerce')
+    others = present & parsed.isna()
+    if others.any():
+        parsed[others] = pd.to_datetime(
+            [parse_api_datetime(value) for value in values[others]], errors='coerce')
+    return parsed
+
+
+def flatten_tickets(analyzer, tickets, classifications=None, now=None, with_status=True):
+    """Achata as respostas dos tickets em colunas.
+
+    Args:
+        analyzer (TicketAnalyzer): usado para o status de cada resposta
+        tickets (list): dados de /ticket/detail de cada ticket
+        classifications (dict): {id do ticket: {id da resposta: classificação}} para
+            substituir o `sender_type` de respostas reclassificadas
+        now (datetime): fim dos tickets em aberto (padrão: agora)
+        with_status (bool): inclui o status ativo em cada resposta
+
+    Returns:
+        tuple: (DataFrame de tickets [ticket_id, creation_dt, final_date],
+                DataFrame de interações [ticket_id, ticket_index, date, sender_type, classification, status],
+                em que ticket_index é a linha do ticket no primeiro DataFrame; as
+                respostas de cada ticket vêm ordenadas por data, como em analyze_ticket)
+    """
+    now = now or datetime.datetime.now()
+    classifications = classifications or {}
+
+    ticket_columns = {'ticket_id': [], 'creation_date': [], 'end_date': [], 'situation_id': [], 'apply_date': []}
+    columns = {'ticket_id': [], 'ticket_index': [], 'date': [], 'sender_type': [], 'classification': []}
+
+    for ticket_index, ticket_details in enumerate(tickets):
+        ticket_id = ticket_details.get('id')
+        situation = ticket_details.get('situation', {})
+        ticket_columns['ticket_id'].append(ticket_id)
+        ticket_columns['creation_date'].append(ticket_details.get('creation_date'))
+        ticket_columns['end_date'].append(ticket_details.get('end_date'))
+        ticket_columns['situation_id'].append(situation.get('id'))
+        ticket_columns['apply_date'].append(situation.get('apply_date'))
+
+        overrides = classifications.get(ticket_id) or classifications.get(str(ticket_id)) or {}
+        for reply in ticket_details.get('replies', []):
+            sender_type = reply.get('sender_type')
+            columns['ticket_id'].append(ticket_id)
+            columns['ticket_index'].append(ticket_index)
+            columns['date'].append(reply.get('date'))
+            columns['sender_type'].append(sender_type)
+            columns['classification'].append(overrides.get(str(reply.get('id')), sender_type) if overrides else sender_type)
+
+    # Data final: end_date, ou a data da situação para tickets cancelados/finalizados, ou `now`
+    end_dt = parse_api_datetimes(ticket_columns['end_date'])
+    situation_dt = parse_api_datetimes(ticket_columns['apply_date'])
+    has_end_date = pd.Series([bool(value) for value in ticket_columns['end_date']])
+    closed_situation = pd.Series(ticket_columns['situation_id'], dtype=object).isin([4, 5])
+    end_dt = end_dt.where(~(end_dt.isna() & closed_situation), situation_dt)
+    is_finished = has_end_date | closed_situation
+    final_date = end_dt.where(is_finished & end_dt.notna(), pd.Timestamp(now))
+
+    tickets_frame = pd.DataFrame({
+        'ticket_id': ticket_columns['ticket_id'],
+        'creation_dt': parse_api_datetimes(ticket_columns['creation_date']),
+        'final_date': final_date,
+    })
+
+    # Ordena as respostas de cada ticket por data (sem data primeiro), preservando
+    # a ordem original nos empates, como o sort estável de analyze_ticket
+    interactions_frame = pd.DataFrame(columns)
+    interactions_frame['date'] = parse_api_datetimes(interactions_frame['date'])
+    date_key = interactions_frame['date'].to_numpy(dtype='datetime64[us]').astype(np.int64)
+    order = np.lexsort((date_key, interactions_frame['ticket_index'].to_numpy(dtype=np.int64)))
+    interactions_frame = interactions_frame.iloc[order].reset_index(drop=True)
+
+    interactions_frame['status'] = None
+    if with_status and len(interactions_frame):
+        interactions_frame['status'] = _reply_statuses(analyzer, tickets, interactions_frame)
+
+    return tickets_frame, interactions_frame
+
+
+def _reply_statuses(analyzer, tickets, interactions_frame):
+    """Status ativo em cada resposta (já ordenadas), pela linha do tempo de cada ticket"""
+    statuses_by_reply = []
+    timeline = None
+    current_index = None
+    dates = interactions_frame['date'].dt.to_pydatetime()
+    for ticket_index, reply_dt in zip(interactions_frame['ticket_index'], dates):
+        if ticket_index != current_index:
+            ticket_details = tickets[ticket_index]
+            statuses = ticket_details.get('status', []) if isinstance(ticket_details.get('status'), list) else []
+            timeline = StatusTimeline(statuses, analyzer.parse_datetime)
+            current_index = ticket_index
+        statuses_by_reply.append(timeline.status_at(reply_dt if not pd.isna(reply_dt) else None))
+    return statuses_by_reply
+
+
+def _to_microseconds(values):
+    """Datas (datetime ou None/NaT) em microssegundos desde a época; NaT vira o menor int64"""
+    values = pd.Series(values)
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        values = pd.to_datetime(values)
+    return values.to_numpy(dtype='datetime64[us]').astype(np.int64)
+
+
+def business_microseconds_until(table, timestamps):
+    """Versão vetorizada de BusinessHoursCalculator._business_microseconds_until.
+
+    Args:
+        table (tuple): BusinessHoursCalculator.cumulative_table cobrindo todos os dias de timestamps
+        timestamps (ndarray): microssegundos desde a época (int64)
+
+    Returns:
+        ndarray: microssegundos comerciais acumulados desde o início da tabela
+    """
+    if len(timestamps) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    days = np.floor_divide(timestamps, MICROSECONDS_PER_DAY)
+    day_us = timestamps - days * MICROSECONDS_PER_DAY
+    ordinals = days + EPOCH_ORDINAL
+
+    first, cumulative, templates, holidays = table
+    total = np.asarray(cumulative, dtype=np.int64)[ordinals - first]
+
+    # Parte do próprio dia, pelo modelo do dia da semana (date.fromordinal(1) é segunda-feira)
+    weekdays = (ordinals - 1) % 7
+    within = np.zeros(len(timestamps), dtype=np.int64)
+    for weekday, ranges in templates.items():
+        mask = weekdays == weekday
+        if not ranges or not mask.any():
+            continue
+        day_part = day_us[mask]
+        part = np.zeros(len(day_part), dtype=np.int64)
+        for start_us, end_us in ranges:
+            part += np.where(day_part > start_us, np.minimum(day_part, end_us) - start_us, 0)
+        within[mask] = part
+
+    if holidays:
+        holiday_ordinals = np.array([date.toordinal() for date in holidays], dtype=np.int64)
+        within[np.isin(ordinals, holiday_ordinals)] = 0
+
+    return total + within
+
+
+def compute_times(calculator, tickets_frame, interactions_frame):
+    """Calcula os tempos por classificação de todos os tickets em uma passada vetorizada.
+
+    Cada ticket é uma sequência criação -> respostas válidas -> data final; o
+    trecho entre dois eventos é atribuído à classificação do evento anterior,
+    como em analyze_ticket. Tickets sem data de criação ficam zerados.
+
+    Returns:
+        DataFrame: uma linha por ticket (mesma ordem de tickets_frame), indexado
+        por ticket_id, com os tempos corridos e comerciais em segundos
+    """
+    ticket_count = len(tickets_frame)
+    creation_known = tickets_frame['creation_dt'].notna().to_numpy()
+    creation_us = _to_microseconds(tickets_frame['creation_dt'])
+    final_us = _to_microseconds(tickets_frame['final_date'])
+
+    # Respostas sem data ou sem classificação são ignoradas (como em analyze_ticket)
+    classification = interactions_frame['classification']
+    valid = interactions_frame['date'].notna().to_numpy() & classification.notna().to_numpy()
+    valid &= (classification != '').to_numpy()
+    valid &= creation_known[interactions_frame['ticket_index'].to_numpy(dtype=np.int64)]
+    replies = interactions_frame[valid]
+    reply_ticket = replies['ticket_index'].to_numpy(dtype=np.int64)
+    reply_us = _to_microseconds(replies['date'])
+    reply_code = replies['classification'].map(CLASSIFICATION_CODES).fillna(-1).to_numpy(dtype=np.int64)
+
+    # O evento anterior de cada resposta é a resposta anterior do ticket ou, na primeira, a criação
+    previous_us = np.empty_like(reply_us)
+    previous_code = np.empty_like(reply_code)
+    last_us = creation_us.copy()
+    last_code = np.full(ticket_count, CLASSIFICATION_CODES['C'], dtype=np.int64)
+    if len(reply_us):
+        first_of_ticket = np.ones(len(reply_us), dtype=bool)
+        first_of_ticket[1:] = reply_ticket[1:] != reply_ticket[:-1]
+        previous_us[1:] = reply_us[:-1]
+        previous_code[1:] = reply_code[:-1]
+        previous_us[first_of_ticket] = creation_us[reply_ticket[first_of_ticket]]
+        previous_code[first_of_ticket] = CLASSIFICATION_CODES['C']
+
+        # Última resposta de cada ticket, para o trecho até a data final
+        last_of_ticket = np.ones(len(reply_us), dtype=bool)
+        last_of_ticket[:-1] = first_of_ticket[1:]
+        last_us[reply_ticket[last_of_ticket]] = reply_us[last_of_ticket]
+        last_code[reply_ticket[last_of_ticket]] = reply_code[last_of_ticket]
+
+    # Trecho final (da última interação até a data final), se houver
+    closing = creation_known & (final_us > last_us)
+    closing_ticket = np.flatnonzero(closing)
+
+    segment_ticket = np.concatenate([reply_ticket, closing_ticket])
+    segment_start = np.concatenate([previous_us, last_us[closing]])
+    segment_end = np.concatenate([reply_us, final_us[closing]])
+    segment_code = np.concatenate([previous_code, last_code[closing]])
+
+    wall_seconds = (segment_end - segment_start) / 1000000
+    forward = segment_end > segment_start
+    business_seconds = np.zeros(len(segment_ticket))
+    if calculator.supports_closed_form:
+        starts, ends = segment_start[forward], segment_end[forward]
+        if len(starts):
+            # Uma só tabela para início e fim: acumulados de tabelas diferentes não se subtraem
+            table = calculator.cumulative_table(int(starts.min() // MICROSECONDS_PER_DAY) + EPOCH_ORDINAL,
+                                                int(ends.max() // MICROSECONDS_PER_DAY) + EPOCH_ORDINAL)
+            business_us = business_microseconds_until(table, ends) - business_microseconds_until(table, starts)
+            business_seconds[forward] = business_us / 1000000
+    else:
+        # Horários com intervalos invertidos não têm tabela cumulativa: calcula trecho a trecho
+        starts = segment_start[forward].astype('datetime64[us]').astype(datetime.datetime)
+        ends = segment_end[forward].astype('datetime64[us]').astype(datetime.datetime)
+        business_seconds[forward] = [
+            calculator.calculate_business_time(start_dt, end_dt) for start_dt, end_dt in zip(starts, ends)
+        ]
+
+    result = {}
+    for code, metric in enumerate(METRICS_BY_CODE):
+        mask = segment_code == code
+        result[metric] = np.bincount(segment_ticket[mask], weights=wall_seconds[mask], minlength=ticket_count)
+        result[f'business_{metric}'] = np.bincount(
+            segment_ticket[mask], weights=business_seconds[mask], minlength=ticket_count)
+
+    return pd.DataFrame(result, index=pd.Index(tickets_frame['ticket_id'], name='ticket_id'))
+
+
+def analyze_batch(analyzer, tickets, classifications=None, now=None, with_status=False):
+    """Calcula os tempos por classificação de uma lista de tickets de uma só vez.
+
+    Returns:
+        DataFrame: uma linha por ticket, na ordem recebida, indexado por ticket_id,
+        com time_with_client, time_with_support, time_in_bug, time_ignored e as
+        versões business_* em segundos
+    """
+    tickets_frame, interactions_frame = flatten_tickets(analyzer, tickets, classifications, now, with_status)
+    return compute_times(analyzer.calculator, tickets_frame, interactions_frame)
@@ -0,0 +1,167 @@
+import json
+import os
+import re
+import threading
+import time
+
+
+class TicketDetailCache:
+    """Cache em disco das respostas de /ticket/detail, uma entrada (JSON) por ticket.
+
+    Tickets finalizados (situação 4/5 ou com end_date) não mudam mais e são
+    servidos do disco indefinidamente. Tickets abertos são considerados válidos
+    enquanto a `situation.apply_date` informada pela listagem for a mesma da
+    entrada gravada, ou, sem essa informação, por `ttl` segundos.
+    Quando o tamanho total passa de `max_bytes`, as entradas usadas há mais
+    tempo são removidas.
+    """
+
+    # Situações em que o ticket está encerrado (Cancelada / Finalizada)
+    FINISHED_SITUATIONS = (4, 5)
+
+    DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+    DEFAULT_TTL = 10 * 60
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes = None  # Calculado sob demanda na primeira gravação
+        os.makedirs(self.directory, exist_ok=True)
+
+    @classmethod
+    def is_finalized(cls, ticket_data):
+        """Indica se o ticket está encerrado e, portanto, não terá novas respostas"""
+        if ticket_data.get('end_date'):
+            return True
+        situation = ticket_data.get('situation') or {}
+        return situation.get('id') in cls.FINISHED_SITUATIONS
+
+    def _path(self, ticket_id):
+        """Caminho do arquivo de cache de um ticket"""
+        safe_id = re.sub(r'[^A-Za-z0-9_-]', '_', str(ticket_id))
+        return os.path.join(self.directory, f"{safe_id}.json")
+
+    def get(self, ticket_id, apply_date=None):
+        """Retorna a resposta em cache do ticket, ou None se ausente ou desatualizada.
+
+        Args:
+            ticket_id: ID do ticket
+            apply_date (str): `situation.apply_date` atual do ticket (da listagem), se conhecida
+        """
+        path = self._path(ticket_id)
+        entry = self._read_entry(path, ticket_id)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        valid = entry.get('finalized', False)
+        if not valid:
+            if apply_date:
+                valid = entry.get('apply_date') == apply_date
+            else:
+                valid = time.time() - entry.get('cached_at', 0) < self.ttl
+
+        if not valid:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            os.utime(path)  # Marca como usado recentemente (para a remoção por tamanho)
+        except OSError:
+            pass
+        return entry.get('response')
+
+    def _read_entry(self, path, ticket_id):
+        """Entrada gravada do ticket, ou None se ausente ou ilegível"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if str(entry.get('ticket_id')) != str(ticket_id):
+            return None
+        return entry
+
+    def read(self, ticket_id):
+        """Resposta gravada do ticket sem conferir se está atualizada, ou None.
+
+        Para dados que não mudam depois de gravados, como as mensagens das
+        respostas já enviadas; não entra nas estatísticas de acertos.
+        """
+        entry = self._read_entry(self._path(ticket_id), ticket_id)
+        return entry.get('response') if entry else None
+
+    def put(self, ticket_id, response):
+        """Grava a resposta de /ticket/detail de um ticket"""
+        ticket_data = response.get('data') or {}
+        entry = {
+            'ticket_id': str(ticket_id),
+            'cached_at': time.time(),
+            'finalized': self.is_finalized(ticket_data),
+            'apply_date': (ticket_data.get('situation') or {}).get('apply_date'),
+            'response': response,
+        }
+        path = self._path(ticket_id)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+
+        with self._lock:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            new_size = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total_bytes()
+            else:
+                self._total_bytes += new_size - old_size
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _scan_total_bytes(self):
+        """Soma o tamanho de todas as entradas em disco"""
+        total = 0
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json'):
+                    total += entry.stat().st_size
+        return total
+
+    def _evict(self):
+        """Remove as entradas menos usadas até ficar em 90% do limite"""
+        with os.scandir(self.directory) as entries:
+            files = [
+                (entry.stat().st_mtime, entry.stat().st_size, entry.path)
+                for entry in entries if entry.name.endswith('.json')
+            ]
+        files.sort()
+
+        target = self.max_bytes * 0.9
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
+
+    def clear(self):
+        """Remove todas as entradas do cache"""
+        with self._lock:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.json'):
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
+            self._total_bytes = 0
@@ -0,0 +1,1143 @@
+"""Núcleo do Ticket Analyzer sem dependência de interface gráfica.
+
+Configuração, cliente da API do TomTicket, cálculo de horário comercial,
+análise de tickets e montagem das linhas de exportação. Usado pela
+interface PyQt5 (ticket_analyzer.py) e pela linha de comando
+(ticket_analyzer_cli.py).
+"""
+import configparser
+import datetime
+import email.utils
+import heapq
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from ticket_dates import parse_api_datetime
+from ticket_fetcher import RateLimitError, TokenBucket, TransientApiError
+from ticket_interactions import Interaction, shared_text
+from ticket_intervals import IntervalBreakdown
+
+class ConfigManager:
+    """Gerencia a persistência da configuração da aplicação"""
+    
+    # Maior quantidade de requisições paralelas aceita na configuração (e na interface)
+    MAX_FETCH_CONCURRENCY = 16
+    
+    def __init__(self):
+        self.config_file = os.path.join(os.path.expanduser("~"), ".ticket_analyzer_config.ini")
+        self.config = configparser.ConfigParser()
+        self.load_config()
+    
+    def load_config(self):
+        """Carrega configuração do arquivo se ele existir"""
+        if os.path.exists(self.config_file):
+            self.config.read(self.config_file)
+        else:
+            # Inicializa com seções padrão
+            self.config['API'] = {'token': ''}
+            self.config['BusinessHours'] = {
+                'monday': '08:00-12:00,14:00-18:00',
+                'tuesday': '08:00-12:00,14:00-18:00',
+                'wednesday': '08:00-12:00,14:00-18:00',
+                'thursday': '08:00-12:00,14:00-18:00',
+                'friday': '08:00-12:00,14:00-18:00',
+                'saturday': '',
+                'sunday': ''
+            }
+            self.save_config()
+    
+    def save_config(self):
+        """Salva configuração no arquivo"""
+        with open(self.config_file, 'w') as f:
+            self.config.write(f)
+    
+    def get_api_token(self):
+        """Obtém o token da API"""
+        return self.config['API'].get('token', '')
+    
+    def set_api_token(self, token):
+        """Define o token da API"""
+        self.config['API']['token'] = token
+        self.save_config()
+    
+    def get_api_base_url(self):
+        """Endereço base da API: variável de ambiente TICKET_ANALYZER_API_URL, opção
+        base_url da seção [API] ou o endereço do TomTicket (ex.: servidor local de testes)"""
+        base_url = os.environ.get(ApiClient.BASE_URL_ENV) or self.config['API'].get('base_url', '')
+        return base_url.strip().rstrip('/') or ApiClient.BASE_URL
+    
+    def get_business_hours(self):
+        """Obtém configuração de horário comercial"""
+        return dict(self.config['BusinessHours'])
+    
+    def get_fetch_concurrency(self):
+        """Obtém a quantidade de requisições paralelas usadas ao buscar detalhes de tickets"""
+        try:
+            return min(self.MAX_FETCH_CONCURRENCY, max(1, int(self.config['API'].get('concurrency', '4'))))
+        except ValueError:
+            return 4
+    
+    def set_fetch_concurrency(self, concurrency):
+        """Define a quantidade de requisições paralelas"""
+        self.config['API']['concurrency'] = str(concurrency)
+        self.save_config()
+    
+    def get_requests_per_second(self):
+        """Obtém o limite de requisições por segundo à API"""
+        try:
+            return max(0.1, float(self.config['API'].get('requests_per_second', str(ApiClient.DEFAULT_REQUESTS_PER_SECOND))))
+        except ValueError:
+            return ApiClient.DEFAULT_REQUESTS_PER_SECOND
+    
+    def set_requests_per_second(self, requests_per_second):
+        """Define o limite de requisições por segundo à API"""
+        self.config['API']['requests_per_second'] = str(requests_per_second)
+        self.save_config()
+    
+    def get_cache_dir(self):
+        """Diretório do cache de detalhes de tickets (mesmo diretório do arquivo de configuração)"""
+        return os.path.join(os.path.dirname(self.config_file), ".ticket_analyzer_cache")
+    
+    def get_store_path(self):
+        """Banco SQLite com as análises gravadas (mesmo diretório do arquivo de configuração)"""
+        return os.path.join(os.path.dirname(self.config_file), ".ticket_analyzer_store.db")
+    
+    def get_cache_max_bytes(self):
+        """Tamanho máximo do cache de detalhes, em bytes (seção [Cache], max_size_mb)"""
+        try:
+            max_size_mb = float(self.config['Cache'].get('max_size_mb', '200')) if 'Cache' in self.config else 200
+        except ValueError:
+            max_size_mb = 200
+        return int(max_size_mb * 1024 * 1024)
+    
+    def get_connection_settings(self):
+        """Obtém tamanho do pool e timeouts (conexão, leitura) da sessão HTTP"""
+        api = self.config['API']
+        try:
+            pool_size = max(1, int(api.get('pool_size', str(ApiClient.DEFAULT_POOL_SIZE))))
+            connect_timeout = float(api.get('connect_timeout', str(ApiClient.DEFAULT_TIMEOUT[0])))
+            read_timeout = float(api.get('read_timeout', str(ApiClient.DEFAULT_TIMEOUT[1])))
+        except ValueError:
+            return ApiClient.DEFAULT_POOL_SIZE, ApiClient.DEFAULT_TIMEOUT
+        return pool_size, (connect_timeout, read_timeout)
+    
+    def set_business_hours(self, day, hours):
+        """Define horário comercial para um dia específico"""
+        self.config['BusinessHours'][day] = hours
+        self.save_config()
+        
+    def get_holidays(self):
+        """Obtém lista de feriados"""
+        if 'Holidays' not in self.config:
+            self.config['Holidays'] = {}
+        
+        holidays = []
+        for date_str, description in self.config['Holidays'].items():
+            try:
+                date = datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+                holidays.append((date, description))
+            except ValueError:
+                pass  # Ignora datas inválidas
+        
+        return sorted(holidays, key=lambda x: x[0])  # Ordena por data
+
+    def add_holiday(self, date, description):
+        """Adiciona um feriado"""
+        if 'Holidays' not in self.config:
+            self.config['Holidays'] = {}
+            
+        date_str = date.strftime("%Y-%m-%d")
+        self.config['Holidays'][date_str] = description
+        self.save_config()
+        
+    def remove_holiday(self, date):
+        """Remove um feriado"""
+        if 'Holidays' not in self.config:
+            return
+            
+        date_str = date.strftime("%Y-%m-%d")
+        if date_str in self.config['Holidays']:
+            del self.config['Holidays'][date_str]
+            self.save_config()
+
+
+class ApiClient:
+    """Gerencia comunicação com a API do TomTicket"""
+    
+    BASE_URL = "https://api.tomticket.com/v2.0"
+    
+    # Variável de ambiente que substitui o endereço base (ver ConfigManager.get_api_base_url)
+    BASE_URL_ENV = "TICKET_ANALYZER_API_URL"
+    
+    # Limite padrão de requisições por segundo, compartilhado por todas as buscas deste cliente.
+    # A API do TomTicket aceita cerca de 100 requisições por minuto; 3/s fica pouco acima disso e
+    # os 429 que passarem pausam todas as threads (Retry-After). É este limite, e não a quantidade
+    # de requisições paralelas, que define a vazão máxima: as requisições paralelas só escondem a
+    # latência até chegar a ele. Configurável em requests_per_second da seção [API], na interface
+    # ou em --requests-per-second da linha de comando (ex.: contra o servidor local de testes)
+    DEFAULT_REQUESTS_PER_SECOND = 3
+    
+    # Conexões mantidas abertas (keep-alive) no pool da sessão HTTP
+    DEFAULT_POOL_SIZE = 10
+    
+    # Timeouts padrão em segundos: (conexão, leitura)
+    DEFAULT_TIMEOUT = (5, 30)
+    
+    def __init__(self, token, requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                 pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT, base_url=None):
+        self.token = token
+        # Outro endereço (ex.: benchmarks/tomticket_stub.py) no lugar da API do TomTicket
+        if base_url:
+            self.BASE_URL = base_url.rstrip('/')
+        self.headers = {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Authorization': f'Bearer {token}'
+        }
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self.timeout = timeout
+        
+        # Sessão com pool de conexões: reaproveita TCP/TLS entre as chamadas
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update(self.headers)
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+        
+        # Contadores de latência por endpoint
+        self._stats_lock = threading.Lock()
+        self._latency_stats = {}
+    
+    def close(self):
+        """Fecha as conexões mantidas pela sessão"""
+        self.session.close()
+    
+    def _get(self, endpoint, params):
+        """Executa um GET pela sessão, registrando a latência da requisição"""
+        started = time.perf_counter()
+        try:
+            return self.session.get(endpoint, params=params, timeout=self.timeout)
+        finally:
+            elapsed = time.perf_counter() - started
+            name = endpoint[len(self.BASE_URL):].lstrip('/')
+            with self._stats_lock:
+                stats = self._latency_stats.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0})
+                stats['count'] += 1
+                stats['total'] += elapsed
+                stats['max'] = max(stats['max'], elapsed)
+    
+    def get_latency_stats(self):
+        """Retorna, por endpoint, a quantidade de chamadas e as latências média/máxima (segundos)"""
+        with self._stats_lock:
+            return {
+                name: {
+                    'count': stats['count'],
+                    'total': stats['total'],
+                    'avg': stats['total'] / stats['count'] if stats['count'] else 0.0,
+                    'max': stats['max'],
+                }
+                for name, stats in self._latency_stats.items()
+            }
+    
+    def reset_latency_stats(self):
+        """Zera os contadores de latência"""
+        with self._stats_lock:
+            self._latency_stats = {}
+    
+    @staticmethod
+    def _parse_retry_after(response):
+        """Obtém o tempo de espera (em segundos) do cabeçalho Retry-After, se houver"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_dt = email.utils.parsedate_to_datetime(value)
+            return max(0.0, (retry_dt - datetime.datetime.now(retry_dt.tzinfo)).total_seconds())
+        except (TypeError, ValueError):
+            return None
+    
+    def list_tickets(self, params):
+        """Obtém lista de tickets com base nos parâmetros de filtro"""
+        endpoint = f"{self.BASE_URL}/ticket/list"
+        
+        try:
+            response = self._get(endpoint, params)
+            
+            if response.status_code == 429:
+                raise RateLimitError(
+                    "Erro na API: 429 - Limite de requisições atingido",
+                    self._parse_retry_after(response)
+                )
+            
+            if response.status_code == 200:
+                return response.json()
+            else:
+                raise Exception(f"Erro na API: {response.status_code} - {response.text}")
+        except RateLimitError:
+            raise
+        except Exception as e:
+            raise Exception(f"Falha na chamada da API list_tickets: {str(e)}")
+    
+    def _list_page(self, params, page, max_retries=3, cancel_event=None):
+        """Obtém uma página de /ticket/list respeitando o limite de taxa compartilhado.
+        
+        Com `cancel_event` sinalizado, a espera por um token (inclusive após um 429)
+        é interrompida com FetchCancelled.
+        """
+        page_params = dict(params, page=page)
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(cancel_event)
+            try:
+                result = self.list_tickets(page_params)
+            except RateLimitError as e:
+                attempt += 1
+                if attempt >= max_retries:
+                    raise
+                self.rate_limiter.pause(e.retry_after if e.retry_after is not None else 2 ** attempt)
+                continue
+            
+            if not result.get('success'):
+                raise Exception(f"Erro da API: {result.get('message', 'Erro desconhecido')}")
+            return result
+    
+    @staticmethod
+    def _has_next_page(result, page, data):
+        """Indica, pelos metadados da resposta, se há outra página após `page`"""
+        if not data:
+            return False
+        if result.get('pages') is not None:
+            try:
+                return page < int(result['pages'])
+            except (TypeError, ValueError):
+                pass
+        if 'next_page' in result:
+            return bool(result.get('next_page'))
+        # Sem metadados: continua até uma página vazia ou repetida
+        return True
+    
+    def iter_ticket_pages(self, params, prefetch=True, cancel_event=None):
+        """Percorre todas as páginas de /ticket/list, gerando a lista de tickets de cada página.
+        
+        Com `prefetch`, a página seguinte é requisitada em segundo plano enquanto a
+        atual é processada pelo consumidor. Tickets repetidos entre páginas são descartados.
+        Com `cancel_event` sinalizado, a paginação para com FetchCancelled.
+        """
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        seen_ids = set()
+        page = 1
+        try:
+            future = executor.submit(self._list_page, params, page, cancel_event=cancel_event) if executor else None
+            while True:
+                if executor:
+                    result = future.result()
+                else:
+                    result = self._list_page(params, page, cancel_event=cancel_event)
+                data = result.get('data') or []
+                new_tickets = [ticket for ticket in data if ticket.get('id') not in seen_ids]
+                seen_ids.update(ticket.get('id') for ticket in new_tickets)
+                has_next = bool(new_tickets) and self._has_next_page(result, page, data)
+                
+                if has_next and executor:
+                    future = executor.submit(self._list_page, params, page + 1, cancel_event=cancel_event)
+                
+                if new_tickets:
+                    yield new_tickets
+                
+                if not has_next:
+                    break
+                page += 1
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
+    
+    def iter_tickets(self, params, prefetch=True, cancel_event=None):
+        """Gera os tickets de todas as páginas, um a um"""
+        for page_tickets in self.iter_ticket_pages(params, prefetch, cancel_event):
+            yield from page_tickets
+    
+    def get_ticket_details(self, ticket_id):
+        """Obtém informações detalhadas sobre um ticket específico"""
+        endpoint = f"{self.BASE_URL}/ticket/detail"
+        
+        # Parâmetros para a requisição GET
+        params = {'ticket_id': ticket_id}
+        
+        try:
+            # Sem registrar cabeçalhos nem respostas: a saída vai para logs (ex.: cron) e o cabeçalho leva o token
+            response = self._get(endpoint, params)
+            
+            if response.status_code == 429:
+                raise RateLimitError(
+                    "Erro na API: 429 - Limite de requisições atingido",
+                    self._parse_retry_after(response)
+                )
+            
+            if response.status_code >= 500:
+                raise TransientApiError(f"Erro na API: {response.status_code} - {response.text}",
+                                        response.status_code)
+            
+            if response.status_code == 200:
+                result = response.json()
+                # Check for valid data structure
+                if not result.get('error', True) and result.get('data'):
+                    return result
+                else:
+                    raise Exception(f"Erro na resposta da API: {result.get('message', 'Erro desconhecido')}")
+            else:
+                raise Exception(f"Erro na API: {response.status_code} - {response.text}")
+        except RateLimitError:
+            raise
+        except (TransientApiError, requests.ConnectionError, requests.Timeout) as e:
+            # Falhas que podem passar ao repetir (o TicketDetailFetcher repete apenas estas)
+            raise TransientApiError(f"Falha na chamada da API: {e}, endpoint = {endpoint}, params = {params}",
+                                    getattr(e, 'status_code', None))
+        except Exception as e:
+            raise Exception(f"Falha na chamada da API: {e}, endpoint = {endpoint}, params = {params}")
+
+
+class BusinessHoursCalculator:
+    """Calcula tempo de trabalho com base no horário comercial, excluindo feriados.
+
+    O cálculo usa uma tabela cumulativa de microssegundos comerciais por dia
+    (modelos por dia da semana + conjunto de feriados): qualquer intervalo é
+    resolvido com duas consultas à tabela e uma subtração, em vez de percorrer
+    cada dia entre o início e o fim.
+
+    Os resultados ficam em um cache LRU limitado, compartilhado por todos os
+    tickets da sessão (intervalos como "criação até agora" se repetem), com a
+    versão do calendário na chave. update_calendar troca horário e feriados no
+    próprio objeto e descarta o cache.
+
+    O calculador é compartilhado entre threads (análise, sincronização e
+    classificador). Calendário e tabela cumulativa ficam em uma única tupla
+    (_table), substituída por inteiro sob _cache_lock, e cada cálculo usa uma
+    só leitura dela: uma extensão da tabela ou troca de calendário concorrente
+    nunca mistura duas origens ou dois calendários na mesma conta.
+    """
+
+    # Margem (em dias) adicionada a cada extensão da tabela cumulativa
+    TABLE_MARGIN_DAYS = 366
+
+    # Intervalos guardados no cache de tempo comercial (os menos usados saem primeiro)
+    CACHE_SIZE = 100000
+
+    def __init__(self, business_hours_config, holidays=None, cache_size=CACHE_SIZE):
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.calendar_version = 0
+        self._cache = OrderedDict()  # (início, fim, versão do calendário) -> segundos comerciais
+        self._cache_lock = threading.Lock()
+        self._set_calendar(self._build_calendar(business_hours_config, holidays))
+
+    def _build_calendar(self, business_hours_config, holidays):
+        """Calendário imutável: (horário por dia da semana, feriados, modelos em
+        microssegundos por dia da semana, totais por dia da semana, forma fechada)"""
+        business_hours = self._parse_business_hours(business_hours_config)
+        holiday_dates = frozenset(date for date, _ in (holidays or []))  # Conjunto de datas de feriados
+        templates, totals, closed_form = self._build_day_templates(business_hours)
+        return business_hours, holiday_dates, templates, totals, closed_form
+
+    def _set_calendar(self, calendar):
+        """Publica um calendário, com a tabela cumulativa ainda vazia (chamar com a trava, exceto no __init__)"""
+        self.business_hours, self.holidays = calendar[0], calendar[1]
+        # Tabela cumulativa: (ordinal do primeiro dia, microssegundos comerciais
+        # acumulados antes de cada dia a partir dele, calendário)
+        self._table = (None, [], calendar)
+
+    def update_calendar(self, business_hours_config, holidays=None):
+        """Troca horário comercial e feriados, invalidando o cache.
+
+        O objeto é o mesmo, então analisador, abas e diálogos que guardam o
+        calculador passam a usar o novo calendário.
+        """
+        calendar = self._build_calendar(business_hours_config, holidays)
+        with self._cache_lock:
+            self._set_calendar(calendar)
+            self.calendar_version += 1
+            self._cache.clear()
+
+    def cache_info(self):
+        """Acertos, falhas e tamanho do cache de tempo comercial"""
+        with self._cache_lock:
+            return {'hits': self.cache_hits, 'misses': self.cache_misses, 'size': len(self._cache),
+                    'max_size': self.cache_size, 'calendar_version': self.calendar_version}
+
+    def _parse_business_hours(self, config):
+        """Analisa horário comercial de formato string para dados estruturados"""
+        business_hours = {}
+        days_map = {
+            'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+            'friday': 4, 'saturday': 5, 'sunday': 6
+        }
+        
+        for day, hours_str in config.items():
+            day_index = days_map.get(day.lower())
+            if day_index is None:
+                continue
+                
+            ranges = []
+            if hours_str:
+                for time_range in hours_str.split(','):
+                    if '-' in time_range:
+                        start, end = time_range.split('-')
+                        start_h, start_m = map(int, start.split(':'))
+                        end_h, end_m = map(int, end.split(':'))
+                        ranges.append((
+                            datetime.time(start_h, start_m),
+                            datetime.time(end_h, end_m)
+                        ))
+            
+            business_hours[day_index] = ranges
+
+        return business_hours
+
+    def _build_day_templates(self, business_hours):
+        """Pré-calcula, para cada dia da semana, os intervalos em microssegundos desde 00:00.
+
+        Returns:
+            tuple: (intervalos por dia da semana, total por dia da semana, forma fechada)
+        """
+        templates = {}
+        totals = [0] * 7
+        # Intervalos invertidos (fim antes do início) não têm forma fechada; nesse
+        # caso mantém o cálculo dia a dia para preservar o resultado original
+        closed_form = True
+
+        for day_index in range(7):
+            ranges = []
+            for start_time, end_time in business_hours.get(day_index, []):
+                start_us = self._time_to_microseconds(start_time)
+                end_us = self._time_to_microseconds(end_time)
+                if end_us < start_us:
+                    closed_form = False
+                ranges.append((start_us, end_us))
+            templates[day_index] = ranges
+            totals[day_index] = sum(end - start for start, end in ranges)
+
+        return templates, totals, closed_form
+
+    @staticmethod
+    def _time_to_microseconds(value):
+        """Converte um time/datetime em microssegundos desde 00:00"""
+        return (value.hour * 3600 + value.minute * 60 + value.second) * 1000000 + value.microsecond
+
+    @staticmethod
+    def _table_covers(table, first_ordinal, last_ordinal):
+        first, cumulative, _ = table
+        return first is not None and first <= first_ordinal and last_ordinal < first + len(cumulative)
+
+    def _table_for(self, first_ordinal, last_ordinal):
+        """Tabela cumulativa (uma leitura consistente) cobrindo os dias informados"""
+        table = self._table
+        if self._table_covers(table, first_ordinal, last_ordinal):
+            return table
+
+        with self._cache_lock:
+            # Outra thread pode ter estendido a tabela (ou trocado o calendário) enquanto esperava
+            table = self._table
+            if self._table_covers(table, first_ordinal, last_ordinal):
+                return table
+
+            first, cumulative, calendar = table
+            low, high = first_ordinal, last_ordinal
+            if first is not None:
+                low = min(low, first)
+                high = max(high, first + len(cumulative) - 1)
+            low -= self.TABLE_MARGIN_DAYS
+            high += self.TABLE_MARGIN_DAYS
+
+            _, holidays, _, day_totals, _ = calendar
+            holiday_ordinals = {date.toordinal() for date in holidays}
+            cumulative = [0]
+            running = 0
+            for day in range(low, high + 1):
+                # date.fromordinal(1) é uma segunda-feira (weekday 0)
+                if day not in holiday_ordinals:
+                    running += day_totals[(day - 1) % 7]
+                cumulative.append(running)
+
+            table = (low, cumulative, calendar)
+            self._table = table
+            return table
+
+    def _business_microseconds_until(self, dt, table):
+        """Microssegundos comerciais acumulados desde o início da tabela (que deve cobrir dt) até dt"""
+        first, cumulative, calendar = table
+        total = cumulative[dt.toordinal() - first]
+
+        if dt.date() in calendar[1]:
+            return total
+
+        day_us = self._time_to_microseconds(dt)
+        for start_us, end_us in calendar[2][dt.weekday()]:
+            if day_us > start_us:
+                total += min(day_us, end_us) - start_us
+        return total
+
+    @property
+    def supports_closed_form(self):
+        """Indica se o cálculo pode usar a tabela cumulativa (sem intervalos invertidos)"""
+        return self._table[2][4]
+
+    def cumulative_table(self, first_ordinal, last_ordinal):
+        """Tabela cumulativa cobrindo os dias informados, para cálculos em lote.
+
+        Todos os valores vêm da mesma leitura da tabela: use uma única chamada,
+        cobrindo todos os dias do lote, para subtrair acumulados entre si.
+
+        Returns:
+            tuple: (ordinal do primeiro dia da tabela, lista com os microssegundos
+                   comerciais acumulados antes de cada dia, modelos por dia da semana,
+                   feriados)
+        """
+        first, cumulative, calendar = self._table_for(first_ordinal, last_ordinal)
+        return first, cumulative, calendar[2], calendar[1]
+
+    def is_business_hours(self, dt):
+        """Verifica se um datetime está dentro do horário comercial e não é feriado"""
+        # Verifica se a data é feriado
+        if dt.date() in self.holidays:
+            return False
+            
+        # Verifica horário comercial
+        day_of_week = dt.weekday()
+        time_ranges = self.business_hours.get(day_of_week, [])
+        
+        if not time_ranges:
+            return False
+            
+        current_time = dt.time()
+        return any(start <= current_time <= end for start, end in time_ranges)
+    
+    def calculate_business_time(self, start_dt, end_dt):
+        """Calcula tempo comercial entre dois datetimes em segundos, excluindo feriados"""
+        if start_dt >= end_dt:
+            return 0
+        if not self.cache_size:
+            return self._calculate_business_time(start_dt, end_dt)
+
+        version = self.calendar_version
+        key = (start_dt, end_dt, version)
+        with self._cache_lock:
+            seconds = self._cache.get(key)
+            if seconds is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return seconds
+            self.cache_misses += 1
+
+        seconds = self._calculate_business_time(start_dt, end_dt)
+
+        with self._cache_lock:
+            # Não guarda resultados calculados com um calendário que já foi trocado
+            if version == self.calendar_version:
+                self._cache[key] = seconds
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return seconds
+
+    def _calculate_business_time(self, start_dt, end_dt):
+        """Tempo comercial sem cache (tabela cumulativa ou, se necessário, dia a dia)"""
+        if start_dt >= end_dt:
+            return 0
+
+        table = self._table
+        calendar = table[2]
+        if not calendar[4]:
+            return self._calculate_business_time_by_day(start_dt, end_dt, calendar)
+
+        if not self._table_covers(table, start_dt.toordinal(), end_dt.toordinal()):
+            table = self._table_for(start_dt.toordinal(), end_dt.toordinal())
+        business_us = (self._business_microseconds_until(end_dt, table)
+                       - self._business_microseconds_until(start_dt, table))
+        return business_us / 1000000
+
+    def _calculate_business_time_by_day(self, start_dt, end_dt, calendar=None):
+        """Cálculo original, percorrendo cada dia do intervalo (mantido como referência)"""
+        if start_dt >= end_dt:
+            return 0
+
+        business_hours, holidays = (calendar or self._table[2])[:2]
+
+        # Inicializa variáveis
+        current_dt = start_dt
+        total_seconds = 0
+        
+        # Itera através de cada dia
+        while current_dt.date() <= end_dt.date():
+            # Pula se for feriado
+            if current_dt.date() in holidays:
+                current_dt = datetime.datetime.combine(
+                    current_dt.date() + datetime.timedelta(days=1),
+                    datetime.time(0, 0)
+                )
+                continue
+                
+            day_ranges = business_hours.get(current_dt.weekday(), [])
+            
+            if not day_ranges:
+                # Sem horário comercial para este dia
+                current_dt = datetime.datetime.combine(
+                    current_dt.date() + datetime.timedelta(days=1),
+                    datetime.time(0, 0)
+                )
+                continue
+                
+            for start_time, end_time in day_ranges:
+                range_start = datetime.datetime.combine(current_dt.date(), start_time)
+                range_end = datetime.datetime.combine(current_dt.date(), end_time)
+                
+                # Pula se o intervalo estiver completamente antes de start_dt ou depois de end_dt
+                if range_end <= start_dt or range_start >= end_dt:
+                    continue
+                    
+                # Ajusta intervalo se sobrepor com start_dt ou end_dt
+                calc_start = max(range_start, start_dt)
+                calc_end = min(range_end, end_dt)
+                
+                # Adiciona segundos neste intervalo
+                total_seconds += (calc_end - calc_start).total_seconds()
+            
+            # Move para o próximo dia
+            current_dt = datetime.datetime.combine(
+                current_dt.date() + datetime.timedelta(days=1),
+                datetime.time(0, 0))
+            
+        return total_seconds
+
+
+class StatusTimeline:
+    """Linha do tempo dos status de um ticket, para saber o status ativo em cada momento.
+    
+    As datas são convertidas uma única vez. Consultas em ordem crescente de
+    data (como as respostas já ordenadas de um ticket) percorrem os status uma
+    só vez: os status iniciados entram em um heap ordenado pela data de início
+    e os encerrados saem do topo conforme o tempo avança. O resultado é o mesmo
+    de TicketAnalyzer.get_status_at_time: o primeiro status, por data de início,
+    cujo intervalo contém o momento consultado.
+    """
+    
+    def __init__(self, statuses, parse_datetime):
+        entries = []
+        for status in statuses:
+            start_dt = parse_datetime(status.get('start', {}).get('operator', {}).get('date'))
+            if not start_dt:
+                continue
+            end_dt = parse_datetime(status.get('end', {}).get('operator', {}).get('date'))
+            entries.append((start_dt, end_dt, status.get('description')))
+        
+        # Ordenação estável por início, como em get_status_at_time
+        entries.sort(key=lambda entry: entry[0])
+        self._starts = [entry[0] for entry in entries]
+        self._ends = [entry[1] for entry in entries]
+        self._descriptions = [entry[2] for entry in entries]
+        self.reset()
+    
+    def reset(self):
+        """Volta ao início da linha do tempo"""
+        self._next = 0
+        self._active = []  # heap com os índices dos status já iniciados
+        self._last_timestamp = None
+    
+    def status_at(self, timestamp):
+        """Descrição do status ativo em `timestamp`, ou None se nenhum estiver ativo"""
+        if not timestamp:
+            return None
+        
+        # Consultas fora de ordem recomeçam a passada
+        if self._last_timestamp is not None and timestamp < self._last_timestamp:
+            self.reset()
+        self._last_timestamp = timestamp
+        
+        starts = self._starts
+        while self._next < len(starts) and starts[self._next] <= timestamp:
+            heapq.heappush(self._active, self._next)
+            self._next += 1
+        
+        # Encerrados antes deste momento também estão encerrados para os seguintes
+        active = self._active
+        while active and self._ends[active[0]] is not None and self._ends[active[0]] < timestamp:
+            heapq.heappop(active)
+        
+        return self._descriptions[active[0]] if active else None
+
+
+class TicketAnalyzer:
+    """Analisa dados de tickets e calcula métricas de tempo"""
+    
+    def __init__(self, business_hours_calculator, reclassifications=None, message_source=None):
+        self.calculator = business_hours_calculator
+        # Classificações manuais gravadas (ex.: TicketStore), com get_reclassifications(ticket_id)
+        self.reclassifications = reclassifications
+        # Fonte das mensagens (MessageSource): com ela, as interações não guardam o HTML das respostas
+        self.message_source = message_source
+    
+    def parse_datetime(self, datetime_str):
+        """Analisa string de datetime da API e retorna no formato %Y-%m-%d %H:%M:%S (sem fuso e sem milissegundos)."""
+        return parse_api_datetime(datetime_str)
+    
+    def seconds_to_time_format(self, seconds):
+        """Converte segundos para formato HH:MM:SS"""
+        hours = int(seconds // 3600)
+        minutes = int((seconds % 3600) // 60)
+        secs = int(seconds % 60)
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+    
+    
+    def get_status_at_time(self, statuses, timestamp):
+        """
+        Determina o status do ticket em um momento específico
+        
+        Args:
+            statuses (list): Lista de status do ticket, cada um com start e end
+            timestamp (datetime): Data/hora para verificar
+            
+        Returns:
+            str: Descrição do status ativo naquele momento ou None se nenhum status ativo
+        """
+        if not timestamp or not statuses:
+            return None
+        
+        return StatusTimeline(statuses, self.parse_datetime).status_at(timestamp)
+        
+    def analyze_ticket(self, ticket_details, now=None):
+        """Analisa interações de ticket e calcula métricas de tempo
+        
+        Args:
+            ticket_details (dict): dados de /ticket/detail
+            now (datetime): momento usado como fim dos tickets em aberto (padrão: agora)
+        """
+        result = {
+            'id': ticket_details.get('id'),
+            'protocol': ticket_details.get('protocol'),
+            'subject': ticket_details.get('subject'),
+            'customer_name': ticket_details.get('customer', {}).get('name'),
+            'customer_email': ticket_details.get('customer', {}).get('email'),
+            'creation_date': ticket_details.get('creation_date'),
+            'creation_dt': self.parse_datetime(ticket_details.get('creation_date')),
+            'first_reply_date': ticket_details.get('first_reply_date'),
+            'end_date': ticket_details.get('end_date'),
+            'current_situation': ticket_details.get('situation', {}).get('description'),
+            'situation_id': ticket_details.get('situation', {}).get('id'),
+            'situation_apply_date': ticket_details.get('situation', {}).get('apply_date'),
+            'time_with_client': 0,  # em segundos
+            'time_with_support': 0,  # em segundos
+            'status_time': {},       # tempo total em cada status
+            'status_business_time': {},  # tempo em horário comercial para cada status
+            'business_time_with_client': 0,  # em segundos durante horário comercial
+            'business_time_with_support': 0,  # em segundos durante horário comercial
+            'time_to_first_status': 0,  # tempo da criação até o primeiro status
+            'business_time_to_first_status': 0,  # tempo comercial da criação até o primeiro status
+            'interactions': [],  # Lista para armazenar todas as interações
+            'analyzed_at': now or datetime.datetime.now(),  # fim dos intervalos se o ticket estiver em aberto
+        }
+        
+        # Classificações feitas no classificador de interações (ID da resposta -> C/A/B/I)
+        overrides = {}
+        if self.reclassifications is not None and result['id'] is not None:
+            overrides = self.reclassifications.get_reclassifications(result['id'])
+        
+        # Obtém respostas e status
+        replies = ticket_details.get('replies', [])
+        statuses = ticket_details.get('status', []) if isinstance(ticket_details.get('status'), list) else []
+        
+        # Ordena por data
+        replies.sort(key=lambda x: self.parse_datetime(x.get('date')) or datetime.datetime.min)
+        statuses.sort(key=lambda x: self.parse_datetime(x.get('start', {}).get('operator', {}).get('date')) or datetime.datetime.min)
+        
+        # Calcula tempo com cliente vs suporte baseado nas respostas
+        creation_dt = self.parse_datetime(ticket_details.get('creation_date'))
+        if creation_dt:
+            creation_interaction = Interaction(
+                id='creation',
+                date=creation_dt,
+                sender_type='C',  # Assume que o ticket é criado pelo cliente
+                classification=overrides.get('creation', 'C'),  # Classificação inicial igual ao tipo
+                sender=ticket_details.get('customer', {}).get('name', 'Cliente'),
+                message='Ticket criado',
+                status=None,
+                has_attachments=False,
+                is_virtual=True,  # Marca como interação virtual
+                ticket_id=result['id']
+            )
+            result['interactions'].append(creation_interaction)
+            
+        
+        # Determina se o ticket está finalizado
+        is_finished = False
+        end_dt = None
+        
+        # Verifica end_date
+        if ticket_details.get('end_date'):
+            end_dt = self.parse_datetime(ticket_details.get('end_date'))
+            is_finished = True
+        
+        # Verifica situation
+        situation_id = ticket_details.get('situation', {}).get('id')
+        situation_dt = self.parse_datetime(ticket_details.get('situation', {}).get('apply_date'))
+        
+        if situation_id in [4, 5]:  # Cancelada ou Finalizada
+            is_finished = True
+            if not end_dt and situation_dt:
+                end_dt = situation_dt
+        
+        # Define data final para cálculos
+        final_date = result['analyzed_at']
+        if is_finished and end_dt:
+            final_date = end_dt
+        
+        # Inicializa com a criação do ticket
+        last_dt = creation_dt
+        last_sender = 'C'  # Assumindo que o ticket começa com o cliente
+        
+        # Status de cada resposta: as respostas já estão ordenadas, então uma
+        # única passada pela linha do tempo atende a todas
+        status_timeline = StatusTimeline(statuses, self.parse_datetime)
+        
+        # Com uma fonte de mensagens, o HTML das respostas é lido só quando exibido
+        message_source = self.message_source
+        
+        # Processar interações (replies) - APENAS UM LOOP
+        for reply in replies:
+            reply_dt = self.parse_datetime(reply.get('date'))
+            interaction = Interaction(
+                id=reply.get('id'),
+                date=reply_dt,
+                sender_type=reply.get('sender_type'),  # Original
+                classification=overrides.get(str(reply.get('id')), reply.get('sender_type')),  # Classificação atual (inicialmente igual ao original)
+                sender=shared_text(reply.get('sender')),
+                message=None if message_source is not None else reply.get('message'),
+                status=shared_text(status_timeline.status_at(reply_dt)),
+                has_attachments=len(reply.get('attachments', [])) > 0,
+                ticket_id=result['id'],
+                message_source=message_source
+            )
+            result['interactions'].append(interaction)
+            
+            current_dt = interaction.date
+            sender_type = interaction.sender_type
+            
+            if not current_dt or not sender_type:
+                continue
+                
+            time_diff = (current_dt - last_dt).total_seconds()
+            business_time = self.calculator.calculate_business_time(last_dt, current_dt)
+            
+            # Se o último remetente foi cliente, o tempo foi com suporte
+            if last_sender == 'C':
+                result['time_with_support'] += time_diff
+                result['business_time_with_support'] += business_time
+            # Se o último remetente foi suporte, o tempo foi com cliente
+            elif last_sender == 'A':
+                result['time_with_client'] += time_diff
+                result['business_time_with_client'] += business_time
+                
+            last_dt = current_dt
+            last_sender = sender_type
+        
+        # Calcula tempo da última resposta até agora/fim
+        if last_dt and last_dt < final_date:
+            time_diff = (final_date - last_dt).total_seconds()
+            business_time = self.calculator.calculate_business_time(last_dt, final_date)
+            
+            # Se o último remetente foi cliente, o tempo é com suporte
+            if last_sender == 'C':
+                result['time_with_support'] += time_diff
+                result['business_time_with_support'] += business_time
+            # Se o último remetente foi suporte, o tempo é com cliente
+            elif last_sender == 'A':
+                result['time_with_client'] += time_diff
+                result['business_time_with_client'] += business_time
+        
+        # Calcula tempo da criação até o primeiro status
+        if statuses and creation_dt:
+            first_status_start = self.parse_datetime(statuses[0].get('start', {}).get('operator', {}).get('date'))
+            if first_status_start:
+                result['time_to_first_status'] = (first_status_start - creation_dt).total_seconds()
+                # Calcula tempo em horário comercial
+                result['business_time_to_first_status'] = self.calculator.calculate_business_time(
+                    creation_dt, first_status_start
+                )
+        
+        # LOOP SEPARADO PARA CALCULAR TEMPO EM CADA STATUS
+        # Calcula tempo em cada status
+        for status in statuses:
+            start_dt = self.parse_datetime(status.get('start', {}).get('operator', {}).get('date'))
+            end_dt = self.parse_datetime(status.get('end', {}).get('operator', {}).get('date'))
+            status_desc = status.get('description')
+            
+            if not start_dt or not status_desc:
+                continue
+                
+            # Usa data final se fornecida, caso contrário usa agora ou data final do ticket
+            if not end_dt:
+                if is_finished and end_dt:
+                    end_dt = end_dt
+                else:
+                    end_dt = final_date
+                    
+            # Calcula tempo neste status (total e horário comercial)
+            time_diff = (end_dt - start_dt).total_seconds()
+            business_time = self.calculator.calculate_business_time(start_dt, end_dt)
+            
+            # Adiciona ao dicionário de tempo total por status
+            if status_desc in result['status_time']:
+                result['status_time'][status_desc] += time_diff
+            else:
+                result['status_time'][status_desc] = time_diff
+                
+            # Adiciona ao dicionário de tempo em horário comercial por status
+            if status_desc in result['status_business_time']:
+                result['status_business_time'][status_desc] += business_time
+            else:
+                result['status_business_time'][status_desc] = business_time
+        
+        # Ordenar interações por data (mantive caso ainda haja necessidade)
+        result['interactions'].sort(key=lambda x: x['date'] or datetime.datetime.min)
+        
+        # Com classificações manuais, os totais reclassificados já saem calculados (como no classificador)
+        if overrides:
+            IntervalBreakdown(result, self.calculator, now=final_date).apply_to(result)
+            
+        return result
+
+
+def build_search_params(date_from, date_to, situation=None, priority=None, category_id=None):
+    """Monta os parâmetros de /ticket/list para um período de criação.
+    
+    Args:
+        date_from (str): data inicial no formato AAAA-MM-DD
+        date_to (str): data final no formato AAAA-MM-DD
+        situation, priority, category_id: filtros opcionais da API
+    """
+    params = {}
+
+    # Obtém data/hora atual com timezone -0300
+    now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S-0300")
+
+    # Data inicial (00:00:00 do dia selecionado)
+    date_from = date_from + " 00:00:00-0300"
+    if date_from > now:
+        date_from = now  # Garante que não está no futuro
+
+    # Data final (23:59:59 do dia selecionado)
+    date_to = date_to + " 23:59:59-0300"
+    if date_to > now:
+        date_to = now  # Garante que não está no futuro
+
+    # Define os parâmetros de data para a API
+    params['creation_date_ge'] = date_from
+    params['creation_date_le'] = date_to
+
+    # Situação (use 'situation' ao invés de 'situation_id')
+    if situation:
+        params['situation'] = str(situation)
+
+    # Prioridade (API aceita vários separados por vírgula)
+    if priority:
+        params['priority'] = str(priority)
+
+    # Categoria
+    if category_id:
+        params['category_id'] = str(category_id)
+    
+    return params
+
+
+def seconds_to_time_format_csv(seconds):
+    """Converte segundos para formato HH:MM:SS (com sinal, se negativo)"""
+    if seconds < 0:
+        prefix = "-"
+        seconds = abs(seconds)
+    else:
+        prefix = ""
+        
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = int(seconds % 60)
+    return f"{prefix}{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+def collect_status_types(results):
+    """Lista ordenada de todos os status presentes nas análises"""
+    all_statuses = set()
+    for analysis in results:
+        all_statuses.update(analysis.get('status_time', {}).keys())
+        all_statuses.update(analysis.get('status_business_time', {}).keys())
+    
+    # Se ainda não encontramos status, procura nos dados brutos de 'status'
+    if not all_statuses:
+        for analysis in results:
+            statuses = analysis.get('status', [])
+            if isinstance(statuses, list):
+                for status in statuses:
+                    desc = status.get('description')
+                    if desc:
+                        all_statuses.add(desc)
+    
+    return sorted(all_statuses)
+
+
+def effective_time(analysis, key):
+    """Tempo reclassificado (reclassified_<key>) se houver, senão o tempo da análise original.
+
+    As chaves originais (time_with_client, business_time_with_support...)
+    guardam sempre os totais sem reclassificação.
+    """
+    value = analysis.get(f'reclassified_{key}')
+    return analysis.get(key, 0) if value is None else value
+
+
+def build_export_row(analysis, status_types):
+    """Monta a linha do CSV de exportação para a análise de um ticket"""
+    row = {
+        'protocol': analysis.get('protocol', ''),
+        'subject': analysis.get('subject', ''),
+        'client': analysis.get('customer_name', ''),
+        'time_to_first_status': seconds_to_time_format_csv(analysis.get('business_time_to_first_status', 0)),
+        'time_with_client': seconds_to_time_format_csv(effective_time(analysis, 'time_with_client')),
+        'time_with_support': seconds_to_time_format_csv(effective_time(analysis, 'time_with_support')),
+        'time_in_bug': seconds_to_time_format_csv(analysis.get('reclassified_time_in_bug', 0)),
+        'time_ignored': seconds_to_time_format_csv(analysis.get('reclassified_time_ignored', 0)),
+        'time_with_client (business)': seconds_to_time_format_csv(effective_time(analysis, 'business_time_with_client')),
+        'time_with_support (business)': seconds_to_time_format_csv(effective_time(analysis, 'business_time_with_support')),
+        'time_in_bug (business)': seconds_to_time_format_csv(analysis.get('reclassified_business_time_in_bug', 0)),
+        'time_ignored (business)': seconds_to_time_format_csv(analysis.get('reclassified_business_time_ignored', 0)),
+        'current_status': analysis.get('current_situation', '')
+    }
+    
+    # Adiciona informações de SLA
+    sla_deadline = analysis.get('sla', {}).get('deadline', {})
+    if sla_deadline:
+        sla_date = sla_deadline.get('date', '')
+        sla_accomplished = "Sim" if sla_deadline.get('accomplished') else "Não"
+        row['sla_deadline'] = sla_date
+        row['sla_accomplished'] = sla_accomplished
+    
+    # Adiciona data de criação e encerramento
+    row['creation_date'] = analysis.get('creation_date', '')
+    row['end_date'] = analysis.get('end_date', '')
+    
+    # Add status times
+    for status in status_types:
+        # Tempo total no status
+        time_sec = analysis.get('status_time', {}).get(status, 0)
+        row[f'Status: {status}'] = seconds_to_time_format_csv(time_sec)
+        
+        # Tempo comercial no status
+        business_time_sec = analysis.get('status_business_time', {}).get(status, 0)
+        row[f'Status (comercial): {status}'] = seconds_to_time_format_csv(business_time_sec)
+        
+    return row
+
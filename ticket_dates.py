@@ -0,0 +1,71 @@
+"""Conversão das datas retornadas pela API do TomTicket.
+
+A API sempre envia `AAAA-MM-DD HH:MM:SS` seguido do fuso (`-03:00` ou
+`-0300`). Esse formato é convertido diretamente, sem o dateutil, e cada
+texto já convertido fica memorizado, pois as mesmas datas se repetem entre
+respostas, status e análises. Formatos inesperados ainda passam pelo
+`dateutil.parser`.
+"""
+import datetime
+import re
+
+from dateutil import parser
+
+# Data e hora fixas, com frações de segundo e fuso opcionais (ignorados)
+_API_DATETIME = re.compile(
+    r'(\d{4})-(\d{2})-(\d{2})[ T](\d{2}):(\d{2}):(\d{2})(?:\.\d+)?\s*(?:Z|[+-]\d{2}:?\d{2})?$'
+)
+
+# Quantidade máxima de textos memorizados antes de a tabela ser esvaziada
+MEMO_MAX_SIZE = 100000
+
+_memo = {}
+
+
+def _parse_fallback(value):
+    """Conversão genérica pelo dateutil, para formatos fora do padrão da API"""
+    try:
+        dt = parser.parse(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    return dt.replace(tzinfo=None, microsecond=0)
+
+
+def parse_api_datetime(value):
+    """Converte uma data da API em datetime sem fuso e sem milissegundos.
+    
+    O fuso é descartado (o horário é mantido como recebido). Retorna None
+    para valores vazios ou inválidos.
+    """
+    if not value:
+        return None
+    
+    try:
+        return _memo[value]
+    except KeyError:
+        pass
+    except TypeError:
+        return None
+    
+    if not isinstance(value, str):
+        return None
+    
+    match = _API_DATETIME.match(value)
+    dt = None
+    if match:
+        try:
+            dt = datetime.datetime(*map(int, match.groups()))
+        except ValueError:
+            dt = None
+    if dt is None:
+        dt = _parse_fallback(value)
+    
+    if len(_memo) >= MEMO_MAX_SIZE:
+        _memo.clear()
+    _memo[value] = dt
+    return dt
+
+
+def clear_memo():
+    """Esvazia a tabela de datas memorizadas"""
+    _memo.clear()
@@ -0,0 +1,294 @@
+"""Exportação das análises de tickets para arquivo, sem PyQt5 nem pandas.
+
+As linhas são geradas e gravadas uma a uma (build_export_row), de modo que a
+memória usada não cresce com a quantidade de tickets além das próprias
+análises. As colunas dinâmicas de status são conhecidas antes da primeira
+linha por uma passada barata sobre as chaves de status (collect_status_types).
+
+A exportação tabular (Parquet ou Arrow) grava colunas tipadas, em três
+tabelas: tickets, tempo por status (formato longo) e intervalos entre
+interações. Ela depende do pacote opcional pyarrow, importado só quando usada.
+"""
+import csv
+import datetime
+import os
+
+from ticket_core import build_export_row, collect_status_types, effective_time
+from ticket_dates import parse_api_datetime
+from ticket_intervals import IntervalBreakdown
+
+# Colunas de SLA, presentes apenas quando alguma análise tem prazo de SLA
+SLA_FIELDS = ['sla_deadline', 'sla_accomplished']
+
+
+def _has_sla(analysis):
+    """Mesmo critério de build_export_row para incluir as colunas de SLA"""
+    return bool(analysis.get('sla', {}).get('deadline', {}))
+
+
+def export_fieldnames(results, status_types):
+    """Colunas da exportação, sem montar as linhas.
+
+    Segue a ordem de primeira aparição das chaves das linhas (a mesma do
+    DataFrame do pandas): as colunas de SLA ficam no lugar quando a primeira
+    análise tem SLA, ou no final quando só análises seguintes têm.
+    """
+    with_sla = list(build_export_row({'sla': {'deadline': {'date': ''}}}, status_types))
+    without_sla = list(build_export_row({}, status_types))
+
+    sla_flags = (_has_sla(analysis) for analysis in results)
+    first_has_sla = next(sla_flags, False)
+    if first_has_sla:
+        return with_sla
+    if any(sla_flags):
+        return without_sla + SLA_FIELDS
+    return without_sla
+
+
+def write_export_csv(filename, results, status_types=None):
+    """Grava o CSV de exportação linha a linha, em UTF-8 com BOM (compatível com o Excel).
+
+    Args:
+        filename (str): arquivo de saída
+        results (list): análises de TicketAnalyzer.analyze_ticket
+        status_types (list): status das colunas dinâmicas (padrão: collect_status_types(results))
+
+    Returns:
+        int: quantidade de linhas gravadas
+    """
+    if status_types is None:
+        status_types = collect_status_types(results)
+
+    count = 0
+    with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=export_fieldnames(results, status_types), restval='')
+        writer.writeheader()
+        for analysis in results:
+            writer.writerow(build_export_row(analysis, status_types))
+            count += 1
+    return count
+
+
+# Extensão de cada formato tabular
+TABULAR_FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+# Linhas acumuladas antes de gravar cada bloco (row group) das tabelas
+TABULAR_BATCH_ROWS = 10000
+
+# Texto da coluna "attributed_to" para cada classificação (como em InteractionPairTableView)
+ATTRIBUTION_LABELS = {'C': "Suporte", 'A': "Cliente", 'B': "Bug", 'I': "Ignorado"}
+
+
+def _import_pyarrow():
+    """Importa o pyarrow (dependência opcional) apenas quando a exportação tabular é usada"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise Exception("A exportação em Parquet/Arrow requer o pacote pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def _tabular_schemas(pa):
+    """Esquemas das tabelas de tickets, tempo por status e intervalos"""
+    seconds = pa.int64()
+    timestamp = pa.timestamp('s')
+    return {
+        'tickets': pa.schema([
+            ('ticket_id', pa.string()),
+            ('protocol', pa.string()),
+            ('subject', pa.string()),
+            ('client', pa.string()),
+            ('current_status', pa.string()),
+            ('creation_date', timestamp),
+            ('end_date', timestamp),
+            ('sla_deadline', timestamp),
+            ('sla_accomplished', pa.bool_()),
+            ('time_to_first_status_seconds', seconds),
+            ('time_with_client_seconds', seconds),
+            ('time_with_support_seconds', seconds),
+            ('time_in_bug_seconds', seconds),
+            ('time_ignored_seconds', seconds),
+            ('business_time_to_first_status_seconds', seconds),
+            ('business_time_with_client_seconds', seconds),
+            ('business_time_with_support_seconds', seconds),
+            ('business_time_in_bug_seconds', seconds),
+            ('business_time_ignored_seconds', seconds),
+        ]),
+        'status_times': pa.schema([
+            ('ticket_id', pa.string()),
+            ('protocol', pa.string()),
+            ('status', pa.string()),
+            ('seconds', seconds),
+            ('business_seconds', seconds),
+        ]),
+        'intervals': pa.schema([
+            ('ticket_id', pa.string()),
+            ('protocol', pa.string()),
+            ('interval', pa.int32()),
+            ('sender', pa.string()),
+            ('sender_type', pa.string()),
+            ('classification', pa.string()),
+            ('attributed_to', pa.string()),
+            ('start', timestamp),
+            ('end', timestamp),
+            ('seconds', seconds),
+            ('business_seconds', seconds),
+        ]),
+    }
+
+
+class _TableWriter:
+    """Acumula linhas por coluna e grava em blocos de `batch_rows` linhas"""
+
+    def __init__(self, pa, path, schema, file_format, batch_rows):
+        self.pa = pa
+        self.schema = schema
+        self.batch_rows = batch_rows
+        self.columns = {name: [] for name in schema.names}
+        self.rows = 0
+        if file_format == 'parquet':
+            self.writer = pa.parquet.ParquetWriter(path, schema)
+        else:
+            self.writer = pa.ipc.new_file(path, schema)
+
+    def append(self, *values):
+        for column, value in zip(self.columns.values(), values):
+            column.append(value)
+        self.rows += 1
+        if len(self.columns[self.schema.names[0]]) >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if self.columns[self.schema.names[0]]:
+            self.writer.write_table(self.pa.table(self.columns, schema=self.schema))
+            self.columns = {name: [] for name in self.schema.names}
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+
+def _seconds(value):
+    return int(round(value or 0))
+
+
+def tabular_format(filename):
+    """Formato tabular ('parquet' ou 'arrow') pela extensão do arquivo, ou None (CSV)"""
+    extension = os.path.splitext(filename)[1].lower()
+    for file_format, format_extension in TABULAR_FORMATS.items():
+        if extension == format_extension:
+            return file_format
+    return None
+
+
+def tabular_export_paths(filename, file_format='parquet'):
+    """Arquivos gerados por write_export_tables a partir do nome escolhido.
+
+    Ex.: 'analise.parquet' -> analise_tickets.parquet, analise_status_times.parquet
+    e analise_intervals.parquet
+    """
+    base, _ = os.path.splitext(filename)
+    extension = TABULAR_FORMATS[file_format]
+    return {table: f"{base}_{table}{extension}" for table in ('tickets', 'status_times', 'intervals')}
+
+
+def write_export_tables(filename, results, calculator, file_format='parquet', now=None,
+                        batch_rows=TABULAR_BATCH_ROWS):
+    """Grava as análises em tabelas Parquet ou Arrow (IPC), com tipos nativos.
+
+    Durações são segundos inteiros e datas são timestamps (sem fuso, no horário
+    da API). Os intervalos (um por interação, até a seguinte ou até o fim do
+    ticket, mais o trecho da criação até a primeira interação, de número 0)
+    seguem as regras do recálculo do classificador de interações, com a
+    classificação atual de cada interação. Os tickets em aberto terminam no
+    momento da análise (`analyzed_at`), e os totais por classificação da
+    tabela de tickets são a soma dos intervalos dela.
+
+    Args:
+        filename (str): nome base dos arquivos (ver tabular_export_paths)
+        results (list): análises de TicketAnalyzer.analyze_ticket
+        calculator (BusinessHoursCalculator): calcula o tempo comercial dos intervalos
+        file_format (str): 'parquet' ou 'arrow'
+        now (datetime): fim dos tickets em aberto sem `analyzed_at` (padrão: agora)
+
+    Returns:
+        dict: tabela -> arquivo gravado
+    """
+    if file_format not in TABULAR_FORMATS:
+        raise Exception(f"Formato de exportação desconhecido: {file_format}")
+
+    pa = _import_pyarrow()
+    now = now or datetime.datetime.now()
+    paths = tabular_export_paths(filename, file_format)
+    schemas = _tabular_schemas(pa)
+    writers = {}
+    try:
+        for table, path in paths.items():
+            writers[table] = _TableWriter(pa, path, schemas[table], file_format, batch_rows)
+
+        for analysis in results:
+            ticket_id = str(analysis.get('id', ''))
+            protocol = str(analysis.get('protocol', ''))
+            sla_deadline = analysis.get('sla', {}).get('deadline', {})
+
+            # Totais pelos mesmos intervalos gravados abaixo (reclassificados ou não, no mesmo instante)
+            breakdown = IntervalBreakdown(analysis, calculator, now=analysis.get('analyzed_at') or now)
+            if breakdown.intervals:
+                totals = {f'time_{group}': value for group, value in breakdown.totals.items()}
+                totals.update({f'business_time_{group}': value for group, value in breakdown.business_totals.items()})
+            else:
+                totals = {key: effective_time(analysis, key) for key in (
+                    'time_with_client', 'time_with_support', 'business_time_with_client',
+                    'business_time_with_support')}
+                for key in ('time_in_bug', 'time_ignored', 'business_time_in_bug', 'business_time_ignored'):
+                    totals[key] = analysis.get(f'reclassified_{key}')
+
+            writers['tickets'].append(
+                ticket_id,
+                protocol,
+                analysis.get('subject'),
+                analysis.get('customer_name'),
+                analysis.get('current_situation'),
+                parse_api_datetime(analysis.get('creation_date')),
+                parse_api_datetime(analysis.get('end_date')),
+                parse_api_datetime(sla_deadline.get('date')) if sla_deadline else None,
+                bool(sla_deadline.get('accomplished')) if sla_deadline else None,
+                _seconds(analysis.get('time_to_first_status')),
+                _seconds(totals['time_with_client']),
+                _seconds(totals['time_with_support']),
+                _seconds(totals['time_in_bug']),
+                _seconds(totals['time_ignored']),
+                _seconds(analysis.get('business_time_to_first_status')),
+                _seconds(totals['business_time_with_client']),
+                _seconds(totals['business_time_with_support']),
+                _seconds(totals['business_time_in_bug']),
+                _seconds(totals['business_time_ignored']),
+            )
+
+            status_time = analysis.get('status_time', {})
+            status_business_time = analysis.get('status_business_time', {})
+            for status in sorted(set(status_time) | set(status_business_time)):
+                writers['status_times'].append(
+                    ticket_id, protocol, status,
+                    _seconds(status_time.get(status)), _seconds(status_business_time.get(status))
+                )
+
+            for number, (interaction, start, end, wall, business) in enumerate(breakdown.intervals):
+                if interaction is None:
+                    # Trecho inicial, da criação até a primeira interação: sempre do suporte
+                    sender, sender_type, classification = None, None, 'C'
+                else:
+                    sender, sender_type = interaction.get('sender'), interaction.get('sender_type')
+                    classification = interaction.get('classification', sender_type or '')
+                writers['intervals'].append(
+                    ticket_id, protocol, number, sender, sender_type, classification,
+                    ATTRIBUTION_LABELS.get(classification, "Desconhecido"),
+                    start, end, _seconds(wall), _seconds(business)
+                )
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return paths
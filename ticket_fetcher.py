@@ -0,0 +1,334 @@
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+
+
+class RateLimitError(Exception):
+    """Erro 429 da API, com o tempo de espera sugerido pelo cabeçalho Retry-After"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TransientApiError(Exception):
+    """Falha passageira da API (conexão, tempo esgotado ou erro 5xx), que vale repetir"""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class FetchCancelled(Exception):
+    """Indica que a busca foi cancelada pelo usuário"""
+
+
+class TokenBucket:
+    """Limitador de taxa (token bucket) compartilhado entre threads.
+
+    Cada requisição consome um token; os tokens são repostos a `rate` por
+    segundo até `capacity`. Uma resposta 429 pausa todas as threads pelo tempo
+    indicado em Retry-After.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, self.rate))
+        self._default_capacity = not capacity  # Acompanha a taxa em set_rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, cancel_event=None):
+        """Bloqueia até haver um token disponível (ou até o cancelamento)"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+
+            if cancel_event is not None:
+                if cancel_event.wait(wait):
+                    raise FetchCancelled()
+            else:
+                time.sleep(wait)
+
+    def set_rate(self, rate):
+        """Altera a taxa (ex.: pela interface) sem perder os tokens já acumulados"""
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._paused_until:
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            self.rate = float(rate)
+            if self._default_capacity:
+                self.capacity = max(1.0, self.rate)
+            self._tokens = min(self._tokens, self.capacity)
+
+    def pause(self, seconds):
+        """Suspende a emissão de tokens por `seconds` segundos (ex.: Retry-After)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+
+class TicketDetailFetcher:
+    """Busca detalhes de vários tickets em paralelo, com limite de taxa e retry.
+
+    As requisições rodam em um pool de `concurrency` threads; os callbacks são
+    chamados na thread que executa `fetch`, na ordem em que os tickets chegam,
+    para que cada ticket possa ser analisado assim que é recebido. Falhas
+    individuais são reportadas via `on_error` sem interromper os demais.
+    Com um `cache` (TicketDetailCache), tickets válidos em disco não geram
+    requisições, e as respostas obtidas da API são gravadas nele.
+    """
+
+    def __init__(self, api_client, concurrency=4, rate_limiter=None, max_retries=3, retry_delay=2, cache=None):
+        self.api_client = api_client
+        self.concurrency = max(1, int(concurrency))
+        self.rate_limiter = rate_limiter or getattr(api_client, 'rate_limiter', None) or TokenBucket(3)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.cache = cache
+
+    def _fetch_one(self, ticket_id, cancel_event):
+        """Obtém os detalhes de um ticket, repetindo em caso de 429 ou falha transitória.
+
+        Outros erros (ex.: 401, 404, resposta inválida) não mudam ao repetir e
+        são propagados na primeira tentativa.
+        """
+        attempt = 0
+        while True:
+            if cancel_event.is_set():
+                raise FetchCancelled()
+            self.rate_limiter.acquire(cancel_event)
+
+            try:
+                return self.api_client.get_ticket_details(ticket_id)
+            except RateLimitError as e:
+                attempt += 1
+                if attempt >= self.max_retries:
+                    raise
+                wait_time = e.retry_after if e.retry_after is not None else self.retry_delay * (2 ** (attempt - 1))
+                # Pausa todas as threads: o limite da API é compartilhado
+                self.rate_limiter.pause(wait_time)
+            except TransientApiError:
+                attempt += 1
+                if attempt >= self.max_retries:
+                    raise
+                if cancel_event.wait(self.retry_delay * (2 ** (attempt - 1))):
+                    raise FetchCancelled()
+
+    def fetch(self, ticket_ids, on_result, on_error=None, on_progress=None, cancel_event=None,
+              apply_dates=None, bypass_cache=False):
+        """Busca os tickets informados.
+
+        Args:
+            ticket_ids (list): IDs dos tickets
+            on_result (callable): chamado com (ticket_id, response) para cada sucesso
+            on_error (callable): chamado com (ticket_id, exception) para cada falha
+            on_progress (callable): chamado com (concluídos, total) após cada ticket
+            cancel_event (threading.Event): quando sinalizado, interrompe a busca
+            apply_dates (dict): `situation.apply_date` conhecida de cada ticket, para revalidar o cache
+            bypass_cache (bool): ignora as entradas em cache (as respostas ainda são gravadas)
+
+        Returns:
+            tuple: (quantidade de sucessos, lista de (ticket_id, mensagem de erro))
+        """
+        cancel_event = cancel_event or threading.Event()
+        apply_dates = apply_dates or {}
+        total = len(ticket_ids)
+        progress = {'done': 0, 'succeeded': 0}
+        failures = []
+
+        def deliver(ticket_id, response=None, error=None):
+            if error is None:
+                try:
+                    on_result(ticket_id, response)
+                    progress['succeeded'] += 1
+                except Exception as e:
+                    error = e
+            if error is not None:
+                failures.append((ticket_id, str(error)))
+                if on_error:
+                    on_error(ticket_id, error)
+
+            progress['done'] += 1
+            if on_progress:
+                on_progress(progress['done'], total)
+
+        # Tickets válidos em cache são entregues sem passar pela API
+        pending = []
+        for ticket_id in ticket_ids:
+            cached = None
+            if self.cache is not None and not bypass_cache:
+                cached = self.cache.get(ticket_id, apply_dates.get(ticket_id))
+            if cached is not None:
+                deliver(ticket_id, cached)
+            else:
+                pending.append(ticket_id)
+            if cancel_event.is_set():
+                return progress['succeeded'], failures
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {
+                executor.submit(self._fetch_one, ticket_id, cancel_event): ticket_id
+                for ticket_id in pending
+            }
+            try:
+                for future in as_completed(futures):
+                    ticket_id = futures[future]
+                    try:
+                        response = future.result()
+                    except FetchCancelled:
+                        continue
+                    except Exception as e:
+                        deliver(ticket_id, error=e)
+                    else:
+                        if self.cache is not None:
+                            try:
+                                self.cache.put(ticket_id, response)
+                            except OSError as e:
+                                print(f"Falha ao gravar o ticket {ticket_id} no cache: {e}")
+                        deliver(ticket_id, response)
+
+                    if cancel_event.is_set():
+                        break
+            finally:
+                if cancel_event.is_set():
+                    for future in futures:
+                        future.cancel()
+
+        return progress['succeeded'], failures
+
+
+class TimeSlicedTicketSearch:
+    """Divide uma pesquisa de /ticket/list por período em fatias consultadas em paralelo.
+
+    Cada fatia (um dia ou uma semana de `creation_date`) percorre as próprias
+    páginas pelo `api_client.iter_ticket_pages`, sob o limitador de taxa
+    compartilhado do cliente. As fatias são entregues em ordem cronológica,
+    sem tickets repetidos e ordenadas por data de criação, de modo que o tempo
+    total fica próximo ao da fatia mais lenta.
+    """
+
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    # Períodos até SINGLE_QUERY_DAYS dias não são divididos; até DAILY_SLICE_DAYS, fatias de um dia
+    SINGLE_QUERY_DAYS = 7
+    DAILY_SLICE_DAYS = 62
+
+    # Intervalo (s) para conferir o cancelamento enquanto aguarda uma fatia
+    CANCEL_POLL_INTERVAL = 0.2
+
+    def __init__(self, api_client, concurrency=4, slice_days=None):
+        self.api_client = api_client
+        self.concurrency = max(1, int(concurrency))
+        self.slice_days = slice_days
+
+    @classmethod
+    def _parse(cls, value):
+        """Separa '2024-01-31 23:59:59-0300' em (datetime, sufixo do fuso)"""
+        return datetime.datetime.strptime(value[:19], cls.DATE_FORMAT), value[19:]
+
+    @classmethod
+    def choose_slice_days(cls, start, end):
+        """Tamanho da fatia (em dias) para o período, ou None se não vale dividir"""
+        span_days = (end - start).total_seconds() / 86400
+        if span_days <= cls.SINGLE_QUERY_DAYS:
+            return None
+        if span_days <= cls.DAILY_SLICE_DAYS:
+            return 1
+        return 7
+
+    @classmethod
+    def plan_slices(cls, date_from, date_to, slice_days):
+        """Divide [date_from, date_to] em fatias contíguas de `slice_days` dias.
+
+        As datas estão no formato da API ('AAAA-MM-DD HH:MM:SS-0300'); cada fatia
+        termina um segundo antes do início da seguinte.
+
+        Returns:
+            list: pares (creation_date_ge, creation_date_le)
+        """
+        start, tz_suffix = cls._parse(date_from)
+        end, _ = cls._parse(date_to)
+        step = datetime.timedelta(days=slice_days)
+        one_second = datetime.timedelta(seconds=1)
+
+        slices = []
+        current = start
+        while current <= end:
+            slice_end = min(current + step - one_second, end)
+            slices.append((current.strftime(cls.DATE_FORMAT) + tz_suffix,
+                           slice_end.strftime(cls.DATE_FORMAT) + tz_suffix))
+            current = slice_end + one_second
+        return slices
+
+    def _fetch_slice(self, params, cancel_event):
+        """Todos os tickets de uma fatia, ordenados por data de criação"""
+        tickets = []
+        for page_tickets in self.api_client.iter_ticket_pages(params, prefetch=False, cancel_event=cancel_event):
+            if cancel_event.is_set():
+                raise FetchCancelled()
+            tickets.extend(page_tickets)
+        tickets.sort(key=lambda ticket: ticket.get('creation_date') or '')
+        return tickets
+
+    def iter_pages(self, params, cancel_event=None):
+        """Gera os tickets da pesquisa em blocos (um por fatia), em ordem de criação.
+
+        Sem `creation_date_ge`/`creation_date_le`, ou para períodos curtos, faz
+        a paginação simples de `api_client.iter_ticket_pages`. Com `cancel_event`
+        sinalizado, a busca para com FetchCancelled.
+        """
+        date_from = params.get('creation_date_ge')
+        date_to = params.get('creation_date_le')
+        if not date_from or not date_to:
+            yield from self.api_client.iter_ticket_pages(params, cancel_event=cancel_event)
+            return
+
+        slice_days = self.slice_days or self.choose_slice_days(self._parse(date_from)[0], self._parse(date_to)[0])
+        slices = self.plan_slices(date_from, date_to, slice_days) if slice_days else []
+        if len(slices) <= 1:
+            yield from self.api_client.iter_ticket_pages(params, cancel_event=cancel_event)
+            return
+
+        print(f"Pesquisa dividida em {len(slices)} fatias de {slice_days} dia(s)")
+        seen_ids = set()
+        # Interrompe as fatias pendentes se o consumidor parar antes do fim (ou cancelar)
+        stopped = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        futures = [
+            executor.submit(self._fetch_slice, dict(params, creation_date_ge=ge, creation_date_le=le), stopped)
+            for ge, le in slices
+        ]
+        try:
+            # Entrega na ordem das fatias; as seguintes continuam sendo buscadas enquanto isso
+            for future in futures:
+                while True:
+                    try:
+                        slice_tickets = future.result(timeout=self.CANCEL_POLL_INTERVAL)
+                        break
+                    except TimeoutError:
+                        if cancel_event is not None and cancel_event.is_set():
+                            raise FetchCancelled()
+                tickets = [ticket for ticket in slice_tickets if ticket.get('id') not in seen_ids]
+                seen_ids.update(ticket.get('id') for ticket in tickets)
+                if tickets:
+                    yield tickets
+        finally:
+            stopped.set()
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
@@ -0,0 +1,236 @@
+"""Interações de tickets em registros compactos, com as mensagens carregadas sob demanda.
+
+TicketAnalyzer.analyze_ticket guardava um dict por interação, incluindo o
+HTML completo da mensagem, e o classificador mantém as interações de todos os
+tickets selecionados ao mesmo tempo. Interaction usa __slots__ (sem um dict
+por objeto) e aceita o mesmo acesso de antes (interaction['date'],
+interaction.get('classification'), interaction['classification'] = 'B'), de
+modo que telas, exportação e banco local não mudam.
+
+O texto da mensagem, a maior parte da memória de uma análise, pode ficar fora
+do registro: com uma fonte de mensagens (MessageSource), ele é lido do cache
+de detalhes só quando um diálogo o exibe (na falta dele, buscado na API em
+segundo plano).
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from ticket_fetcher import TicketDetailFetcher
+
+
+def shared_text(value):
+    """Mesma instância para textos repetidos entre interações (remetentes, status)"""
+    return sys.intern(value) if type(value) is str else value
+
+
+class Interaction:
+    """Uma interação do ticket (resposta ou criação), com acesso como dict"""
+
+    # Chaves aceitas no acesso como dict (as mesmas do dict usado antes)
+    KEYS = ('id', 'date', 'sender_type', 'classification', 'sender', 'message', 'status',
+            'has_attachments', 'is_virtual')
+
+    __slots__ = ('id', 'date', 'sender_type', 'classification', 'sender', 'status',
+                 'has_attachments', 'is_virtual', 'message_text', 'ticket_id', 'message_source')
+
+    def __init__(self, id=None, date=None, sender_type=None, classification=None, sender=None,
+                 message=None, status=None, has_attachments=False, is_virtual=False,
+                 ticket_id=None, message_source=None):
+        self.id = id
+        self.date = date
+        self.sender_type = sender_type
+        self.classification = classification
+        self.sender = sender
+        self.status = status
+        self.has_attachments = has_attachments
+        self.is_virtual = is_virtual
+        self.message_text = message  # Mensagem em memória (None: lida da fonte quando exibida)
+        self.ticket_id = ticket_id
+        self.message_source = message_source
+
+    @property
+    def message(self):
+        """HTML da mensagem; sem texto em memória, é lido da fonte de mensagens (sem guardar no registro)"""
+        if self.message_text is None and self.message_source is not None:
+            return self.message_source.message(self.ticket_id, self.id)
+        return self.message_text
+
+    @message.setter
+    def message(self, value):
+        self.message_text = value
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.KEYS
+
+    def get(self, key, default=None):
+        """Como dict.get: `default` só para chaves inexistentes"""
+        if key not in self.KEYS:
+            return default
+        return getattr(self, key)
+
+    def keys(self):
+        return list(self.KEYS)
+
+    def to_dict(self):
+        """Dict equivalente ao usado antes (carrega a mensagem, se necessário)"""
+        return {key: getattr(self, key) for key in self.KEYS}
+
+    def _stored(self):
+        """Valores guardados no registro, por chave (a mensagem é a em memória: nada é carregado)"""
+        values = {key: getattr(self, key) for key in self.KEYS if key != 'message'}
+        values['message'] = self.message_text
+        return values
+
+    def __eq__(self, other):
+        """Igualdade pelos valores guardados, sem ler mensagens da fonte (sem E/S)"""
+        if isinstance(other, Interaction):
+            return self._stored() == other._stored() and self.ticket_id == other.ticket_id
+        if not isinstance(other, dict):
+            return NotImplemented
+        return self._stored() == other
+
+    # Como dict: igualdade por valor e sem hash (mapeamentos por interação usam id())
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"Interaction(id={self.id!r}, date={self.date!r}, sender_type={self.sender_type!r}, "
+                f"classification={self.classification!r})")
+
+
+class MessageSource:
+    """Mensagens das respostas de cada ticket, lidas sob demanda.
+
+    A resposta de /ticket/detail vem do cache de detalhes (qualquer que seja a
+    idade da entrada: mensagens enviadas não mudam). As mensagens dos últimos
+    tickets consultados ficam em memória, para que a lista de interações e os
+    diálogos de um mesmo ticket leiam o arquivo uma vez.
+
+    message() é chamado pela interface (prévia, seleção, detalhes, exportação)
+    e nunca acessa a API: um ticket ausente do cache é buscado em segundo plano
+    (TicketDetailFetcher, com limite de taxa, novas tentativas e gravação no
+    cache) e, enquanto isso, a mensagem é LOADING_MESSAGE. Ao fim da busca, os
+    ouvintes registrados com add_listener são chamados com o ID do ticket, na
+    thread da busca.
+    """
+
+    # Tickets com mensagens em memória
+    RECENT_TICKETS = 8
+
+    # Texto exibido enquanto as mensagens do ticket são buscadas na API
+    LOADING_MESSAGE = "<i>Carregando a mensagem da API...</i>"
+
+    # Segundos antes de tentar de novo um ticket cuja busca falhou (evita repetir a cada exibição)
+    RETRY_AFTER_FAILURE = 60
+
+    def __init__(self, cache=None, api_client=None):
+        self.cache = cache
+        self.api_client = api_client
+        self._recent = OrderedDict()  # ID do ticket -> {ID da resposta: mensagem}
+        self._loading = set()  # Tickets com busca na API em andamento
+        self._failed = {}  # ID do ticket -> instante (time.monotonic) da última busca com falha
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """Registra callback(ticket_id), chamado quando uma busca em segundo plano termina"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def message(self, ticket_id, reply_id):
+        """HTML da mensagem de uma resposta ('' se não encontrada, LOADING_MESSAGE durante a busca)"""
+        messages = self.messages(ticket_id)
+        if messages is None:
+            return self.LOADING_MESSAGE if self.request(ticket_id) else ''
+        return messages.get(str(reply_id), '')
+
+    def messages(self, ticket_id):
+        """Mensagens das respostas do ticket, por ID da resposta (None se fora da memória e do cache)"""
+        key = str(ticket_id)
+        with self._lock:
+            messages = self._recent.get(key)
+            if messages is not None:
+                self._recent.move_to_end(key)
+                return messages
+
+        response = self.cache.read(ticket_id) if self.cache is not None else None
+        if response is None:
+            return None
+        return self._remember(key, response)
+
+    def _remember(self, key, response):
+        replies = (response.get('data') or {}).get('replies') or []
+        messages = {str(reply.get('id')): reply.get('message') or '' for reply in replies}
+        with self._lock:
+            self._recent[key] = messages
+            while len(self._recent) > self.RECENT_TICKETS:
+                self._recent.popitem(last=False)
+        return messages
+
+    def request(self, ticket_id):
+        """Inicia a busca das mensagens do ticket em segundo plano; False se não há cliente da API"""
+        if self.api_client is None:
+            return False
+        key = str(ticket_id)
+        with self._lock:
+            if key in self._loading:
+                return True
+            failed_at = self._failed.get(key)
+            if failed_at is not None and time.monotonic() - failed_at < self.RETRY_AFTER_FAILURE:
+                return False
+            self._loading.add(key)
+        threading.Thread(target=self._load, args=(key,), daemon=True).start()
+        return True
+
+    def _load(self, key):
+        """Busca o detalhe do ticket na API (thread própria) e avisa os ouvintes"""
+        def on_result(ticket_id, response):
+            if response.get('error', True):
+                raise Exception(response.get('message', 'Erro desconhecido'))
+            self._remember(key, response)
+
+        failures = [(key, 'busca interrompida')]
+        try:
+            fetcher = TicketDetailFetcher(self.api_client, concurrency=1, cache=self.cache)
+            _, failures = fetcher.fetch([key], on_result)
+            for ticket_id, message in failures:
+                print(f"Erro ao carregar as mensagens do ticket {ticket_id}: {message}")
+        except Exception as e:
+            print(f"Erro ao carregar as mensagens do ticket {key}: {e}")
+        finally:
+            with self._lock:
+                self._loading.discard(key)
+                if failures:
+                    self._failed[key] = time.monotonic()
+                else:
+                    self._failed.pop(key, None)
+                listeners = list(self._listeners)
+        for callback in listeners:
+            callback(key)
+
+
+def message_sources(tickets):
+    """Fontes de mensagens (sem repetição) usadas pelas interações das análises"""
+    sources = {}
+    for ticket in tickets:
+        for interaction in ticket.get('interactions', []):
+            source = getattr(interaction, 'message_source', None)
+            if source is not None:
+                sources[id(source)] = source
+    return list(sources.values())
@@ -0,0 +1,113 @@
+"""Durações por intervalo de um ticket, para reclassificações incrementais.
+
+Cada interação "possui" o intervalo que vai dela até a interação seguinte
+(ou até a data final do ticket, no caso da última). As durações corridas e
+comerciais de todos os intervalos são calculadas uma única vez; ao
+reclassificar uma interação, apenas o intervalo dela muda de grupo
+(cliente/suporte/bug/ignorado), em tempo constante.
+"""
+import datetime
+
+from ticket_dates import parse_api_datetime
+
+# Grupo que recebe o intervalo seguinte a cada classificação
+# (após o cliente, o tempo é do suporte e vice-versa)
+GROUPS = {'C': 'with_support', 'A': 'with_client', 'B': 'in_bug', 'I': 'ignored'}
+
+
+class IntervalBreakdown:
+    """Totais por classificação de um ticket, com as durações de cada intervalo em cache.
+
+    Segue as mesmas regras de InteractionClassifierDialogUpdated.recalculate_times:
+    interações sem data são ignoradas, o trecho da criação até a primeira
+    interação conta como suporte e, em tickets abertos, o último intervalo vai
+    até `now` (fixado na criação do objeto).
+    """
+
+    def __init__(self, ticket, calculator, now=None):
+        self.totals = {group: 0 for group in GROUPS.values()}
+        self.business_totals = {group: 0 for group in GROUPS.values()}
+        self._durations = {}  # id(interação) -> (segundos corridos, segundos comerciais)
+        # (interação, início, fim, segundos corridos, segundos comerciais) de cada intervalo, em ordem;
+        # o primeiro é o trecho inicial, com interação None
+        self.intervals = []
+
+        creation_dt = parse_api_datetime(ticket.get('creation_date'))
+        self.valid = creation_dt is not None
+        if not self.valid:
+            return
+
+        interactions = sorted(
+            [interaction for interaction in ticket.get('interactions', []) if interaction.get('date')],
+            key=lambda x: x.get('date')
+        )
+        if not interactions:
+            return
+
+        final_date = self.final_date(ticket, now or datetime.datetime.now(), interactions[-1]['date'])
+
+        # Trecho inicial: da criação até a primeira interação, sempre do suporte
+        wall, business = self._measure(calculator, creation_dt, interactions[0]['date'])
+        self.intervals.append((None, creation_dt, interactions[0]['date'], wall, business))
+        self._add('C', wall, business)
+
+        for current, following in zip(interactions, interactions[1:]):
+            self._own(current, following['date'], calculator)
+
+        last = interactions[-1]
+        if last['date'] < final_date:
+            self._own(last, final_date, calculator)
+
+    @staticmethod
+    def final_date(ticket, now, last_interaction_date):
+        """Data final dos cálculos: fechamento, data da situação (cancelado/finalizado) ou agora.
+
+        Um ticket encerrado sem nenhuma das datas termina na última interação.
+        """
+        end_date = parse_api_datetime(ticket.get('end_date')) if ticket.get('end_date') else None
+        is_finished = end_date is not None
+
+        situation_date = None
+        if ticket.get('situation', {}).get('id') in [4, 5]:  # Cancelada ou Finalizada
+            is_finished = True
+            situation_date = parse_api_datetime(ticket.get('situation', {}).get('apply_date'))
+
+        if is_finished:
+            return end_date or situation_date or last_interaction_date
+        return now
+
+    @staticmethod
+    def _measure(calculator, start_dt, end_dt):
+        return (end_dt - start_dt).total_seconds(), calculator.calculate_business_time(start_dt, end_dt)
+
+    def _own(self, interaction, end_dt, calculator):
+        """Registra o intervalo que vai da interação até `end_dt` e o soma ao grupo dela"""
+        wall, business = self._measure(calculator, interaction['date'], end_dt)
+        self._durations[id(interaction)] = (wall, business)
+        self.intervals.append((interaction, interaction['date'], end_dt, wall, business))
+        self._add(interaction.get('classification'), wall, business)
+
+    def _add(self, classification, wall, business, sign=1):
+        group = GROUPS.get(classification)
+        if group:
+            self.totals[group] += sign * wall
+            self.business_totals[group] += sign * business
+
+    def durations(self, interaction):
+        """(segundos corridos, segundos comerciais) do intervalo que segue a interação"""
+        return self._durations.get(id(interaction), (0, 0))
+
+    def reclassify(self, interaction, previous_classification):
+        """Move o intervalo da interação do grupo anterior para o da classificação atual"""
+        durations = self._durations.get(id(interaction))
+        current_classification = interaction.get('classification')
+        if durations is None or previous_classification == current_classification:
+            return
+        self._add(previous_classification, *durations, sign=-1)
+        self._add(current_classification, *durations)
+
+    def apply_to(self, ticket):
+        """Grava os totais nas chaves reclassified_* do ticket"""
+        for group in GROUPS.values():
+            ticket[f'reclassified_time_{group}'] = self.totals[group]
+            ticket[f'reclassified_business_time_{group}'] = self.business_totals[group]
@@ -0,0 +1,91 @@
+"""Índice de busca em memória para a tabela de resultados.
+
+Guarda o texto de cada campo de cada linha já em minúsculas, de modo que
+filtrar milhares de tickets seja só uma varredura de substrings. Consultas
+aceitam termos livres e termos por campo, como `cliente:acme prioridade:alta`
+ou `assunto:"nota fiscal"`; todos os termos precisam aparecer na linha.
+"""
+import re
+
+# Nomes aceitos antes de ":" (em minúsculas) para cada campo indexado
+FIELD_ALIASES = {
+    'protocolo': 'protocolo',
+    'assunto': 'assunto',
+    'cliente': 'cliente',
+    'prioridade': 'prioridade',
+    'criado': 'criado',
+    'criacao': 'criado',
+    'criação': 'criado',
+    'prazo': 'prazo',
+    'sla': 'sla',
+    'situacao': 'situacao',
+    'situação': 'situacao',
+    'status': 'situacao',
+    'departamento': 'departamento',
+    'depto': 'departamento',
+}
+
+# campo:"frase", campo:termo, "frase" ou termo
+_TOKEN_PATTERN = re.compile(r'(?:([^\s:"]+):)?(?:"([^"]*)"?|(\S+))')
+
+
+def parse_query(text):
+    """Converte a consulta em uma lista de (campo ou None, termo), em minúsculas.
+
+    Um prefixo que não é nome de campo (ex.: "10:30") faz parte do termo.
+    """
+    terms = []
+    for match in _TOKEN_PATTERN.finditer(text.lower()):
+        prefix, phrase, word = match.groups()
+        term = phrase if phrase is not None else word
+        if not prefix and term.endswith(':') and term[:-1] in FIELD_ALIASES:
+            continue  # Campo ainda sem valor (ex.: enquanto se digita "cliente:")
+        field = FIELD_ALIASES.get(prefix) if prefix else None
+        if prefix and field is None:
+            term = f"{prefix}:{term}"
+        if term:
+            terms.append((field, term))
+    return terms
+
+
+class SearchIndex:
+    """Textos em minúsculas de cada linha, por campo e da linha inteira"""
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self.columns = {field: [] for field in self.fields}
+        self.rows = []  # Todos os campos da linha, separados por \x1f
+
+    def __len__(self):
+        return len(self.rows)
+
+    def add(self, values):
+        """Indexa uma linha (valores na mesma ordem de `fields`)"""
+        lowered = [str(value).lower() for value in values]
+        for field, value in zip(self.fields, lowered):
+            self.columns[field].append(value)
+        self.rows.append('\x1f'.join(lowered))
+
+    def clear(self):
+        for texts in self.columns.values():
+            texts.clear()
+        self.rows.clear()
+
+    def search(self, query, rows=None):
+        """Linhas (em ordem) que contêm todos os termos, ou None se a consulta for vazia.
+
+        Args:
+            query (str): texto digitado no filtro
+            rows (iterable): restringe a busca a estas linhas (padrão: todas)
+        """
+        terms = parse_query(query)
+        if not terms:
+            return None
+
+        candidates = range(len(self.rows)) if rows is None else rows
+        for field, term in terms:
+            texts = self.rows if field is None else self.columns[field]
+            candidates = [row for row in candidates if term in texts[row]]
+            if not candidates:
+                break
+        return list(candidates)
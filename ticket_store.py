@@ -0,0 +1,507 @@
+"""Armazenamento local (SQLite) das análises de tickets.
+
+Guarda o resultado de TicketAnalyzer.analyze_ticket — totais do ticket,
+interações (com a classificação atual), tempo por status e totais
+reclassificados — para que relatórios e agregações (ex.: horas comerciais de
+suporte por cliente e mês) sejam consultas SQL, sem nova busca na API.
+
+Também guarda, para a sincronização incremental (ticket_sync), os tickets
+da listagem de cada conjunto de filtros e a maior data de criação já vista,
+e as classificações manuais de interações (por ticket e ID da resposta),
+que TicketAnalyzer.analyze_ticket reaplica em novas análises.
+
+O HTML das mensagens só é gravado quando está na própria interação; com uma
+fonte de mensagens (ticket_interactions.MessageSource), ele continua no cache
+de detalhes e as interações lidas do banco o carregam sob demanda.
+
+O banco usa WAL, de modo que leituras não esperam gravações. Uma única
+conexão é compartilhada entre threads, protegida por um lock.
+"""
+import json
+import sqlite3
+import threading
+
+from ticket_cache import TicketDetailCache
+from ticket_dates import parse_api_datetime
+from ticket_interactions import Interaction
+
+# Formato das datas das interações. As datas do ticket são gravadas como vieram da API
+# (AAAA-MM-DD HH:MM:SS e fuso), também ordenáveis como texto; substr(data, 1, 7) é o mês
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Totais do ticket gravados como colunas (segundos)
+TIME_COLUMNS = [
+    'time_with_client', 'time_with_support',
+    'business_time_with_client', 'business_time_with_support',
+    'time_to_first_status', 'business_time_to_first_status',
+]
+
+# Totais do classificador de interações; NULL enquanto o ticket não foi reclassificado
+RECLASSIFIED_COLUMNS = [
+    f'reclassified_{prefix}{group}'
+    for prefix in ('time_', 'business_time_')
+    for group in ('with_client', 'with_support', 'in_bug', 'ignored')
+]
+
+# Colunas de texto copiadas da análise
+TEXT_COLUMNS = [
+    'protocol', 'subject', 'customer_name', 'customer_email',
+    'first_reply_date', 'current_situation', 'situation_apply_date',
+]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS tickets (
+    id TEXT PRIMARY KEY,
+    {', '.join(f'{column} TEXT' for column in TEXT_COLUMNS)},
+    creation_date TEXT,
+    end_date TEXT,
+    situation_id INTEGER,
+    sla_deadline TEXT,
+    sla_accomplished INTEGER,
+    {', '.join(f'{column} REAL NOT NULL DEFAULT 0' for column in TIME_COLUMNS)},
+    {', '.join(f'{column} REAL' for column in RECLASSIFIED_COLUMNS)},
+    stored_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+);
+CREATE INDEX IF NOT EXISTS idx_tickets_customer ON tickets (customer_name);
+CREATE INDEX IF NOT EXISTS idx_tickets_creation ON tickets (creation_date);
+CREATE INDEX IF NOT EXISTS idx_tickets_situation ON tickets (situation_id);
+
+CREATE TABLE IF NOT EXISTS interactions (
+    ticket_id TEXT NOT NULL REFERENCES tickets (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    reply_id TEXT,
+    date TEXT,
+    sender_type TEXT,
+    classification TEXT,
+    sender TEXT,
+    status TEXT,
+    message TEXT,
+    has_attachments INTEGER NOT NULL DEFAULT 0,
+    is_virtual INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (ticket_id, position)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS status_times (
+    ticket_id TEXT NOT NULL REFERENCES tickets (id) ON DELETE CASCADE,
+    status TEXT NOT NULL,
+    seconds REAL NOT NULL DEFAULT 0,
+    business_seconds REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (ticket_id, status)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS reclassifications (
+    ticket_id TEXT NOT NULL,
+    reply_id TEXT NOT NULL,
+    classification TEXT NOT NULL,
+    PRIMARY KEY (ticket_id, reply_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    filter_key TEXT PRIMARY KEY,
+    high_water_mark TEXT,
+    synced_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS listed_tickets (
+    filter_key TEXT NOT NULL,
+    ticket_id TEXT NOT NULL,
+    creation_date TEXT,
+    apply_date TEXT,
+    finalized INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL,
+    PRIMARY KEY (filter_key, ticket_id)
+) WITHOUT ROWID;
+"""
+
+_TICKET_COLUMNS = (['id'] + TEXT_COLUMNS + ['creation_date', 'end_date', 'situation_id',
+                                             'sla_deadline', 'sla_accomplished']
+                   + TIME_COLUMNS + RECLASSIFIED_COLUMNS)
+
+_INTERACTION_COLUMNS = ['ticket_id', 'position', 'reply_id', 'date', 'sender_type', 'classification',
+                        'sender', 'status', 'message', 'has_attachments', 'is_virtual']
+
+
+def _format_date(dt):
+    return dt.strftime(DATE_FORMAT) if dt else None
+
+
+def _placeholders(columns):
+    return ', '.join('?' for _ in columns)
+
+
+class TicketStore:
+    """Banco SQLite com as análises de tickets"""
+
+    def __init__(self, path):
+        self.path = path
+        # Fonte das mensagens não gravadas, atribuída às interações lidas do banco
+        self.message_source = None
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")  # Seguro com WAL e bem mais rápido
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+    def _ticket_row(self, analysis):
+        sla_deadline = (analysis.get('sla') or {}).get('deadline') or {}
+        row = {
+            'id': str(analysis.get('id')),
+            'creation_date': analysis.get('creation_date'),
+            'end_date': analysis.get('end_date'),
+            'situation_id': analysis.get('situation_id'),
+            'sla_deadline': sla_deadline.get('date') if sla_deadline else None,
+            'sla_accomplished': int(bool(sla_deadline.get('accomplished'))) if sla_deadline else None,
+        }
+        for column in TEXT_COLUMNS:
+            value = analysis.get(column)
+            row[column] = str(value) if value is not None else None
+        for column in TIME_COLUMNS:
+            row[column] = analysis.get(column) or 0
+        for column in RECLASSIFIED_COLUMNS:
+            row[column] = analysis.get(column)
+        return [row[column] for column in _TICKET_COLUMNS]
+
+    @staticmethod
+    def _interaction_rows(ticket_id, interactions):
+        for position, interaction in enumerate(interactions):
+            reply_id = interaction.get('id')
+            yield (
+                ticket_id, position,
+                str(reply_id) if reply_id is not None else None,
+                _format_date(interaction.get('date')),
+                interaction.get('sender_type'),
+                interaction.get('classification'),
+                interaction.get('sender'),
+                interaction.get('status'),
+                # Sem carregar mensagens que estão apenas no cache de detalhes
+                interaction.message_text if isinstance(interaction, Interaction) else interaction.get('message'),
+                int(bool(interaction.get('has_attachments'))),
+                int(bool(interaction.get('is_virtual'))),
+            )
+
+    def save_analyses(self, analyses):
+        """Grava (ou substitui) as análises, em uma única transação.
+
+        Returns:
+            int: quantidade de tickets gravados
+        """
+        count = 0
+        with self._lock, self.connection:
+            cursor = self.connection.cursor()
+            for analysis in analyses:
+                if analysis.get('id') is None:
+                    continue
+                ticket_id = str(analysis.get('id'))
+                cursor.execute("DELETE FROM interactions WHERE ticket_id = ?", (ticket_id,))
+                cursor.execute("DELETE FROM status_times WHERE ticket_id = ?", (ticket_id,))
+                cursor.execute(
+                    f"INSERT OR REPLACE INTO tickets ({', '.join(_TICKET_COLUMNS)}) "
+                    f"VALUES ({_placeholders(_TICKET_COLUMNS)})",
+                    self._ticket_row(analysis)
+                )
+                cursor.executemany(
+                    f"INSERT INTO interactions ({', '.join(_INTERACTION_COLUMNS)}) "
+                    f"VALUES ({_placeholders(_INTERACTION_COLUMNS)})",
+                    self._interaction_rows(ticket_id, analysis.get('interactions', []))
+                )
+                status_time = analysis.get('status_time', {})
+                status_business_time = analysis.get('status_business_time', {})
+                cursor.executemany(
+                    "INSERT INTO status_times (ticket_id, status, seconds, business_seconds) VALUES (?, ?, ?, ?)",
+                    [(ticket_id, status, status_time.get(status, 0), status_business_time.get(status, 0))
+                     for status in set(status_time) | set(status_business_time)]
+                )
+                count += 1
+        return count
+
+    def delete_tickets(self, ticket_ids):
+        """Remove tickets (e suas interações e tempos por status)"""
+        with self._lock, self.connection:
+            self.connection.executemany("DELETE FROM tickets WHERE id = ?",
+                                        [(str(ticket_id),) for ticket_id in ticket_ids])
+
+    def count(self):
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+
+    def query(self, sql, params=()):
+        """Executa uma consulta de leitura e retorna as linhas (tuplas)"""
+        with self._lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    @staticmethod
+    def _date_filter(date_from, date_to, column='t.creation_date'):
+        """Cláusula WHERE (datas AAAA-MM-DD inclusivas) e parâmetros"""
+        clauses, params = [], []
+        if date_from:
+            clauses.append(f"{column} >= ?")
+            params.append(str(date_from))
+        if date_to:
+            clauses.append(f"{column} < date(?, '+1 day')")
+            params.append(str(date_to))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def customer_month_totals(self, date_from=None, date_to=None, business=True):
+        """Tempo com suporte, com cliente, em bug e ignorado por cliente e mês de criação.
+
+        Usa os totais reclassificados quando o ticket passou pelo classificador.
+
+        Returns:
+            list: (cliente, 'AAAA-MM', tickets, suporte, cliente, bug, ignorado), em segundos
+        """
+        prefix = 'business_time_' if business else 'time_'
+        where, params = self._date_filter(date_from, date_to)
+        sql = f"""
+            SELECT t.customer_name, substr(t.creation_date, 1, 7) AS month, COUNT(*),
+                   SUM(COALESCE(t.reclassified_{prefix}with_support, t.{prefix}with_support)),
+                   SUM(COALESCE(t.reclassified_{prefix}with_client, t.{prefix}with_client)),
+                   SUM(COALESCE(t.reclassified_{prefix}in_bug, 0)),
+                   SUM(COALESCE(t.reclassified_{prefix}ignored, 0))
+            FROM tickets t{where}
+            GROUP BY t.customer_name, month
+            ORDER BY t.customer_name, month
+        """
+        return self.query(sql, params)
+
+    def status_totals(self, date_from=None, date_to=None):
+        """Tickets e tempo total/comercial em cada status
+
+        Returns:
+            list: (status, tickets, segundos, segundos comerciais)
+        """
+        where, params = self._date_filter(date_from, date_to)
+        sql = f"""
+            SELECT s.status, COUNT(*), SUM(s.seconds), SUM(s.business_seconds)
+            FROM status_times s JOIN tickets t ON t.id = s.ticket_id{where}
+            GROUP BY s.status
+            ORDER BY s.status
+        """
+        return self.query(sql, params)
+
+    def load_analyses(self, ticket_ids=None, date_from=None, date_to=None):
+        """Reconstrói as análises gravadas no formato de TicketAnalyzer.analyze_ticket.
+
+        Args:
+            ticket_ids (list): apenas estes tickets (padrão: todos do período)
+            date_from, date_to (str): período de criação AAAA-MM-DD (inclusivo)
+        """
+        where, params = self._date_filter(date_from, date_to)
+        if ticket_ids is not None:
+            ids = [str(ticket_id) for ticket_id in ticket_ids]
+            if not ids:
+                return []
+            where += (" AND " if where else " WHERE ") + f"t.id IN ({_placeholders(ids)})"
+            params += ids
+
+        with self._lock:
+            cursor = self.connection.execute(
+                f"SELECT {', '.join('t.' + column for column in _TICKET_COLUMNS)} "
+                f"FROM tickets t{where} ORDER BY t.creation_date, t.id", params
+            )
+            rows = cursor.fetchall()
+            analyses = {}
+            for row in rows:
+                analyses[row[0]] = self._analysis_from_row(dict(zip(_TICKET_COLUMNS, row)))
+
+            selected = f"SELECT t.id FROM tickets t{where}"
+            for row in self.connection.execute(
+                f"SELECT {', '.join(_INTERACTION_COLUMNS)} FROM interactions "
+                f"WHERE ticket_id IN ({selected}) ORDER BY ticket_id, position", params
+            ):
+                (ticket_id, _, reply_id, date, sender_type, classification,
+                 sender, status, message, has_attachments, is_virtual) = row
+                analysis = analyses.get(ticket_id)
+                if analysis is None:
+                    continue
+                analysis['interactions'].append(Interaction(
+                    id=reply_id,
+                    date=parse_api_datetime(date),
+                    sender_type=sender_type,
+                    classification=classification,
+                    sender=sender,
+                    message=message,
+                    status=status,
+                    has_attachments=bool(has_attachments),
+                    is_virtual=bool(is_virtual),
+                    ticket_id=analysis['id'],
+                    message_source=self.message_source
+                ))
+
+            for ticket_id, status, seconds, business_seconds in self.connection.execute(
+                f"SELECT ticket_id, status, seconds, business_seconds FROM status_times "
+                f"WHERE ticket_id IN ({selected})", params
+            ):
+                analysis = analyses.get(ticket_id)
+                if analysis is not None:
+                    analysis['status_time'][status] = seconds
+                    analysis['status_business_time'][status] = business_seconds
+
+        return list(analyses.values())
+
+    def get_reclassifications(self, ticket_id):
+        """Classificações manuais do ticket (ID da resposta -> C/A/B/I)"""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT reply_id, classification FROM reclassifications WHERE ticket_id = ?", (str(ticket_id),)
+            ).fetchall()
+        return dict(rows)
+
+    def save_reclassifications(self, analyses):
+        """Grava as classificações atuais das interações das análises.
+
+        Apenas as interações com classificação diferente do tipo original são
+        guardadas; as demais classificações gravadas do ticket são removidas.
+
+        Returns:
+            int: quantidade de interações reclassificadas gravadas
+        """
+        count = 0
+        with self._lock, self.connection:
+            for analysis in analyses:
+                if analysis.get('id') is None:
+                    continue
+                ticket_id = str(analysis.get('id'))
+                rows = [
+                    (ticket_id, str(interaction.get('id')), interaction.get('classification'))
+                    for interaction in analysis.get('interactions', [])
+                    if interaction.get('id') is not None and interaction.get('classification')
+                    and interaction.get('classification') != interaction.get('sender_type')
+                ]
+                self.connection.execute("DELETE FROM reclassifications WHERE ticket_id = ?", (ticket_id,))
+                self.connection.executemany(
+                    "INSERT INTO reclassifications (ticket_id, reply_id, classification) VALUES (?, ?, ?)", rows
+                )
+                count += len(rows)
+        return count
+
+    def get_high_water_mark(self, filter_key):
+        """Maior data de criação (AAAA-MM-DD HH:MM:SS) já sincronizada para os filtros, ou None"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT high_water_mark FROM sync_state WHERE filter_key = ?", (filter_key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_high_water_mark(self, filter_key, high_water_mark):
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO sync_state (filter_key, high_water_mark, synced_at) "
+                "VALUES (?, ?, datetime('now', 'localtime'))",
+                (filter_key, high_water_mark)
+            )
+
+    def save_listing(self, filter_key, tickets):
+        """Grava (ou atualiza) os tickets de /ticket/list de um conjunto de filtros"""
+        rows = []
+        for ticket in tickets:
+            if ticket.get('id') is None:
+                continue
+            rows.append((
+                filter_key, str(ticket.get('id')), ticket.get('creation_date'),
+                (ticket.get('situation') or {}).get('apply_date'),
+                int(TicketDetailCache.is_finalized(ticket)),
+                json.dumps(ticket, ensure_ascii=False),
+            ))
+        with self._lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO listed_tickets "
+                "(filter_key, ticket_id, creation_date, apply_date, finalized, data) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def load_listing(self, filter_key, date_from=None, date_to=None):
+        """Tickets da listagem gravada para os filtros, em ordem de criação"""
+        where, params = self._date_filter(date_from, date_to, column='creation_date')
+        where = where.replace(" WHERE ", " AND ")
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT data FROM listed_tickets WHERE filter_key = ?{where} ORDER BY creation_date, ticket_id",
+                [filter_key] + params
+            ).fetchall()
+        return [json.loads(data) for data, in rows]
+
+    def open_creation_days(self, filter_key):
+        """Dias (AAAA-MM-DD, em ordem) em que foram criados os tickets ainda em aberto da listagem gravada"""
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT DISTINCT substr(creation_date, 1, 10) AS day FROM listed_tickets "
+                "WHERE filter_key = ? AND finalized = 0 AND creation_date IS NOT NULL ORDER BY day",
+                (filter_key,)
+            ).fetchall()
+        return [day for day, in rows]
+
+    def drop_unlisted(self, filter_key, ranges, listed_ids):
+        """Remove da listagem gravada os tickets em aberto dos períodos listados que não voltaram.
+
+        São tickets que deixaram de atender aos filtros (ex.: mudaram de
+        situação); sem isso, continuariam em aberto na listagem para sempre.
+
+        Args:
+            ranges: períodos de criação listados, pares (creation_date_ge, creation_date_le)
+            listed_ids: IDs dos tickets que vieram nesses períodos
+
+        Returns:
+            int: quantidade de tickets removidos
+        """
+        listed_ids = {str(ticket_id) for ticket_id in listed_ids}
+        removed = []
+        with self._lock, self.connection:
+            for date_ge, date_le in ranges:
+                rows = self.connection.execute(
+                    "SELECT ticket_id FROM listed_tickets WHERE filter_key = ? AND finalized = 0 "
+                    "AND substr(creation_date, 1, 19) BETWEEN ? AND ?",
+                    (filter_key, date_ge[:19], date_le[:19])
+                ).fetchall()
+                removed.extend(ticket_id for ticket_id, in rows if ticket_id not in listed_ids)
+            self.connection.executemany(
+                "DELETE FROM listed_tickets WHERE filter_key = ? AND ticket_id = ?",
+                [(filter_key, ticket_id) for ticket_id in removed]
+            )
+        return len(removed)
+
+    def stale_listed(self, filter_key):
+        """Tickets listados a analisar: sem análise gravada, com outra data de situação ou em aberto.
+
+        Os tempos de um ticket em aberto crescem até o momento da análise,
+        então ele é reanalisado a cada sincronização, mesmo sem mudanças.
+
+        Returns:
+            dict: ID do ticket -> `situation.apply_date` da listagem
+        """
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT l.ticket_id, l.apply_date FROM listed_tickets l "
+                "LEFT JOIN tickets t ON t.id = l.ticket_id "
+                "WHERE l.filter_key = ? AND (t.id IS NULL OR l.finalized = 0 "
+                "OR t.situation_apply_date IS NOT l.apply_date) "
+                "ORDER BY l.creation_date",
+                (filter_key,)
+            ).fetchall()
+        return dict(rows)
+
+    @staticmethod
+    def _analysis_from_row(row):
+        analysis = {column: row[column] for column in TEXT_COLUMNS + TIME_COLUMNS}
+        analysis.update({
+            'id': row['id'],
+            'creation_date': row['creation_date'],
+            'creation_dt': parse_api_datetime(row['creation_date']),
+            'end_date': row['end_date'],
+            'situation_id': row['situation_id'],
+            'status_time': {},
+            'status_business_time': {},
+            'interactions': [],
+        })
+        for column in RECLASSIFIED_COLUMNS:
+            if row[column] is not None:
+                analysis[column] = row[column]
+        if row['sla_deadline']:
+            analysis['sla'] = {'deadline': {'date': row['sla_deadline'],
+                                            'accomplished': bool(row['sla_accomplished'])}}
+        return analysis
@@ -0,0 +1,165 @@
+"""Sincronização incremental dos tickets com o banco local (TicketStore).
+
+Para cada conjunto de filtros (data inicial, situação, prioridade e
+categoria), o banco guarda a maior data de criação já listada. Cada
+sincronização lista apenas os tickets criados desde o dia dessa data (com
+uma margem) e os dias anteriores que ainda têm tickets em aberto, cuja
+situação pode mudar, e analisa de novo os tickets novos, alterados, em
+aberto ou que falharam antes.
+
+A API não filtra por data de atualização; como no cache de detalhes, um
+ticket é considerado inalterado enquanto a `situation.apply_date` da
+listagem for a mesma da análise gravada. Os tempos de um ticket em aberto
+crescem até o momento da análise, então ele é reanalisado a cada
+sincronização (com o cache de detalhes, sem nova requisição se a situação
+não mudou). Tickets em aberto que não voltam na listagem dos seus dias
+deixaram de atender aos filtros e saem da listagem gravada. Tickets
+encerrados não voltam a ser listados.
+"""
+import datetime
+import json
+
+from ticket_core import build_search_params
+from ticket_dates import parse_api_datetime
+from ticket_fetcher import TicketDetailFetcher, TimeSlicedTicketSearch
+
+
+def sync_filter_key(date_from, situation=None, priority=None, category_id=None):
+    """Chave do conjunto de filtros no banco local"""
+    return json.dumps({
+        'date_from': date_from,
+        'situation': situation or '',
+        'priority': priority or '',
+        'category_id': category_id or '',
+    }, sort_keys=True)
+
+
+class TicketSync:
+    """Lista, busca e analisa apenas o que mudou desde a última sincronização"""
+
+    # Margem antes da última data sincronizada, para tickets que aparecem na listagem com atraso
+    OVERLAP = datetime.timedelta(hours=1)
+
+    # Análises acumuladas antes de cada gravação no banco
+    SAVE_BATCH = 200
+
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, api_client, analyzer, store, concurrency=4, cache=None):
+        self.api_client = api_client
+        self.analyzer = analyzer
+        self.store = store
+        self.concurrency = concurrency
+        self.cache = cache
+
+    def listing_ranges(self, filter_key, date_from, date_to):
+        """Períodos de criação a listar, como pares (creation_date_ge, creation_date_le).
+
+        Sem sincronização anterior, é o período inteiro. Depois, é do dia da
+        última data sincronizada (menos a margem) até `date_to`, precedido dos
+        dias com tickets em aberto (dias seguidos formam um único período).
+
+        Args:
+            date_from, date_to (str): período no formato da API ('AAAA-MM-DD HH:MM:SS-0300')
+        """
+        high_water_mark = self.store.get_high_water_mark(filter_key)
+        if not high_water_mark:
+            return [(date_from, date_to)]
+
+        tz_suffix = date_from[19:]
+        period_start = parse_api_datetime(date_from)
+        window_day = (parse_api_datetime(high_water_mark) - self.OVERLAP).date()
+        window_start = max(datetime.datetime.combine(window_day, datetime.time()), period_start)
+
+        ranges = []
+        for day in self.store.open_creation_days(filter_key):
+            day = datetime.datetime.strptime(day, "%Y-%m-%d")
+            if day < period_start.replace(hour=0, minute=0, second=0) or day >= window_start:
+                continue
+            day_end = day + datetime.timedelta(days=1, seconds=-1)
+            if ranges and day - ranges[-1][1] <= datetime.timedelta(seconds=1):
+                ranges[-1][1] = day_end
+            else:
+                ranges.append([max(day, period_start), day_end])
+        ranges.append([window_start, parse_api_datetime(date_to)])
+        return [(start.strftime(self.DATE_FORMAT) + tz_suffix, end.strftime(self.DATE_FORMAT) + tz_suffix)
+                for start, end in ranges]
+
+    def sync(self, date_from, situation=None, priority=None, category_id=None,
+             cancel_event=None, on_progress=None, on_listed=None):
+        """Sincroniza o período de `date_from` (AAAA-MM-DD) até agora.
+
+        Args:
+            on_progress (callable): (concluídos, total) da busca de detalhes
+            on_listed (callable): quantidade de tickets listados até o momento
+
+        Returns:
+            dict: filter_key, ranges (períodos listados), listed, removed (tickets que
+                deixaram os filtros), fetched, analyzed, failures (lista de (ID, erro))
+
+        Raises:
+            FetchCancelled: se cancelado durante a listagem (nada é gravado)
+        """
+        filter_key = sync_filter_key(date_from, situation, priority, category_id)
+        today = datetime.date.today().strftime("%Y-%m-%d")
+        params = build_search_params(date_from, today, situation, priority, category_id)
+        ranges = self.listing_ranges(filter_key, params['creation_date_ge'], params['creation_date_le'])
+        print(f"Sincronizando {len(ranges)} período(s) de criação: {ranges[0][0]} a {ranges[-1][1]}")
+
+        listed = []
+        seen_ids = set()
+        search = TimeSlicedTicketSearch(self.api_client, concurrency=self.concurrency)
+        for index, (creation_date_ge, creation_date_le) in enumerate(ranges):
+            range_params = dict(params, creation_date_ge=creation_date_ge, creation_date_le=creation_date_le)
+            if index == len(ranges) - 1:
+                pages = search.iter_pages(range_params, cancel_event)
+            else:
+                # Dias com tickets em aberto: paginação simples, sem fatias de um dia (menos requisições)
+                pages = self.api_client.iter_ticket_pages(range_params, cancel_event=cancel_event)
+            for page_tickets in pages:
+                page_tickets = [ticket for ticket in page_tickets if ticket.get('id') not in seen_ids]
+                seen_ids.update(ticket.get('id') for ticket in page_tickets)
+                listed.extend(page_tickets)
+                if on_listed:
+                    on_listed(len(listed))
+
+        # Com a listagem completa, a marca pode avançar: o que falhar abaixo continua pendente
+        removed = self.store.drop_unlisted(filter_key, ranges, seen_ids)
+        self.store.save_listing(filter_key, listed)
+        creation_dates = [parse_api_datetime(ticket.get('creation_date')) for ticket in listed]
+        creation_dates = [dt for dt in creation_dates if dt]
+        previous_mark = parse_api_datetime(self.store.get_high_water_mark(filter_key))
+        if previous_mark:
+            creation_dates.append(previous_mark)
+        if creation_dates:
+            self.store.set_high_water_mark(filter_key, max(creation_dates).strftime(self.DATE_FORMAT))
+
+        stale = self.store.stale_listed(filter_key)
+        analyses = []
+        summary = {'filter_key': filter_key, 'ranges': ranges, 'listed': len(listed), 'removed': removed,
+                   'fetched': len(stale), 'analyzed': 0, 'failures': []}
+
+        def save():
+            if analyses:
+                summary['analyzed'] += self.store.save_analyses(analyses)
+                analyses.clear()
+
+        def on_result(ticket_id, response):
+            if response.get('error', True):
+                raise Exception(response.get('message', 'Erro desconhecido'))
+            analyses.append(self.analyzer.analyze_ticket(response.get('data', {})))
+            if len(analyses) >= self.SAVE_BATCH:
+                save()
+
+        if stale:
+            fetcher = TicketDetailFetcher(self.api_client, concurrency=self.concurrency, cache=self.cache)
+            _, summary['failures'] = fetcher.fetch(
+                list(stale), on_result, on_progress=on_progress, cancel_event=cancel_event, apply_dates=stale
+            )
+        save()
+        return summary
+
+    def load_tickets(self, date_from, situation=None, priority=None, category_id=None, date_to=None):
+        """Tickets da listagem sincronizada (como em /ticket/list), sem acessar a API"""
+        filter_key = sync_filter_key(date_from, situation, priority, category_id)
+        return self.store.load_listing(filter_key, date_to=date_to)